@@ -0,0 +1,160 @@
+import re
+import time
+from collections import deque
+
+import numpy as np
+
+from rag_pipeline import content_terms, tokenize
+
+ROUTES = ["no_retrieval", "single_shot", "multi_step"]
+
+ROUTE_LABELS = {
+    "no_retrieval": "No Retrieval",
+    "single_shot": "Single-Shot Retrieval",
+    "multi_step": "Multi-Step Retrieval",
+}
+
+# Connectors that usually mean the question has several parts
+_MULTI_PART_RE = re.compile(r"\b(and|vs|versus|compare|compared|difference|between|both|then|affect|impact|why)\b|[,;]")
+_SPLIT_RE = re.compile(r"\s*(?:\?|;|,\s*and\s+|\band also\b|\bas well as\b|\bthen\b)\s*|\s+and\s+(?=(?:how|what|why|when|where|which|who|is|are|do|does|can)\b)")
+
+DEFAULT_WEIGHTS = {"length": 0.25, "entities": 0.2, "rarity": 0.25, "clauses": 0.3}
+
+
+def extract_features(query, pipeline):
+    """Cheap query features - no embedding or model call needed"""
+    tokens = tokenize(query)
+    terms = content_terms(query)
+    words = query.split()
+    # Capitalized words after the first one and numbers are a cheap stand-in for named entities
+    entities = sum(1 for w in words[1:] if w[:1].isupper()) + sum(1 for t in tokens if t.isdigit())
+    known = [t for t in terms if t in pipeline.doc_freq]
+    max_idf = pipeline.idf("\0")  # idf of an unseen term is the maximum possible value
+    rarity = float(np.mean([pipeline.idf(t) for t in known]) / max_idf) if known else 0.0
+    return {
+        "length": len(tokens),
+        "content_terms": len(terms),
+        "entities": entities,
+        "rarity": rarity,
+        "coverage": len(known) / len(terms) if terms else 0.0,
+        "clauses": len(_MULTI_PART_RE.findall(query.lower())),
+    }
+
+
+def decompose_query(query):
+    """Split a multi-part question into standalone sub-questions"""
+    parts = [p.strip(" ?.") for p in _SPLIT_RE.split(query) if p and p.strip(" ?.")]
+    parts = [p for p in parts if len(content_terms(p)) >= 2]
+    return parts if len(parts) > 1 else [query.strip()]
+
+
+class AdaptiveRouter:
+    """Route each query to no-retrieval, single-shot or multi-step retrieval by predicted cost.
+
+    complexity = weighted sum of normalized features; below `low_threshold` the model answers
+    directly, above `high_threshold` the query is decomposed and retrieved in several steps.
+    Every routed query is recorded so thresholds can be tuned from real traffic.
+    """
+
+    def __init__(self, pipeline, low_threshold=0.2, high_threshold=0.55, weights=None,
+                 k=3, hit_threshold=0.15, max_log=5000):
+        self.pipeline = pipeline
+        self.low_threshold = low_threshold
+        self.high_threshold = high_threshold
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.k = k
+        self.hit_threshold = hit_threshold
+        self.log = deque(maxlen=max_log)
+
+    def score(self, features):
+        if features["coverage"] == 0:
+            # Nothing in the query is in the knowledge base, so retrieval cannot help
+            return 0.0
+        normalized = {
+            "length": min(features["length"] / 20, 1.0),
+            "entities": min(features["entities"] / 3, 1.0),
+            "rarity": features["rarity"],
+            "clauses": min(features["clauses"] / 3, 1.0),
+        }
+        return float(sum(self.weights[name] * value for name, value in normalized.items()))
+
+    def route(self, query):
+        features = extract_features(query, self.pipeline)
+        complexity = self.score(features)
+        if complexity < self.low_threshold:
+            route = "no_retrieval"
+        elif complexity < self.high_threshold:
+            route = "single_shot"
+        else:
+            route = "multi_step"
+        return route, complexity, features
+
+    def _multi_step(self, query, timings):
+        merged = {}
+        sub_queries = decompose_query(query)
+        for sub_query in sub_queries:
+            for passage in self.pipeline.retrieve(sub_query, k=self.k, timings=timings):
+                if passage["score"] > merged.get(passage["doc_id"], {"score": -1.0})["score"]:
+                    merged[passage["doc_id"]] = passage
+        # Second hop: follow up on the best passage's title to pull in connected material
+        best = max(merged.values(), key=lambda p: p["score"], default=None)
+        if best is not None:
+            follow_up = f"{query} {best['title']}"
+            for passage in self.pipeline.retrieve(follow_up, k=self.k, timings=timings):
+                merged.setdefault(passage["doc_id"], passage)
+        passages = sorted(merged.values(), key=lambda p: p["score"], reverse=True)[:2 * self.k]
+        return passages, len(sub_queries) + (best is not None)
+
+    def run(self, query):
+        start = time.perf_counter()
+        route, complexity, features = self.route(query)
+        timings = {}
+        if route == "no_retrieval":
+            passages, retrieval_calls = [], 0
+        elif route == "single_shot":
+            passages, retrieval_calls = self.pipeline.retrieve(query, k=self.k, timings=timings), 1
+        else:
+            passages, retrieval_calls = self._multi_step(query, timings)
+        answer = self.pipeline.generate(query, passages, timings=timings,
+                                        fallback="Answered directly by the model (no retrieval needed).")
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        top_score = max((p["score"] for p in passages), default=0.0)
+        record = {
+            "query": query,
+            "route": route,
+            "complexity": round(complexity, 3),
+            "latency_ms": latency_ms,
+            "retrieval_calls": retrieval_calls,
+            "top_score": top_score,
+            "hit": None if route == "no_retrieval" else top_score >= self.hit_threshold,
+            **features,
+        }
+        self.log.append(record)
+        return {"answer": answer, "passages": passages, "timings": timings, **record}
+
+    def route_stats(self):
+        """Per-route traffic share, latency percentiles and hit rate from the query log"""
+        total = len(self.log)
+        rows = []
+        for route in ROUTES:
+            records = [r for r in self.log if r["route"] == route]
+            if not records:
+                rows.append({"route": route, "queries": 0, "share": 0.0, "p50_ms": None,
+                             "p95_ms": None, "mean_retrievals": None, "hit_rate": None})
+                continue
+            latencies = np.array([r["latency_ms"] for r in records])
+            hits = [r["hit"] for r in records if r["hit"] is not None]
+            rows.append({
+                "route": route,
+                "queries": len(records),
+                "share": len(records) / total,
+                "p50_ms": float(np.percentile(latencies, 50)),
+                "p95_ms": float(np.percentile(latencies, 95)),
+                "mean_retrievals": float(np.mean([r["retrieval_calls"] for r in records])),
+                "hit_rate": float(np.mean(hits)) if hits else None,
+            })
+        return rows
+
+    def reset_log(self):
+        self.log.clear()
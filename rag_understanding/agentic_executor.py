@@ -0,0 +1,205 @@
+import ast
+import asyncio
+import operator
+import re
+import time
+
+from adaptive_router import decompose_query
+
+_PLACEHOLDER_RE = re.compile(r"\{(\w+)\}")
+
+_OPERATORS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.Pow: operator.pow, ast.Mod: operator.mod,
+    ast.USub: operator.neg, ast.UAdd: operator.pos,
+}
+
+# Bounds on `**` so an expression such as 9**9**9 fails fast instead of computing a huge integer
+_MAX_EXPONENT = 100
+_MAX_POWER_BASE = 1e6
+
+
+def calculator(expression):
+    """Evaluate a plain arithmetic expression without eval()"""
+    def _eval(node):
+        if isinstance(node, ast.Expression):
+            return _eval(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            left, right = _eval(node.left), _eval(node.right)
+            if isinstance(node.op, ast.Pow) and (abs(right) > _MAX_EXPONENT or abs(left) > _MAX_POWER_BASE):
+                raise ValueError(f"Exponentiation out of range: {expression}")
+            return _OPERATORS[type(node.op)](left, right)
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+            return _OPERATORS[type(node.op)](_eval(node.operand))
+        raise ValueError(f"Unsupported expression: {expression}")
+    return _eval(ast.parse(expression, mode="eval"))
+
+
+DEFAULT_TOOLS = {"calculator": calculator}
+
+
+def build_plan(query, latency_ms=0.0, timeout_s=None):
+    """Decompose a question into parallel retrieval tasks plus a final synthesis step.
+
+    A plan is a list of task dicts: {"id", "type", "depends_on", ...}. Types are
+    "retrieve" (needs "query"), "tool" (needs "tool" and "args") and "generate".
+    """
+    sub_queries = decompose_query(query)
+    plan = []
+    for i, sub_query in enumerate(sub_queries, 1):
+        plan.append({"id": f"retrieve_{i}", "type": "retrieve", "query": sub_query,
+                     "depends_on": [], "latency_ms": latency_ms, "timeout_s": timeout_s})
+    plan.append({"id": "synthesize", "type": "generate", "query": query,
+                 "depends_on": [task["id"] for task in plan], "latency_ms": latency_ms,
+                 "timeout_s": timeout_s})
+    return plan
+
+
+def dependency_order(plan):
+    """Topological order of task ids (stable with respect to plan order)"""
+    ids = [task["id"] for task in plan]
+    pending = {task["id"]: set(task.get("depends_on", [])) for task in plan}
+    unknown = {dep for deps in pending.values() for dep in deps} - set(ids)
+    if unknown:
+        raise ValueError(f"Plan depends on unknown tasks: {sorted(unknown)}")
+    order = []
+    while pending:
+        ready = [task_id for task_id in ids if task_id in pending and not pending[task_id]]
+        if not ready:
+            raise ValueError(f"Plan has a dependency cycle among: {sorted(pending)}")
+        for task_id in ready:
+            order.append(task_id)
+            del pending[task_id]
+        for deps in pending.values():
+            deps.difference_update(ready)
+    return order
+
+
+def critical_path(plan, durations):
+    """Longest dependency chain by measured duration -> (time_ms, [task ids])"""
+    by_id = {task["id"]: task for task in plan}
+    finish, previous = {}, {}
+    for task_id in dependency_order(plan):
+        deps = by_id[task_id].get("depends_on", [])
+        before = max(deps, key=lambda d: finish[d], default=None)
+        finish[task_id] = durations.get(task_id, 0.0) + (finish[before] if before else 0.0)
+        previous[task_id] = before
+    if not finish:
+        return 0.0, []
+    last = max(finish, key=finish.get)
+    path = []
+    while last is not None:
+        path.append(last)
+        last = previous[last]
+    return finish[path[0]], path[::-1]
+
+
+class PlanExecutor:
+    """Run a decomposed query plan concurrently with asyncio.
+
+    Independent tasks run in parallel under a concurrency limit; each task waits only for its own
+    dependencies and gets its own timeout. Blocking work (retrieval, tools) runs in worker threads.
+    A task whose dependency failed is skipped rather than run on partial input.
+    """
+
+    def __init__(self, pipeline, tools=None, max_concurrency=4, default_timeout_s=5.0, k=3):
+        self.pipeline = pipeline
+        self.tools = dict(DEFAULT_TOOLS, **(tools or {}))
+        self.max_concurrency = max_concurrency
+        self.default_timeout_s = default_timeout_s
+        self.k = k
+
+    def _resolve(self, text, results):
+        """Fill {task_id} placeholders with the output of finished dependencies"""
+        def _replace(match):
+            result = results.get(match.group(1))
+            if result is None or result["status"] != "ok":
+                return match.group(0)
+            output = result["output"]
+            if isinstance(output, list):
+                return output[0]["title"] if output else ""
+            return str(output)
+        return _PLACEHOLDER_RE.sub(_replace, text)
+
+    def _work(self, task, results):
+        kind = task["type"]
+        if kind == "retrieve":
+            return self.pipeline.retrieve(self._resolve(task["query"], results), k=task.get("k", self.k))
+        if kind == "tool":
+            args = task.get("args", "")
+            if isinstance(args, str):
+                return self.tools[task["tool"]](self._resolve(args, results))
+            return self.tools[task["tool"]](**args)
+        if kind == "generate":
+            passages = {}
+            for dep in task.get("depends_on", []):
+                output = results[dep]["output"]
+                for passage in output if isinstance(output, list) else []:
+                    if passage["score"] > passages.get(passage["doc_id"], {"score": -1.0})["score"]:
+                        passages[passage["doc_id"]] = passage
+            ranked = sorted(passages.values(), key=lambda p: p["score"], reverse=True)
+            return self.pipeline.generate(task["query"], ranked, max_sentences=task.get("max_sentences", 4))
+        raise ValueError(f"Unknown task type: {kind}")
+
+    async def _run_task(self, task, results, done, semaphore, t0):
+        deps = task.get("depends_on", [])
+        for dep in deps:
+            await done[dep].wait()
+        failed = [dep for dep in deps if results[dep]["status"] != "ok"]
+        if failed:
+            now = (time.perf_counter() - t0) * 1000
+            results[task["id"]] = {"status": "skipped", "output": None, "error": f"dependency failed: {failed}",
+                                   "start_ms": now, "end_ms": now, "duration_ms": 0.0}
+            done[task["id"]].set()
+            return
+
+        timeout_s = task.get("timeout_s") or self.default_timeout_s
+        async with semaphore:
+            start = time.perf_counter()
+            status, output, error = "ok", None, None
+            try:
+                output = await asyncio.wait_for(self._timed_work(task, results), timeout_s)
+            except asyncio.TimeoutError:
+                status, error = "timeout", f"exceeded {timeout_s:.2f}s"
+            except Exception as exc:
+                status, error = "error", f"{type(exc).__name__}: {exc}"
+            end = time.perf_counter()
+        results[task["id"]] = {"status": status, "output": output, "error": error,
+                               "start_ms": (start - t0) * 1000, "end_ms": (end - t0) * 1000,
+                               "duration_ms": (end - start) * 1000}
+        done[task["id"]].set()
+
+    async def _timed_work(self, task, results):
+        # Simulated network / model latency, so plans behave like calls to remote services
+        if task.get("latency_ms"):
+            await asyncio.sleep(task["latency_ms"] / 1000)
+        return await asyncio.to_thread(self._work, task, results)
+
+    async def execute(self, plan):
+        order = dependency_order(plan)
+        by_id = {task["id"]: task for task in plan}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        done = {task_id: asyncio.Event() for task_id in order}
+        results = {}
+        t0 = time.perf_counter()
+        await asyncio.gather(*(self._run_task(by_id[task_id], results, done, semaphore, t0)
+                               for task_id in order))
+        wall_ms = (time.perf_counter() - t0) * 1000
+
+        durations = {task_id: results[task_id]["duration_ms"] for task_id in order}
+        path_ms, path = critical_path(plan, durations)
+        final = next((results[t]["output"] for t in reversed(order)
+                      if by_id[t]["type"] == "generate" and results[t]["status"] == "ok"), None)
+        return {
+            "answer": final,
+            "tasks": [dict(results[task_id], id=task_id, type=by_id[task_id]["type"]) for task_id in order],
+            "wall_ms": wall_ms,
+            "sum_task_ms": sum(durations.values()),
+            "critical_path_ms": path_ms,
+            "critical_path": path,
+        }
+
+    def run(self, plan):
+        return asyncio.run(self.execute(plan))
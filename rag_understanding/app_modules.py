@@ -6,6 +6,15 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import math
 import random
+import time
+
+from graph_rag_engine import build_sample_graph, build_random_graph, extract_query_entities, graph_retrieve
+from rag_pipeline import SAMPLE_CORPUS, LocalRAGPipeline
+from adaptive_router import AdaptiveRouter, ROUTES, ROUTE_LABELS
+from agentic_executor import PlanExecutor, build_plan
+from self_rag import ReflectionCache, SelfRAGController
+from multimodal_index import SAMPLE_SCENES, build_sample_store
+from context_builder import ContextBuilder, with_near_duplicates
 
 def show_rag_fundamentals():
     st.markdown('<h2 class="section-header">🔍 RAG Fundamentals</h2>', unsafe_allow_html=True)
@@ -593,6 +602,85 @@ def show_naive_rag():
         - Information Retrieval: Find and present relevant information
         - Simple Chatbots: Basic conversational interfaces
         """)
+    
+    show_context_assembly_demo()
+
+@st.cache_resource
+def get_duplicated_pipeline(copies):
+    return LocalRAGPipeline(with_near_duplicates(SAMPLE_CORPUS, copies=copies))
+
+def show_context_assembly_demo():
+    st.markdown("---")
+    st.markdown("#### 🧪 Try It: Token-Budgeted Context Assembly")
+    
+    st.markdown("""
+    Naive RAG pastes every retrieved chunk into the prompt. The context builder instead drops
+    near-duplicate chunks (SimHash or MinHash), orders the rest with Maximal Marginal Relevance (MMR)
+    so each added chunk brings new information, and stops at a fixed token budget.
+    """)
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        query = st.text_input("Question:", "How many vacation days do I get and how do I request them?",
+                              key="context_query")
+        k = st.slider("Chunks retrieved:", 1, 20, 10, key="context_k")
+        copies = st.slider("Near-duplicate copies of each document in the index:", 0, 3, 2)
+    
+    with col2:
+        token_budget = st.slider("Context token budget:", 50, 1000, 200, step=25)
+        mmr_lambda = st.slider("MMR λ (1 = relevance only, 0 = diversity only):", 0.0, 1.0, 0.7, 0.05)
+        dedupe = st.radio("Near-duplicate detection:", ["simhash", "minhash", "none"], horizontal=True)
+    
+    pipeline = get_duplicated_pipeline(copies)
+    builder = ContextBuilder(pipeline.embedder, token_budget=token_budget, mmr_lambda=mmr_lambda, dedupe=dedupe)
+    passages = pipeline.retrieve(query, k=k)
+    result = builder.build(query, passages)
+    
+    col_a, col_b, col_c, col_d = st.columns(4)
+    with col_a:
+        st.metric("Naive Context", f"{result['tokens_naive']} tokens")
+    with col_b:
+        st.metric("Assembled Context", f"{result['tokens_used']} tokens")
+    with col_c:
+        saved = result["tokens_saved_dedup"] / result["tokens_naive"] if result["tokens_naive"] else 0
+        st.metric("Saved by Dedup", f"{result['tokens_saved_dedup']} tokens",
+                  f"{saved:.0%} · {len(result['dropped_duplicates'])} duplicates")
+    with col_d:
+        st.metric("Cut by Budget", f"{result['tokens_cut_budget']} tokens",
+                  f"{len(result['dropped_budget'])} chunks", delta_color="off")
+    
+    with st.expander("Assembled context", expanded=True):
+        st.text(result["context"] or "(empty - budget too small for any chunk)")
+    
+    with st.expander("Tokens saved per query (sample questions)"):
+        sample_queries = [
+            "How do I reset my password?",
+            "What is the vacation policy?",
+            "How do I submit an expense report?",
+            "What are the side effects of this medication?",
+            "How does climate change affect crop yield?",
+            "What are the benefits of renewable energy?"
+        ]
+        rows = []
+        for sample in sample_queries:
+            sample_result = builder.build(sample, pipeline.retrieve(sample, k=k))
+            rows.append({
+                "Query": sample,
+                "Naive Tokens": sample_result["tokens_naive"],
+                "Assembled Tokens": sample_result["tokens_used"],
+                "Saved by Dedup": sample_result["tokens_saved_dedup"],
+                "Cut by Budget": sample_result["tokens_cut_budget"],
+                "Duplicates Dropped": len(sample_result["dropped_duplicates"]),
+                "Build Time (ms)": round(sum(sample_result["timings"].values()), 2)
+            })
+        df = pd.DataFrame(rows)
+        st.table(df)
+        total_naive = df["Naive Tokens"].sum()
+        if total_naive:
+            st.success(f"💡 Across these queries, near-duplicate removal saved {df['Saved by Dedup'].sum() / total_naive:.0%} "
+                       f"of the naive prompt tokens; the token budget cut another "
+                       f"{df['Cut by Budget'].sum() / total_naive:.0%}.")
 
 def show_self_rag():
     st.markdown("### Self-RAG - The Self-Reflective Approach")
@@ -759,6 +847,81 @@ def show_self_rag():
         - Educational Content: Learning materials and explanations
         - Professional Services: Legal, medical, and technical consulting
         """)
+    
+    show_self_rag_controller_demo()
+
+@st.cache_resource
+def get_reflection_cache():
+    return ReflectionCache()
+
+STOP_REASONS = {
+    "accepted": "✅ Answer passed the quality threshold",
+    "round_budget": "⏹️ Reflection round budget exhausted",
+    "time_budget": "⏱️ Wall-time budget exhausted",
+    "generator_budget": "🤖 Generator call budget exhausted",
+    "token_budget": "🪙 Prompt token budget exhausted",
+    "no_new_evidence": "🔍 Re-retrieval found no new evidence"
+}
+
+def show_self_rag_controller_demo():
+    st.markdown("---")
+    st.markdown("#### 🧪 Try It: Budgeted Self-RAG Controller")
+    
+    st.markdown("""
+    Generate → reflect → re-retrieve runs until the critic accepts the answer or a hard budget
+    (rounds, wall time, generator calls, prompt tokens) runs out. Reflection verdicts are cached per
+    (query, context hash), so asking the same question again skips the critic.
+    """)
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        query = st.text_input("Question:", "How does climate change affect crop yield and food prices?",
+                              key="self_rag_query")
+        quality_threshold = st.slider("Quality threshold:", 0.0, 1.0, 0.75, 0.05)
+        max_rounds = st.slider("Max reflection rounds:", 1, 10, 3)
+        max_wall_ms = st.slider("Wall-time budget (ms):", 100, 5000, 1500, step=100)
+    
+    with col2:
+        max_generator_calls = st.slider("Max generator calls:", 1, 10, 3)
+        max_prompt_tokens = st.slider("Prompt token budget:", 100, 5000, 2000, step=100)
+        generation_delay_ms = st.slider("Simulated LLM latency per call (ms):", 0, 1000, 200, step=50)
+        reflection_delay_ms = st.slider("Simulated critic latency per call (ms):", 0, 1000, 150, step=50)
+    
+    if st.button("Run Self-RAG"):
+        pipeline = LocalRAGPipeline(generation_delay_ms=generation_delay_ms)
+        controller = SelfRAGController(
+            pipeline, max_rounds=max_rounds, max_wall_ms=max_wall_ms,
+            max_generator_calls=max_generator_calls, max_prompt_tokens=max_prompt_tokens,
+            quality_threshold=quality_threshold, reflection_delay_ms=reflection_delay_ms,
+            cache=get_reflection_cache()
+        )
+        result = controller.run(query)
+        
+        col_a, col_b, col_c, col_d = st.columns(4)
+        with col_a:
+            st.metric("Rounds", len(result["rounds"]))
+        with col_b:
+            st.metric("Generator Calls", result["generator_calls"])
+        with col_c:
+            st.metric("Wall Time", f"{result['wall_ms']:.0f} ms")
+        with col_d:
+            st.metric("Reflection Cache Hit Rate", f"{result['cache_hit_rate']:.0%}")
+        
+        st.info(f"**Stopped because**: {STOP_REASONS.get(result['stop_reason'], result['stop_reason'])}")
+        
+        rounds = pd.DataFrame(result["rounds"])
+        if not rounds.empty:
+            st.dataframe(rounds.round(3).rename(columns={
+                "round": "Round", "k": "k", "passages": "Passages", "prompt_tokens": "Prompt Tokens",
+                "generate_ms": "Generate (ms)", "reflect_ms": "Reflect (ms)",
+                "reflection_cached": "Cached Verdict", "relevance": "Relevance",
+                "support": "Support", "score": "Score", "retrieve_ms": "Re-retrieve (ms)"
+            }), use_container_width=True, hide_index=True)
+        
+        st.markdown("**Final answer**")
+        st.success(result["answer"] or "No answer generated within budget.")
+        st.caption("Run the same question again to see the reflection cache skip the critic.")
 
 def show_multimodal_rag():
     st.markdown("### Multimodal RAG - The Multi-Sensory Approach")
@@ -905,6 +1068,76 @@ def show_multimodal_rag():
         - Educational Content: Interactive learning with multimedia
         - Medical Diagnosis: Analyze medical images with textual reports
         """)
+    
+    show_multimodal_index_demo()
+
+@st.cache_resource
+def get_multimodal_store(n_items):
+    return build_sample_store(n_items)
+
+def show_multimodal_index_demo():
+    st.markdown("---")
+    st.markdown("#### 🧪 Try It: Multimodal Index with Late Fusion")
+    
+    st.markdown("""
+    Text, image and audio vectors live in **separate sub-indexes** (each with its own dimension) that
+    share one item id space. A cross-modal query is sent to every sub-index in parallel, the union of
+    candidates is rescored in each modality, and the scores are fused.
+    """)
+    
+    col1, col2 = st.columns([1, 1])
+    
+    scene_names = [scene for scene, _ in SAMPLE_SCENES]
+    
+    with col1:
+        n_items = st.select_slider("Collection size:", [1_000, 10_000, 50_000, 100_000, 200_000], value=10_000)
+        text_query = st.text_input("Text query:", "misty forest path", key="multimodal_text")
+        image_query = st.selectbox("Query image (looks like):", ["(none)"] + scene_names, index=4)
+        audio_query = st.selectbox("Query audio clip (sounds like):", ["(none)"] + scene_names)
+    
+    with col2:
+        text_weight = st.slider("Text weight:", 0.0, 2.0, 1.0, 0.1)
+        image_weight = st.slider("Image weight:", 0.0, 2.0, 1.0, 0.1)
+        audio_weight = st.slider("Audio weight:", 0.0, 2.0, 0.5, 0.1)
+        fusion = st.radio("Fusion:", ["Weighted score sum", "Reciprocal rank fusion"], horizontal=True)
+    
+    if st.button("Search All Modalities"):
+        with st.spinner("Building / loading the multimodal collection..."):
+            store = get_multimodal_store(n_items)
+        
+        queries = {
+            "text": store.text_embedder.embed_one(text_query) if text_query.strip() else None,
+            "image": store.scene_prototypes[image_query]["image"] if image_query != "(none)" else None,
+            "audio": store.scene_prototypes[audio_query]["audio"] if audio_query != "(none)" else None
+        }
+        weights = {"text": text_weight, "image": image_weight, "audio": audio_weight}
+        results, stats = store.search(queries, k=10, weights=weights,
+                                      fusion="rrf" if fusion == "Reciprocal rank fusion" else "weighted")
+        
+        col_a, col_b, col_c = st.columns(3)
+        with col_a:
+            st.metric("Total Query Time", f"{stats['total_ms']:.1f} ms")
+        with col_b:
+            st.metric("Parallel Fan-out", f"{stats['search_ms']:.1f} ms")
+        with col_c:
+            st.metric("Late Fusion", f"{stats['fusion_ms']:.2f} ms")
+        
+        st.markdown("**Per-modality sub-indexes**")
+        queried = stats["modalities"]
+        st.table(pd.DataFrame([{
+            "Modality": row["modality"],
+            "Dimensions": row["dim"],
+            "Vectors": f"{row['rows']:,}",
+            "Memory (MB)": round(row["memory_mb"], 1),
+            "Query Latency (ms)": round(queried[row["modality"]]["latency_ms"], 2) if row["modality"] in queried else None
+        } for row in store.modality_stats()]))
+        
+        st.markdown("**Fused results**")
+        if results:
+            st.dataframe(pd.DataFrame(results).drop(columns=["item_id"]).round(3),
+                         use_container_width=True, hide_index=True)
+        else:
+            st.warning("⚠️ No results - provide a query for at least one modality.")
 
 def show_hyde_rag():
     st.markdown("### HyDE RAG - The 'Guess First' Approach")
@@ -1374,6 +1607,104 @@ def show_graph_rag():
         - Recommendation Systems: Content recommendation based on relationships
         - Financial Analysis: Company relationships and market connections
         """)
+    
+    show_graph_traversal_demo()
+
+@st.cache_resource
+def get_sample_graph():
+    return build_sample_graph()
+
+@st.cache_resource
+def get_random_graph(n_nodes, n_edges):
+    return build_random_graph(n_nodes, n_edges)
+
+def show_graph_traversal_demo():
+    st.markdown("---")
+    st.markdown("#### 🧪 Try It: Graph Traversal Engine")
+    
+    st.markdown("""
+    The knowledge graph below is stored as CSR adjacency arrays (row pointers + neighbour ids + edge types),
+    with entity names interned to integer ids. Query entities are expanded with a bounded k-hop BFS or
+    personalized PageRank, and the expanded entities rank the documents that mention them.
+    """)
+    
+    graph = get_sample_graph()
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        query = st.text_input("Ask a question:", "How does climate change affect food security?",
+                              key="graph_rag_query")
+        method = st.radio("Expansion method:", ["k-hop BFS", "Personalized PageRank"],
+                          horizontal=True, key="graph_rag_method")
+        hops = st.slider("Max hops:", 1, 4, 2, key="graph_rag_hops")
+        relation_names = [graph.relations.name(i) for i in range(len(graph.relations))]
+        allowed = st.multiselect("Edge types to follow:", relation_names, default=relation_names,
+                                 key="graph_rag_relations")
+    
+    seeds = extract_query_entities(query, graph)
+    edge_types = graph.relation_ids(allowed) if len(allowed) < len(relation_names) else None
+    method_key = "ppr" if method == "Personalized PageRank" else "bfs"
+    documents, nodes, scores, stats = graph_retrieve(graph, seeds, method=method_key, k=hops,
+                                                     edge_types=edge_types)
+    
+    with col2:
+        if not seeds:
+            st.warning("No known entities found in the question. Try mentioning e.g. 'crop yield' or 'fossil fuels'.")
+        else:
+            st.write("**Query entities**:", ", ".join(graph.entities.name(i) for i in seeds))
+            
+            col_a, col_b, col_c = st.columns(3)
+            with col_a:
+                st.metric("Nodes Touched", stats["nodes_touched"])
+            with col_b:
+                st.metric("Edges Scanned", stats["edges_scanned"])
+            with col_c:
+                st.metric("Traversal Time", f"{stats['time_ms']:.2f} ms")
+            
+            expanded = pd.DataFrame({
+                "Entity": [graph.entities.name(int(n)) for n in nodes],
+                "Score": np.round(scores, 3)
+            }).sort_values("Score", ascending=False)
+            st.dataframe(expanded, use_container_width=True, hide_index=True)
+            
+            st.markdown("**Retrieved documents**:")
+            for doc_id, score in documents:
+                st.write(f"- {graph.doc_titles[doc_id]} (graph score: {score:.3f})")
+    
+    with st.expander("⚡ Scale test: traversal on a synthetic entity graph"):
+        col1, col2 = st.columns(2)
+        with col1:
+            n_nodes = st.select_slider("Entities:", [10_000, 100_000, 500_000, 1_000_000], value=100_000)
+        with col2:
+            n_edges = st.select_slider("Edges:", [100_000, 500_000, 1_000_000, 2_000_000], value=1_000_000)
+        max_nodes = st.slider("Max nodes per traversal:", 1_000, 100_000, 20_000, step=1_000)
+        
+        if st.button("Run Traversal Benchmark"):
+            start = time.perf_counter()
+            big_graph = get_random_graph(n_nodes, n_edges)
+            build_ms = (time.perf_counter() - start) * 1000
+            
+            rng = np.random.default_rng(0)
+            rows = []
+            for method_key in ["bfs", "ppr"]:
+                for k in [1, 2, 3]:
+                    seeds = rng.integers(0, n_nodes, 3)
+                    _, _, _, stats = graph_retrieve(big_graph, seeds, method=method_key, k=k,
+                                                    max_nodes=max_nodes)
+                    rows.append({
+                        "Method": "BFS" if method_key == "bfs" else "PPR",
+                        "Hops": k,
+                        "Nodes Touched": stats["nodes_touched"],
+                        "Edges Scanned": stats["edges_scanned"],
+                        "Traversal (ms)": round(stats["time_ms"], 2),
+                        "Doc Ranking (ms)": round(stats["retrieval_ms"], 2)
+                    })
+            
+            st.write(f"Graph: {big_graph.n_nodes:,} entities, {big_graph.n_edges:,} directed edges, "
+                     f"{big_graph.memory_bytes() / 1024**2:.1f} MB of arrays "
+                     f"(load/build: {build_ms:.0f} ms, cached afterwards)")
+            st.table(pd.DataFrame(rows))
 
 def show_hybrid_rag():
     st.markdown("### Hybrid RAG - The Best of All Worlds")
@@ -1704,6 +2035,80 @@ def show_adaptive_rag():
         - Research Tools: Handle varying research complexity
         - Customer Support: Adapt responses to query complexity
         """)
+    
+    show_adaptive_router_demo()
+
+@st.cache_resource
+def get_local_pipeline():
+    return LocalRAGPipeline()
+
+def show_adaptive_router_demo():
+    st.markdown("---")
+    st.markdown("#### 🧪 Try It: Query Complexity Router")
+    
+    st.markdown("""
+    Each query is scored with cheap features (length, entity count, keyword rarity, number of clauses)
+    and dispatched to **no retrieval**, **single-shot retrieval** or **multi-step retrieval**.
+    Simple FAQ lookups never pay for decomposition and follow-up searches.
+    """)
+    
+    default_queries = "\n".join([
+        "Hi there!",
+        "How do I reset my password?",
+        "What is the vacation policy?",
+        "How many paid holidays do we get?",
+        "How do I submit an expense report?",
+        "What are the side effects of this medication?",
+        "Can I work remotely?",
+        "Thanks for the help",
+        "How does climate change affect crop yield and food prices, and what is the impact on the global economy?",
+        "Compare renewable energy costs and emissions versus fossil fuels"
+    ])
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        queries = st.text_area("Query log (one per line):", default_queries, height=250,
+                               key="adaptive_router_queries")
+        low_threshold = st.slider("No-retrieval threshold:", 0.0, 1.0, 0.2, 0.05)
+        high_threshold = st.slider("Multi-step threshold:", 0.0, 1.0, 0.55, 0.05)
+        repeats = st.slider("Replay log N times:", 1, 50, 10)
+    
+    router = AdaptiveRouter(get_local_pipeline(), low_threshold=low_threshold,
+                            high_threshold=max(high_threshold, low_threshold))
+    query_list = [q.strip() for q in queries.splitlines() if q.strip()]
+    
+    results = []
+    for _ in range(repeats):
+        results = [router.run(q) for q in query_list]
+    
+    with col2:
+        st.markdown("**Routing decisions**")
+        decisions = pd.DataFrame([{
+            "Query": r["query"],
+            "Route": ROUTE_LABELS[r["route"]],
+            "Complexity": r["complexity"],
+            "Retrievals": r["retrieval_calls"],
+            "Latency (ms)": round(r["latency_ms"], 3)
+        } for r in results])
+        st.dataframe(decisions, use_container_width=True, hide_index=True)
+    
+    st.markdown("**Per-route statistics** (use these to tune the thresholds)")
+    stats = pd.DataFrame(router.route_stats())
+    stats["route"] = stats["route"].map(ROUTE_LABELS)
+    stats["share"] = (stats["share"] * 100).round(1).astype(str) + "%"
+    st.table(stats.rename(columns={
+        "route": "Route", "queries": "Queries", "share": "Traffic Share", "p50_ms": "p50 (ms)",
+        "p95_ms": "p95 (ms)", "mean_retrievals": "Retrievals/Query", "hit_rate": "Hit Rate"
+    }))
+    
+    log = pd.DataFrame(list(router.log))
+    if not log.empty:
+        fig = px.box(log, x="route", y="latency_ms", color="route",
+                     category_orders={"route": ROUTES},
+                     labels={"route": "Route", "latency_ms": "Latency (ms)"},
+                     title="Latency Distribution by Route")
+        st.plotly_chart(fig, use_container_width=True)
 
 def show_agentic_rag():
     st.markdown("### Agentic RAG - The Team of Experts")
@@ -1878,6 +2283,88 @@ def show_agentic_rag():
         - Strategic Planning: Complex decision-making scenarios
         - Educational Research: Comprehensive learning assistance
         """)
+    
+    show_parallel_executor_demo()
+
+def show_parallel_executor_demo():
+    st.markdown("---")
+    st.markdown("#### 🧪 Try It: Parallel Sub-Query Executor")
+    
+    st.markdown("""
+    The question is decomposed into a plan of sub-retrievals and tool calls. Independent tasks run
+    concurrently with asyncio under a concurrency limit and per-task timeouts; each task waits only
+    for its own dependencies, and results are merged in dependency order.
+    """)
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        query = st.text_area(
+            "Multi-part question:",
+            "How does climate change affect crop yield? What is the impact on the global economy? "
+            "How many vacation days do employees get, and how do I submit an expense report?",
+            key="agentic_query"
+        )
+        max_concurrency = st.slider("Max concurrent tasks:", 1, 8, 4)
+        latency_ms = st.slider("Simulated latency per retrieval/LLM call (ms):", 0, 2000, 500, step=50)
+        timeout_s = st.slider("Per-task timeout (s):", 0.1, 5.0, 3.0, 0.1)
+        add_tool = st.checkbox("Add a calculator tool call (total leave days: 15 vacation + 10 holidays)", value=True)
+    
+    plan = build_plan(query, latency_ms=latency_ms, timeout_s=timeout_s)
+    if add_tool:
+        plan.insert(-1, {"id": "calculator", "type": "tool", "tool": "calculator", "args": "15 + 10",
+                         "depends_on": [], "latency_ms": latency_ms / 5, "timeout_s": timeout_s})
+    
+    with col2:
+        st.markdown("**Query plan**")
+        st.dataframe(pd.DataFrame([{
+            "Task": task["id"],
+            "Type": task["type"],
+            "Input": task.get("query") or task.get("args"),
+            "Depends On": ", ".join(task["depends_on"]) or "-"
+        } for task in plan]), use_container_width=True, hide_index=True)
+    
+    if st.button("Run Plan"):
+        with st.spinner("Executing plan..."):
+            sequential = PlanExecutor(get_local_pipeline(), max_concurrency=1).run(plan)
+            parallel = PlanExecutor(get_local_pipeline(), max_concurrency=max_concurrency).run(plan)
+        
+        col_a, col_b, col_c, col_d = st.columns(4)
+        with col_a:
+            st.metric("Sequential Wall Time", f"{sequential['wall_ms']:.0f} ms")
+        with col_b:
+            st.metric("Parallel Wall Time", f"{parallel['wall_ms']:.0f} ms",
+                      f"{parallel['wall_ms'] - sequential['wall_ms']:.0f} ms", delta_color="inverse")
+        with col_c:
+            st.metric("Sum of Task Times", f"{parallel['sum_task_ms']:.0f} ms")
+        with col_d:
+            st.metric("Critical Path", f"{parallel['critical_path_ms']:.0f} ms")
+        
+        st.caption(f"Critical path: {' → '.join(parallel['critical_path'])}. "
+                   "With enough concurrency the wall time approaches the critical path, not the sum of task times.")
+        
+        fig = go.Figure()
+        for label, run in [("Sequential", sequential), ("Parallel", parallel)]:
+            for task in run["tasks"]:
+                fig.add_trace(go.Bar(
+                    y=[f"{label}: {task['id']}"],
+                    x=[max(task["duration_ms"], 1)],
+                    base=[task["start_ms"]],
+                    orientation="h",
+                    marker_color={"ok": "#28a745", "timeout": "#ffc107"}.get(task["status"], "#dc3545"),
+                    hovertext=f"{task['status']} ({task['duration_ms']:.0f} ms)",
+                    showlegend=False
+                ))
+        fig.update_layout(title="Task Timeline", xaxis_title="Time since start (ms)",
+                          yaxis=dict(autorange="reversed"), height=120 + 30 * len(plan) * 2)
+        st.plotly_chart(fig, use_container_width=True)
+        
+        failures = [t for t in parallel["tasks"] if t["status"] != "ok"]
+        for task in failures:
+            st.warning(f"{task['id']}: {task['status']} - {task['error']}")
+        
+        st.markdown("**Merged answer**")
+        st.info(parallel["answer"] or "No answer - the synthesis step did not complete.")
 
 # Import advanced modules
 from advanced_modules import (
@@ -0,0 +1,161 @@
+import math
+import time
+
+import numpy as np
+
+# Recall@10 commonly reached with default parameters (flat is exact; binary assumes no float rescoring)
+TYPICAL_RECALL = {"flat": 1.0, "hnsw": 0.97, "ivf_pq": 0.90, "binary": 0.80}
+
+INDEX_LABELS = {
+    "flat": "Flat (exact)",
+    "hnsw": "HNSW",
+    "ivf_pq": "IVF-PQ",
+    "binary": "Binary (1 bit/dim)",
+}
+
+DEFAULT_NODE = {"memory_gb": 64, "vcpus": 8, "hourly_usd": 0.50}
+
+HOURS_PER_MONTH = 730
+
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(words):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    return _BYTE_POPCOUNT[words.view(np.uint8)].reshape(*words.shape, -1).sum(axis=-1)
+
+
+def _best_time(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def calibrate(dim=384, n=20000, repeats=5, seed=0):
+    """Micro-benchmark the inner loops each index type spends its query time in, on this machine.
+
+    Returns nanoseconds per unit of work:
+    - scan_ns: per float dimension in a sequential matrix-vector scan (flat)
+    - gather_ns: per float dimension for randomly accessed vectors (graph traversal, rescoring)
+    - pq_ns: per sub-quantizer table lookup (IVF-PQ asymmetric distance)
+    - hamming_ns: per 64-bit word XOR + popcount (binary codes)
+
+    These are numpy kernels, so plans describe what this code base would run; compiled SIMD libraries
+    such as FAISS are faster per operation, which makes the resulting plans conservative.
+    """
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    query = rng.standard_normal(dim).astype(np.float32)
+    rows = rng.integers(0, n, 2000)
+    m = max(dim // 8, 1)
+    codes = rng.integers(0, 256, (n, m), dtype=np.uint8)
+    table = rng.standard_normal((m, 256)).astype(np.float32)
+    words = rng.integers(0, 1 << 63, (n, max(dim // 64, 1)), dtype=np.uint64)
+    query_words = words[0]
+
+    scan_s = _best_time(lambda: vectors @ query, repeats)
+    gather_s = _best_time(lambda: vectors[rows] @ query, repeats)
+    pq_s = _best_time(lambda: table[np.arange(m), codes].sum(axis=1), repeats)
+    hamming_s = _best_time(lambda: _popcount(words ^ query_words).sum(axis=1), repeats)
+    return {
+        "scan_ns": scan_s * 1e9 / (n * dim),
+        "gather_ns": gather_s * 1e9 / (len(rows) * dim),
+        "pq_ns": pq_s * 1e9 / (n * m),
+        "hamming_ns": hamming_s * 1e9 / words.size,
+        "dim": dim,
+        "n": n,
+    }
+
+
+def index_memory_bytes(index_type, n_vectors, dim, hnsw_m=16, pq_bytes=None, nlist=None):
+    """Resident memory of one full copy of the index, including 8-byte ids"""
+    ids = 8 * n_vectors
+    if index_type == "flat":
+        return n_vectors * dim * 4 + ids
+    if index_type == "hnsw":
+        # base layer has 2M int32 links per node; upper layers add roughly 1/M more
+        links = n_vectors * 2 * hnsw_m * 4 * (1 + 1 / hnsw_m)
+        return n_vectors * dim * 4 + links + ids
+    if index_type == "ivf_pq":
+        pq_bytes = pq_bytes or max(dim // 8, 1)
+        nlist = nlist or _default_nlist(n_vectors)
+        codebooks = 256 * dim * 4
+        return n_vectors * pq_bytes + nlist * dim * 4 + codebooks + ids
+    if index_type == "binary":
+        return n_vectors * math.ceil(dim / 64) * 8 + ids
+    raise ValueError(f"Unknown index type: {index_type}")
+
+
+def _default_nlist(n_vectors):
+    return max(int(4 * math.sqrt(n_vectors)), 1)
+
+
+def query_latency_ms(index_type, n_vectors, dim, calibration, hnsw_m=16, ef_search=64,
+                     pq_bytes=None, nlist=None, nprobe=16, rerank=100):
+    """Single-core search latency from the calibrated per-operation costs"""
+    if n_vectors <= 0:
+        return 0.0
+    if index_type == "flat":
+        ns = n_vectors * dim * calibration["scan_ns"]
+    elif index_type == "hnsw":
+        # greedy descent through ~log2(N) upper-layer hops, then ef_search expansions of 2M neighbours
+        visited = min(n_vectors, ef_search * 2 * hnsw_m + hnsw_m * math.log2(max(n_vectors, 2)))
+        ns = visited * dim * calibration["gather_ns"]
+    elif index_type == "ivf_pq":
+        pq_bytes = pq_bytes or max(dim // 8, 1)
+        nlist = nlist or _default_nlist(n_vectors)
+        scanned = n_vectors * min(nprobe / nlist, 1.0)
+        ns = (nlist * dim * calibration["scan_ns"] + scanned * pq_bytes * calibration["pq_ns"]
+              + min(rerank, n_vectors) * dim * calibration["gather_ns"])
+    elif index_type == "binary":
+        ns = n_vectors * math.ceil(dim / 64) * calibration["hamming_ns"]
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
+    return ns / 1e6
+
+
+def plan_capacity(n_vectors, dim, qps, latency_slo_ms, calibration, node=None, memory_headroom=0.7,
+                  cpu_utilization=0.6, min_replicas=1, index_types=None, max_shards=4096):
+    """Size a deployment for every index type.
+
+    Shards are added until one shard fits in node memory (with headroom) and its single-query
+    latency meets the SLO; replicas of the shard set are then added until the fleet serves `qps`
+    at the target CPU utilization (every query fans out to all shards of one replica).
+    """
+    node = dict(DEFAULT_NODE, **(node or {}))
+    node_bytes = node["memory_gb"] * 1024 ** 3 * memory_headroom
+    rows = []
+    for index_type in index_types or INDEX_LABELS:
+        memory = index_memory_bytes(index_type, n_vectors, dim)
+        shards = max(math.ceil(memory / node_bytes), 1)
+        latency = query_latency_ms(index_type, math.ceil(n_vectors / shards), dim, calibration)
+        while latency > latency_slo_ms and shards < max_shards:
+            shards = min(max(shards + 1, math.ceil(shards * latency / latency_slo_ms)), max_shards)
+            latency = query_latency_ms(index_type, math.ceil(n_vectors / shards), dim, calibration)
+        qps_per_replica = node["vcpus"] * cpu_utilization * 1000 / latency if latency else float("inf")
+        replicas = max(math.ceil(qps / qps_per_replica), min_replicas)
+        nodes = shards * replicas
+        rows.append({
+            "index_type": index_type,
+            "index": INDEX_LABELS[index_type],
+            "memory_gb": memory / 1024 ** 3,
+            "latency_ms": latency,
+            "meets_slo": latency <= latency_slo_ms,
+            "qps_per_replica": qps_per_replica,
+            "shards": shards,
+            "replicas": replicas,
+            "nodes": nodes,
+            "monthly_usd": nodes * node["hourly_usd"] * HOURS_PER_MONTH,
+            "typical_recall": TYPICAL_RECALL[index_type],
+        })
+    return rows
+
+
+def recommend(rows, min_recall=0.0):
+    """Cheapest plan that meets the latency SLO and the recall floor (None if nothing does)"""
+    eligible = [row for row in rows if row["meets_slo"] and row["typical_recall"] >= min_recall]
+    return min(eligible, key=lambda row: (row["monthly_usd"], -row["typical_recall"])) if eligible else None
@@ -0,0 +1,249 @@
+import re
+import time
+
+import numpy as np
+
+from rag_pipeline import SAMPLE_CORPUS, HashingEmbedder, VectorIndex
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Questions about the sample handbook with the exact answer span each must retrieve
+SAMPLE_QA = [
+    {"question": "How many days of paid vacation do employees get per year?", "answer": "15 days of paid vacation per year"},
+    {"question": "How many vacation days after 5 years of service?", "answer": "increases to 20 days after 5 years of service"},
+    {"question": "How far in advance must vacation requests be submitted?", "answer": "at least 2 weeks in advance"},
+    {"question": "How many paid holidays does the company observe?", "answer": "observes 10 paid holidays per year"},
+    {"question": "How do I reset my password?", "answer": "click 'Forgot Password'"},
+    {"question": "How long until a locked account unlocks?", "answer": "unlock automatically after 30 minutes"},
+    {"question": "What is the minimum password length?", "answer": "at least 8 characters"},
+    {"question": "Within how many days must expense reports be submitted?", "answer": "within 30 days of incurring expenses"},
+    {"question": "How are reimbursements paid?", "answer": "issued via direct deposit"},
+    {"question": "How long does expense processing take?", "answer": "processed within 5-7 business days"},
+    {"question": "What are common medication side effects?", "answer": "nausea, dizziness, headache"},
+    {"question": "How much have global temperatures risen?", "answer": "about 1.1 degrees Celsius"},
+    {"question": "Which crops lose yield from rising temperatures?", "answer": "wheat, maize and rice"},
+    {"question": "How many days per week can employees work remotely?", "answer": "up to three days per week"},
+    {"question": "What is the 401k match?", "answer": "401k match of 4 percent"},
+    {"question": "How much did solar panel costs fall?", "answer": "fell by 80%"},
+]
+
+_FILLER = [
+    "This section was reviewed by the policy committee and applies to all regions unless stated otherwise.",
+    "Questions about this section can be sent to the responsible department through the intranet.",
+    "Local regulations may add requirements; where they conflict, the stricter rule applies.",
+    "Managers are responsible for making sure their teams are aware of the contents of this section.",
+]
+
+
+def build_sample_handbook(repeats=1):
+    """Long markdown-ish document built from the sample corpus, padded with realistic boilerplate"""
+    sections = []
+    for r in range(repeats):
+        for i, doc in enumerate(SAMPLE_CORPUS):
+            filler = " ".join(_FILLER[(i + j + r) % len(_FILLER)] for j in range(2))
+            sections.append(f"## {doc['title']}\n\n{filler}\n\n{doc['content']}\n\n{_FILLER[(i + r) % len(_FILLER)]}\n")
+    return "\n".join(sections)
+
+
+def iter_file_blocks(path, block_chars=1 << 16, encoding="utf-8"):
+    """Stream a text file in fixed-size blocks so huge files never sit in memory whole"""
+    with open(path, "r", encoding=encoding) as f:
+        while True:
+            block = f.read(block_chars)
+            if not block:
+                return
+            yield block
+
+
+def iter_text_blocks(text, block_chars=1 << 16):
+    for start in range(0, len(text), block_chars):
+        yield text[start:start + block_chars]
+
+
+def fixed_chunks(blocks, chunk_size=1000, chunk_overlap=200):
+    """Fixed-size character windows with overlap"""
+    if chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be smaller than chunk_size")
+    step = chunk_size - chunk_overlap
+    buffer = ""
+    for block in blocks:
+        buffer += block
+        while len(buffer) >= chunk_size:
+            yield buffer[:chunk_size]
+            buffer = buffer[step:]
+    if buffer.strip() and (len(buffer) > chunk_overlap or not chunk_overlap):
+        yield buffer
+
+
+def _iter_sentences(blocks):
+    buffer = ""
+    for block in blocks:
+        buffer += block
+        parts = _SENTENCE_END_RE.split(buffer)
+        # the last part may be an unfinished sentence that continues in the next block
+        buffer = parts.pop()
+        for sentence in parts:
+            if sentence.strip():
+                yield sentence.strip()
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def sentence_chunks(blocks, chunk_size=1000, overlap_sentences=1):
+    """Pack whole sentences into chunks of at most `chunk_size` characters"""
+    current, length = [], 0
+    for sentence in _iter_sentences(blocks):
+        if current and length + len(sentence) + 1 > chunk_size:
+            yield " ".join(current)
+            current = current[-overlap_sentences:] if overlap_sentences else []
+            length = sum(len(s) + 1 for s in current)
+        current.append(sentence)
+        length += len(sentence) + 1
+    if current:
+        yield " ".join(current)
+
+
+def _split_recursive(text, chunk_size, separators):
+    if len(text) <= chunk_size:
+        return [text]
+    for i, separator in enumerate(separators):
+        if separator == "":
+            return [text[j:j + chunk_size] for j in range(0, len(text), chunk_size)]
+        if separator in text:
+            parts = text.split(separator)
+            # keep visible separators such as the full stop in ". " attached to their piece
+            kept = separator.strip()
+            parts = [part + kept for part in parts[:-1]] + parts[-1:]
+            pieces = []
+            for part in parts:
+                pieces.extend(_split_recursive(part, chunk_size, separators[i + 1:]))
+            return pieces
+    return [text]
+
+
+def recursive_chunks(blocks, chunk_size=1000, chunk_overlap=200, separators=("\n\n", "\n", ". ", " ", "")):
+    """Split on the coarsest separator that works (paragraph > line > sentence > word), then merge
+    small pieces back up to `chunk_size` with roughly `chunk_overlap` characters carried over"""
+    buffer = ""
+    window = []
+
+    def merge(pieces):
+        nonlocal window
+        for piece in pieces:
+            piece = piece.strip()
+            if not piece:
+                continue
+            if window and sum(len(p) + 1 for p in window) + len(piece) > chunk_size:
+                yield " ".join(window)
+                while window and sum(len(p) + 1 for p in window) > chunk_overlap:
+                    window.pop(0)
+            window.append(piece)
+
+    def cut(buffer):
+        # no paragraph break yet: release everything up to the last finer separator so text without
+        # blank lines is not held whole in memory
+        for separator in separators[1:]:
+            end = buffer.rfind(separator) if separator else len(buffer) - len(buffer) % chunk_size
+            if end > 0:
+                return buffer[:end] + separator.strip(), buffer[end + len(separator):]
+        return "", buffer
+
+    for block in blocks:
+        buffer += block
+        paragraphs = buffer.split(separators[0])
+        buffer = paragraphs.pop()
+        for paragraph in paragraphs:
+            yield from merge(_split_recursive(paragraph, chunk_size, list(separators[1:])))
+        if len(buffer) > chunk_size:
+            head, buffer = cut(buffer)
+            yield from merge(_split_recursive(head, chunk_size, list(separators[1:])))
+    yield from merge(_split_recursive(buffer, chunk_size, list(separators[1:])))
+    if window:
+        yield " ".join(window)
+
+
+def semantic_chunks(blocks, chunk_size=1000, threshold=0.05, embedder=None, batch_size=64):
+    """Start a new chunk where a sentence drifts away from the running topic of the current chunk.
+
+    Sentences are embedded in batches; a boundary is placed when cosine(sentence, chunk centroid)
+    falls below `threshold` or the chunk would exceed `chunk_size` characters. The right threshold
+    depends on the embedder: sparse hashing vectors need a low one, dense sentence models ~0.5.
+    """
+    embedder = embedder or HashingEmbedder()
+    current, length, centroid = [], 0, None
+    batch = []
+
+    def flush(sentences):
+        nonlocal current, length, centroid
+        vectors = embedder.embed(sentences)
+        for sentence, vector in zip(sentences, vectors):
+            if current:
+                similarity = float(centroid @ vector / (np.linalg.norm(centroid) or 1.0))
+                if similarity < threshold or length + len(sentence) + 1 > chunk_size:
+                    yield " ".join(current)
+                    current, length, centroid = [], 0, None
+            current.append(sentence)
+            length += len(sentence) + 1
+            centroid = vector.copy() if centroid is None else centroid + vector
+
+    for sentence in _iter_sentences(blocks):
+        batch.append(sentence)
+        if len(batch) == batch_size:
+            yield from flush(batch)
+            batch = []
+    if batch:
+        yield from flush(batch)
+    if current:
+        yield " ".join(current)
+
+
+STRATEGIES = {
+    "fixed": fixed_chunks,
+    "sentence": sentence_chunks,
+    "recursive": recursive_chunks,
+    "semantic": semantic_chunks,
+}
+
+
+def _normalize(text):
+    return " ".join(text.lower().split())
+
+
+def benchmark_chunking(text, configs, qa_set=None, k=3, embedder=None, block_chars=1 << 16):
+    """Chunk, embed and index `text` once per config, then measure recall@k on the QA set.
+
+    `configs` is a list of (strategy name, kwargs). A question counts as a hit when any of the
+    top-k retrieved chunks contains its gold answer span.
+    """
+    qa_set = qa_set or SAMPLE_QA
+    embedder = embedder or HashingEmbedder()
+    question_vectors = embedder.embed([qa["question"] for qa in qa_set])
+    answers = [_normalize(qa["answer"]) for qa in qa_set]
+    rows = []
+    for name, kwargs in configs:
+        start = time.perf_counter()
+        chunks = list(STRATEGIES[name](iter_text_blocks(text, block_chars), **kwargs))
+        chunked = time.perf_counter()
+        index = VectorIndex(embedder.dim)
+        for i in range(0, len(chunks), 512):
+            index.add(embedder.embed(chunks[i:i + 512]))
+        indexed = time.perf_counter()
+
+        normalized_chunks = [_normalize(c) for c in chunks]
+        hits = 0
+        for vector, answer in zip(question_vectors, answers):
+            ids, _ = index.search(vector, k)
+            hits += any(answer in normalized_chunks[i] for i in ids)
+        ingest_s = indexed - start
+        text_bytes = sum(len(c.encode("utf-8")) for c in chunks)
+        rows.append({
+            "strategy": name,
+            "params": ", ".join(f"{key}={value}" for key, value in kwargs.items()),
+            "chunks": len(chunks),
+            "avg_chunk_chars": float(np.mean([len(c) for c in chunks])) if chunks else 0.0,
+            "index_mb": (index.vectors.nbytes + text_bytes) / 1024 ** 2,
+            "chunk_ms": (chunked - start) * 1000,
+            "ingest_mb_per_s": len(text.encode("utf-8")) / 1024 ** 2 / ingest_s if ingest_s else 0.0,
+            f"recall@{k}": hits / len(qa_set),
+        })
+    return rows
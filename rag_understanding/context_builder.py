@@ -0,0 +1,171 @@
+import hashlib
+import re
+import time
+
+import numpy as np
+
+from rag_pipeline import HashingEmbedder, tokenize
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken not installed or encoding files unavailable offline
+    _ENCODING = None
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+_MERSENNE_PRIME = (1 << 31) - 1
+
+
+def count_tokens(text):
+    """Token count with tiktoken when available, else a BPE-like local approximation.
+
+    The fallback counts punctuation as one token and splits words into ~4-character pieces,
+    which tracks cl100k_base counts on English prose to within a few percent.
+    """
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return sum(1 if not piece[0].isalnum() else (len(piece) + 3) // 4 for piece in _PIECE_RE.findall(text))
+
+
+def _shingle_hashes(text, n=3):
+    words = tokenize(text)
+    shingles = [" ".join(words[i:i + n]) for i in range(max(len(words) - n + 1, 1))]
+    return np.array([int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+                     for s in shingles], dtype=np.uint64)
+
+
+def simhash(text, n=1):
+    """64-bit SimHash fingerprint over word n-gram shingles (single words work best for short chunks)"""
+    hashes = _shingle_hashes(text, n)
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    votes = 2 * bits.sum(axis=0, dtype=np.int64) - len(hashes)
+    return sum(1 << int(i) for i in np.flatnonzero(votes > 0))
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class MinHasher:
+    """MinHash signatures for Jaccard similarity estimates between shingle sets"""
+
+    def __init__(self, num_perm=128, n=2, seed=1):
+        rng = np.random.default_rng(seed)
+        self.n = n
+        self.a = rng.integers(1, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+
+    def signature(self, text):
+        # With p = 2^31 - 1 and 32-bit inputs, a*x + b stays below 2^63, so uint64 never overflows
+        hashes = _shingle_hashes(text, self.n) & np.uint64(0xFFFFFFFF)
+        values = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % np.uint64(_MERSENNE_PRIME)
+        return values.min(axis=1)
+
+    @staticmethod
+    def jaccard(sig_a, sig_b):
+        return float(np.mean(sig_a == sig_b))
+
+
+class ContextBuilder:
+    """Assemble a prompt context that fits a token budget.
+
+    1. Near-duplicate chunks are dropped (SimHash Hamming distance or MinHash Jaccard).
+    2. Remaining chunks are ordered by Maximal Marginal Relevance (relevance vs. redundancy).
+    3. Chunks are added in MMR order while they fit the budget.
+    """
+
+    def __init__(self, embedder=None, token_budget=300, mmr_lambda=0.7, dedupe="simhash",
+                 simhash_max_distance=10, minhash_threshold=0.5):
+        self.embedder = embedder or HashingEmbedder()
+        self.token_budget = token_budget
+        self.mmr_lambda = mmr_lambda
+        self.dedupe = dedupe
+        self.simhash_max_distance = simhash_max_distance
+        self.minhash_threshold = minhash_threshold
+        self._minhasher = MinHasher() if dedupe == "minhash" else None
+
+    def _deduplicate(self, passages):
+        kept, dropped, fingerprints = [], [], []
+        for passage in passages:
+            if self.dedupe == "minhash":
+                fingerprint = self._minhasher.signature(passage["content"])
+                duplicate = any(MinHasher.jaccard(fingerprint, f) >= self.minhash_threshold for f in fingerprints)
+            elif self.dedupe == "simhash":
+                fingerprint = simhash(passage["content"])
+                duplicate = any(hamming_distance(fingerprint, f) <= self.simhash_max_distance for f in fingerprints)
+            else:
+                fingerprint, duplicate = None, False
+            if duplicate:
+                dropped.append(passage)
+            else:
+                kept.append(passage)
+                fingerprints.append(fingerprint)
+        return kept, dropped
+
+    def mmr_order(self, query, passages):
+        if not passages:
+            return []
+        vectors = self.embedder.embed([p["content"] for p in passages])
+        relevance = vectors @ self.embedder.embed_one(query)
+        similarity = vectors @ vectors.T
+        selected = []
+        remaining = list(range(len(passages)))
+        max_sim = np.full(len(passages), -np.inf)
+        while remaining:
+            redundancy = np.where(np.isinf(max_sim[remaining]), 0.0, max_sim[remaining])
+            scores = self.mmr_lambda * relevance[remaining] - (1 - self.mmr_lambda) * redundancy
+            best = remaining.pop(int(np.argmax(scores)))
+            selected.append(best)
+            max_sim = np.maximum(max_sim, similarity[best])
+        return [passages[i] for i in selected]
+
+    def build(self, query, passages):
+        timings = {}
+        start = time.perf_counter()
+        naive_tokens = sum(count_tokens(p["content"]) for p in passages)
+
+        kept, duplicates = self._deduplicate(passages)
+        deduped = time.perf_counter()
+        ordered = self.mmr_order(query, kept)
+        ordered_at = time.perf_counter()
+
+        selected, over_budget, used = [], [], 0
+        for passage in ordered:
+            tokens = count_tokens(passage["content"])
+            if used + tokens <= self.token_budget:
+                selected.append(dict(passage, tokens=tokens))
+                used += tokens
+            else:
+                over_budget.append(passage)
+        finished = time.perf_counter()
+
+        timings["dedupe_ms"] = (deduped - start) * 1000
+        timings["mmr_ms"] = (ordered_at - deduped) * 1000
+        timings["pack_ms"] = (finished - ordered_at) * 1000
+        context = "\n\n".join(f"[{i}] {p['title']}\n{p['content']}" for i, p in enumerate(selected, 1))
+        return {
+            "context": context,
+            "selected": selected,
+            "dropped_duplicates": duplicates,
+            "dropped_budget": over_budget,
+            "tokens_naive": naive_tokens,
+            "tokens_used": used,
+            # reported separately: removing duplicates is a saving, truncation to the budget drops content
+            "tokens_saved_dedup": sum(count_tokens(p["content"]) for p in duplicates),
+            "tokens_cut_budget": sum(count_tokens(p["content"]) for p in over_budget),
+            "timings": timings,
+        }
+
+
+def with_near_duplicates(documents, copies=1, seed=0):
+    """Corpus with lightly edited copies of each document, like boilerplate repeated across sources"""
+    rng = np.random.default_rng(seed)
+    result = list(documents)
+    for copy in range(1, copies + 1):
+        for doc in documents:
+            words = doc["content"].split()
+            drop = int(rng.integers(0, len(words)))
+            edited = " ".join(w for i, w in enumerate(words) if i != drop)
+            result.append({"title": f"{doc['title']} (copy {copy})", "content": edited})
+    return result
@@ -0,0 +1,232 @@
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from context_builder import count_tokens
+
+METERS = ["embedding_tokens", "prompt_tokens", "completion_tokens", "vector_reads", "cpu_seconds"]
+
+# Size of the unit each price is quoted in, and its label
+PRICE_UNITS = {
+    "embedding_tokens": (1e6, "per 1M tokens"),
+    "prompt_tokens": (1e6, "per 1M tokens"),
+    "completion_tokens": (1e6, "per 1M tokens"),
+    "vector_reads": (1e6, "per 1M read requests"),
+    "cpu_seconds": (3600, "per vCPU-hour"),
+}
+
+# USD per price unit: small hosted embedding model, GPT-3.5-class LLM, serverless vector DB reads, cloud vCPU
+DEFAULT_PRICES = {
+    "embedding_tokens": 0.02,
+    "prompt_tokens": 0.50,
+    "completion_tokens": 1.50,
+    "vector_reads": 8.25,
+    "cpu_seconds": 0.05,
+}
+
+# Which cost bucket each meter is reported under
+COST_COMPONENTS = {
+    "embedding_tokens": "Embedding",
+    "prompt_tokens": "LLM inference",
+    "completion_tokens": "LLM inference",
+    "vector_reads": "Vector database",
+    "cpu_seconds": "Compute",
+}
+
+_current_usage = contextvars.ContextVar("current_usage", default=None)
+
+
+def load_prices(path):
+    """Price table from a JSON file ({meter: usd_per_unit}); meters it leaves out keep their defaults"""
+    with open(path, "r", encoding="utf-8") as f:
+        prices = json.load(f)
+    unknown = set(prices) - set(DEFAULT_PRICES)
+    if unknown:
+        raise ValueError(f"Unknown meters in price table: {sorted(unknown)}")
+    return dict(DEFAULT_PRICES, **prices)
+
+
+def usage_cost(usage, prices=None):
+    prices = dict(DEFAULT_PRICES, **(prices or {}))
+    return {meter: usage.get(meter, 0) * prices[meter] / PRICE_UNITS[meter][0] for meter in METERS}
+
+
+class CostMeter:
+    """Collects per-request usage records tagged with route and tenant.
+
+    Metered calls add to the usage of the request active in the current context (thread or asyncio
+    task), so concurrent requests are attributed correctly; calls outside any request are recorded
+    under the "unattributed" route.
+    """
+
+    def __init__(self, max_records=100000):
+        self.max_records = max_records
+        self.records = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def request(self, route="unrouted", tenant="default", query=None):
+        usage = {"route": route, "tenant": tenant, "query": query, **{meter: 0 for meter in METERS}}
+        token = _current_usage.set(usage)
+        start = time.perf_counter()
+        try:
+            yield usage
+        finally:
+            usage["latency_ms"] = (time.perf_counter() - start) * 1000
+            _current_usage.reset(token)
+            self._append(usage)
+
+    def _append(self, usage):
+        with self._lock:
+            self.records.append(usage)
+            if len(self.records) > self.max_records:
+                del self.records[:len(self.records) - self.max_records]
+
+    def add(self, **amounts):
+        usage = _current_usage.get()
+        if usage is None:
+            usage = {"route": "unattributed", "tenant": "default", "query": None, "latency_ms": 0.0,
+                     **{meter: 0 for meter in METERS}}
+            self._append(usage)
+        for meter, amount in amounts.items():
+            usage[meter] += amount
+
+    def reset(self):
+        with self._lock:
+            self.records = []
+
+
+class MeteredPipeline:
+    """Metering middleware around a pipeline's embed, retrieve and generate calls.
+
+    Drop-in replacement for the wrapped pipeline (other attributes are delegated), so routers and
+    controllers built on a pipeline can be metered without changes.
+    """
+
+    def __init__(self, pipeline, meter):
+        self.pipeline = pipeline
+        self.meter = meter
+
+    def __getattr__(self, name):
+        return getattr(self.pipeline, name)
+
+    def retrieve(self, query, k=3, timings=None):
+        cpu_start = time.thread_time()
+        passages = self.pipeline.retrieve(query, k=k, timings=timings)
+        self.meter.add(embedding_tokens=count_tokens(query), vector_reads=1,
+                       cpu_seconds=time.thread_time() - cpu_start)
+        return passages
+
+    def generate(self, query, passages, **kwargs):
+        cpu_start = time.thread_time()
+        answer = self.pipeline.generate(query, passages, **kwargs)
+        prompt = query + "".join(p["content"] for p in passages)
+        self.meter.add(prompt_tokens=count_tokens(prompt), completion_tokens=count_tokens(answer),
+                       cpu_seconds=time.thread_time() - cpu_start)
+        return answer
+
+    def answer(self, query, k=3):
+        timings = {}
+        start = time.perf_counter()
+        passages = self.retrieve(query, k=k, timings=timings)
+        text = self.generate(query, passages, timings=timings)
+        timings["total_ms"] = (time.perf_counter() - start) * 1000
+        return {"query": query, "answer": text, "passages": passages, "timings": timings}
+
+
+def aggregate_costs(records, prices=None, by=("route", "tenant")):
+    """Usage and cost per group, plus the cost of repeated queries an exact-match cache would have saved.
+
+    A request counts as a repeat when the same tenant asked the same normalized query earlier.
+    """
+    seen = set()
+    groups = {}
+    for record in records:
+        key = tuple(record[field] for field in by)
+        cost = usage_cost(record, prices)
+        total = sum(cost.values())
+        query_key = (record["tenant"], " ".join((record.get("query") or "").lower().split()))
+        repeat = record.get("query") is not None and query_key in seen
+        seen.add(query_key)
+
+        row = groups.setdefault(key, {**dict(zip(by, key)), "requests": 0, "repeats": 0, "cacheable_usd": 0.0,
+                                      "total_usd": 0.0, **{meter: 0 for meter in METERS},
+                                      **{f"{meter}_usd": 0.0 for meter in METERS}, "latencies": []})
+        row["requests"] += 1
+        row["total_usd"] += total
+        row["latencies"].append(record.get("latency_ms", 0.0))
+        if repeat:
+            row["repeats"] += 1
+            row["cacheable_usd"] += total
+        for meter in METERS:
+            row[meter] += record[meter]
+            row[f"{meter}_usd"] += cost[meter]
+
+    rows = []
+    for row in groups.values():
+        latencies = row.pop("latencies")
+        row["usd_per_1k_requests"] = row["total_usd"] / row["requests"] * 1000
+        row["p50_ms"] = float(np.percentile(latencies, 50))
+        rows.append(row)
+    return sorted(rows, key=lambda r: r["total_usd"], reverse=True)
+
+
+def cost_breakdown(records, prices=None):
+    """Measured share of total cost per component (embedding, LLM, vector DB, compute)"""
+    totals = {}
+    for record in records:
+        for meter, usd in usage_cost(record, prices).items():
+            component = COST_COMPONENTS[meter]
+            totals[component] = totals.get(component, 0.0) + usd
+    grand_total = sum(totals.values())
+    return [{"component": component, "usd": usd, "share": usd / grand_total if grand_total else 0.0}
+            for component, usd in totals.items()]
+
+
+def metered_route(router, meter, query, tenant="default"):
+    """Run a query through an AdaptiveRouter whose pipeline is metered, tagging usage with its route"""
+    with meter.request(tenant=tenant, query=query) as usage:
+        result = router.run(query)
+        usage["route"] = result["route"]
+    return result
+
+
+# Sample tenants with different traffic shapes: share of requests and mix of query kinds
+SAMPLE_TENANTS = {
+    "acme-support": {"share": 0.5, "mix": {"chit_chat": 0.25, "lookup": 0.7, "research": 0.05}},
+    "globex-hr": {"share": 0.3, "mix": {"chit_chat": 0.05, "lookup": 0.85, "research": 0.1}},
+    "initech-analytics": {"share": 0.2, "mix": {"chit_chat": 0.0, "lookup": 0.3, "research": 0.7}},
+}
+
+_CHIT_CHAT = ["hi there", "thanks!", "hello", "good morning", "ok great, thank you", "bye"]
+
+
+def sample_query_pools(questions):
+    """Chit-chat, single lookups and multi-part research questions built from an eval question list"""
+    research = [f"{a.rstrip('?')} and {b[0].lower()}{b[1:]}" for a, b in zip(questions, questions[7:] + questions[:7])]
+    return {"chit_chat": _CHIT_CHAT, "lookup": list(questions), "research": research}
+
+
+def simulate_traffic(router, meter, pools, n_requests=500, tenants=None, skew=1.1, seed=0):
+    """Send a tenant-mixed request stream through a router over a metered pipeline.
+
+    Within each pool, queries follow a Zipf popularity so popular questions repeat as in real logs.
+    """
+    tenants = tenants or SAMPLE_TENANTS
+    rng = np.random.default_rng(seed)
+    names = list(tenants)
+    tenant_p = np.array([tenants[t]["share"] for t in names], dtype=float)
+    picks = rng.choice(len(names), n_requests, p=tenant_p / tenant_p.sum())
+    for pick in picks:
+        tenant = names[pick]
+        kinds = list(tenants[tenant]["mix"])
+        kind_p = np.array([tenants[tenant]["mix"][k] for k in kinds], dtype=float)
+        pool = pools[kinds[rng.choice(len(kinds), p=kind_p / kind_p.sum())]]
+        weights = 1.0 / np.arange(1, len(pool) + 1) ** skew
+        query = pool[rng.choice(len(pool), p=weights / weights.sum())]
+        metered_route(router, meter, query, tenant)
+    return meter.records
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+def content_key(text, namespace=""):
+    """Content address of a text; the namespace keeps vectors from different models apart"""
+    return hashlib.blake2b(f"{namespace}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmbeddingStore:
+    """Append-only on-disk vector store: a memory-mapped float32 matrix plus a hash -> row index.
+
+    Layout of `directory`: meta.json (dim), vectors.f32 (capacity x dim, grown by doubling) and
+    keys.txt (one content hash per stored row, in row order). Vectors are flushed before their keys are
+    appended, so a crash can lose the newest rows but never map a key to an unwritten row.
+    """
+
+    def __init__(self, directory, dim, initial_capacity=1024):
+        self.directory = directory
+        self.dim = dim
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                stored_dim = json.load(f)["dim"]
+            if stored_dim != dim:
+                raise ValueError(f"Store at {directory} holds {stored_dim}-d vectors, not {dim}-d")
+        else:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"dim": dim}, f)
+
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._keys_path = os.path.join(directory, "keys.txt")
+        self.rows = {}
+        if os.path.exists(self._keys_path):
+            with open(self._keys_path, "r", encoding="utf-8") as f:
+                for row, key in enumerate(f.read().split()):
+                    self.rows[key] = row
+        row_bytes = 4 * dim
+        existing = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+        self._matrix = None
+        self._open(max(existing, initial_capacity, len(self.rows)))
+
+    def _open(self, capacity):
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(capacity * 4 * self.dim)
+        self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def get(self, keys):
+        """Stored vectors for keys that are all present (caller checks membership first)"""
+        return np.array(self._matrix[[self.rows[key] for key in keys]])
+
+    def put(self, keys, vectors):
+        new = [(key, vector) for key, vector in zip(keys, vectors) if key not in self.rows]
+        if not new:
+            return
+        start = len(self.rows)
+        needed = start + len(new)
+        if needed > len(self._matrix):
+            self._open(max(needed, 2 * len(self._matrix)))
+        self._matrix[start:needed] = np.asarray([vector for _, vector in new], dtype=np.float32)
+        self._matrix.flush()
+        with open(self._keys_path, "a", encoding="utf-8") as f:
+            f.write("".join(f"{key}\n" for key, _ in new))
+        for offset, (key, _) in enumerate(new):
+            self.rows[key] = start + offset
+
+    def disk_bytes(self):
+        return sum(os.path.getsize(os.path.join(self.directory, name)) for name in os.listdir(self.directory))
+
+    def close(self):
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+
+
+class CachedEmbedder:
+    """Embedder wrapper that embeds each distinct text once.
+
+    - texts are deduplicated by content hash, within a call and across calls
+    - hits are served from the on-disk EmbeddingStore
+    - misses go to the wrapped embedder in batches of at most `max_batch`
+    - concurrent single-text requests (`submit` / `embed_one`) are coalesced into micro-batches: a
+      batch is sent when it is full or `max_wait_ms` after its first request arrived
+
+    Exposes the wrapped embedder's `dim`, `embed` and `embed_one`, so pipelines can use it unchanged.
+    """
+
+    def __init__(self, embedder, store, namespace=None, max_batch=64, max_wait_ms=5.0):
+        self.embedder = embedder
+        self.store = store
+        self.dim = embedder.dim
+        self.namespace = namespace if namespace is not None else f"{type(embedder).__name__}:{embedder.dim}"
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.hits = 0
+        self.misses = 0
+        self.duplicates = 0
+        self.model_calls = 0
+        self.model_texts = 0
+        self._lock = threading.Lock()
+        self._pending = []
+        self._pending_ready = threading.Condition(self._lock)
+        self._worker = None
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses + self.duplicates
+        return (self.hits + self.duplicates) / total if total else 0.0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "in_batch_duplicates": self.duplicates,
+            "hit_rate": self.hit_rate,
+            "model_calls": self.model_calls,
+            "avg_batch_size": self.model_texts / self.model_calls if self.model_calls else 0.0,
+            "stored_vectors": len(self.store),
+        }
+
+    def _embed_misses(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.max_batch):
+            batch = texts[start:start + self.max_batch]
+            vectors.append(self.embedder.embed(batch))
+            self.model_calls += 1
+            self.model_texts += len(batch)
+        return np.vstack(vectors) if vectors else np.empty((0, self.dim), dtype=np.float32)
+
+    def embed(self, texts):
+        texts = list(texts)
+        keys = [content_key(text, self.namespace) for text in texts]
+        with self._lock:
+            unique = {}
+            for key, text in zip(keys, texts):
+                if key in unique:
+                    self.duplicates += 1
+                elif key in self.store:
+                    unique[key] = None
+                    self.hits += 1
+                else:
+                    unique[key] = text
+                    self.misses += 1
+            missing = [(key, text) for key, text in unique.items() if text is not None]
+        if missing:
+            vectors = self._embed_misses([text for _, text in missing])
+            with self._lock:
+                self.store.put([key for key, _ in missing], vectors)
+        with self._lock:
+            return self.store.get(keys)
+
+    def submit(self, text):
+        """Queue one text for micro-batched embedding; returns a Future for its vector"""
+        future = Future()
+        with self._pending_ready:
+            self._pending.append((text, future, time.perf_counter()))
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._drain, daemon=True)
+                self._worker.start()
+            self._pending_ready.notify()
+        return future
+
+    def _drain(self):
+        while True:
+            with self._pending_ready:
+                if not self._pending:
+                    self._worker = None
+                    return
+                # wait until the batch is full or the oldest request has waited max_wait_ms
+                deadline = self._pending[0][2] + self.max_wait_ms / 1000
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._pending_ready.wait(remaining)
+                batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            try:
+                vectors = self.embed([text for text, _, _ in batch])
+                for (_, future, _), vector in zip(batch, vectors):
+                    future.set_result(vector)
+            except Exception as exc:
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+
+    def embed_one(self, text):
+        return self.submit(text).result()
+
+
+class LatencyEmbedder:
+    """Wraps an embedder with the cost profile of a real model: fixed overhead per call (network
+    round trip, kernel launch) plus time per text, so batching and caching effects are measurable"""
+
+    def __init__(self, embedder, per_call_ms=20.0, per_text_ms=1.0):
+        self.embedder = embedder
+        self.dim = embedder.dim
+        self.per_call_ms = per_call_ms
+        self.per_text_ms = per_text_ms
+
+    def embed(self, texts):
+        time.sleep((self.per_call_ms + self.per_text_ms * len(texts)) / 1000)
+        return self.embedder.embed(texts)
+
+    def embed_one(self, text):
+        return self.embed([text])[0]
@@ -0,0 +1,402 @@
+import threading
+import time
+from array import array
+
+import numpy as np
+
+# Small sample knowledge graph used by the Graph RAG page
+SAMPLE_TRIPLES = [
+    ("Climate Change", "causes", "Rising Temperature"),
+    ("Climate Change", "causes", "Extreme Weather"),
+    ("Climate Change", "driven_by", "Greenhouse Gases"),
+    ("Greenhouse Gases", "emitted_by", "Fossil Fuels"),
+    ("Fossil Fuels", "replaced_by", "Renewable Energy"),
+    ("Renewable Energy", "includes", "Solar Power"),
+    ("Renewable Energy", "includes", "Wind Power"),
+    ("Rising Temperature", "reduces", "Crop Yield"),
+    ("Extreme Weather", "reduces", "Crop Yield"),
+    ("Rising Temperature", "affects", "Water Supply"),
+    ("Water Supply", "supports", "Irrigation"),
+    ("Irrigation", "increases", "Crop Yield"),
+    ("Crop Yield", "determines", "Food Security"),
+    ("Food Security", "affects", "Public Health"),
+    ("Food Security", "affects", "Food Prices"),
+    ("Food Prices", "affects", "Global Economy"),
+    ("Extreme Weather", "damages", "Infrastructure"),
+    ("Infrastructure", "supports", "Global Economy"),
+]
+
+SAMPLE_DOCUMENTS = [
+    {"title": "IPCC Climate Report 2023",
+     "entities": ["Climate Change", "Greenhouse Gases", "Rising Temperature"]},
+    {"title": "Agriculture Under Heat Stress",
+     "entities": ["Rising Temperature", "Crop Yield", "Irrigation"]},
+    {"title": "FAO Food Security Outlook",
+     "entities": ["Crop Yield", "Food Security", "Food Prices"]},
+    {"title": "Energy Transition Handbook",
+     "entities": ["Fossil Fuels", "Renewable Energy", "Solar Power", "Wind Power"]},
+    {"title": "Extreme Weather and Infrastructure",
+     "entities": ["Extreme Weather", "Infrastructure"]},
+    {"title": "Water Resources Management",
+     "entities": ["Water Supply", "Irrigation"]},
+    {"title": "Nutrition and Public Health",
+     "entities": ["Food Security", "Public Health"]},
+    {"title": "World Economic Outlook",
+     "entities": ["Global Economy", "Food Prices", "Infrastructure"]},
+]
+
+
+class EntityInterner:
+    """Map entity names to dense integer ids (and back)"""
+
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+
+    @staticmethod
+    def normalize(name):
+        return " ".join(name.lower().split())
+
+    def intern(self, name):
+        key = self.normalize(name)
+        idx = self._ids.get(key)
+        if idx is None:
+            idx = len(self._names)
+            self._ids[key] = idx
+            self._names.append(name)
+        return idx
+
+    def get(self, name):
+        return self._ids.get(self.normalize(name))
+
+    def name(self, idx):
+        return self._names[idx]
+
+    def __len__(self):
+        return len(self._names)
+
+
+class GraphBuilder:
+    """Collect typed edges in flat typed arrays, then freeze them into a KnowledgeGraph"""
+
+    def __init__(self, undirected=True):
+        self.entities = EntityInterner()
+        self.relations = EntityInterner()
+        self.undirected = undirected
+        self._src = array("i")
+        self._dst = array("i")
+        self._types = array("h")
+        self._weights = array("f")
+        self._doc_titles = []
+        self._doc_entity_ptr = array("q", [0])
+        self._doc_entities = array("i")
+
+    def add_edge(self, head, relation, tail, weight=1.0):
+        h = self.entities.intern(head)
+        t = self.entities.intern(tail)
+        r = self.relations.intern(relation)
+        self._src.append(h)
+        self._dst.append(t)
+        self._types.append(r)
+        self._weights.append(weight)
+        if self.undirected:
+            self._src.append(t)
+            self._dst.append(h)
+            self._types.append(r)
+            self._weights.append(weight)
+
+    def add_document(self, title, entities):
+        self._doc_titles.append(title)
+        for name in entities:
+            self._doc_entities.append(self.entities.intern(name))
+        self._doc_entity_ptr.append(len(self._doc_entities))
+
+    def build(self):
+        n_nodes = len(self.entities)
+        src = np.frombuffer(self._src, dtype=np.int32)
+        dst = np.frombuffer(self._dst, dtype=np.int32)
+        types = np.frombuffer(self._types, dtype=np.int16)
+        weights = np.frombuffer(self._weights, dtype=np.float32)
+
+        # Invert the document -> entity lists into entity -> document postings
+        doc_ptr = np.frombuffer(self._doc_entity_ptr, dtype=np.int64)
+        doc_of_entry = np.repeat(np.arange(len(self._doc_titles), dtype=np.int32), np.diff(doc_ptr))
+        entity_of_entry = np.frombuffer(self._doc_entities, dtype=np.int32)
+
+        graph = KnowledgeGraph.from_arrays(src, dst, types, weights, n_nodes,
+                                           postings=(entity_of_entry, doc_of_entry),
+                                           n_docs=len(self._doc_titles))
+        graph.entities = self.entities
+        graph.relations = self.relations
+        graph.doc_titles = list(self._doc_titles)
+        return graph
+
+
+def _csr_from_pairs(rows, cols, n_rows, *payloads):
+    """Sort (row, col) pairs by row and return indptr, cols and payloads in CSR order"""
+    order = np.argsort(rows, kind="stable")
+    counts = np.bincount(rows, minlength=n_rows)
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return (indptr, cols[order]) + tuple(p[order] for p in payloads)
+
+
+def _gather_rows(indptr, rows):
+    """Positions of all CSR entries belonging to `rows`, plus the row each entry came from"""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=rows.dtype)
+    owners = np.repeat(rows, lengths)
+    # offset of each entry within its own row
+    run_starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    positions = np.repeat(starts, lengths) + (np.arange(total) - run_starts)
+    return positions, owners
+
+
+class KnowledgeGraph:
+    """Array-backed (CSR) entity graph with typed, weighted edges and entity -> document postings"""
+
+    def __init__(self, indptr, indices, edge_types, weights, doc_indptr=None, doc_indices=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.edge_types = edge_types
+        self.weights = weights
+        self.doc_indptr = doc_indptr
+        self.doc_indices = doc_indices
+        self.n_nodes = len(indptr) - 1
+        self.entities = None
+        self.relations = None
+        self.doc_titles = []
+        # Epoch-stamped scratch buffers so traversals never reallocate O(n_nodes) state. The graph is
+        # shared across sessions, so each thread gets its own buffers and concurrent traversals never
+        # see each other's stamps.
+        self._scratch = threading.local()
+
+    @classmethod
+    def from_arrays(cls, src, dst, edge_types, weights, n_nodes, postings=None, n_docs=0):
+        src = np.asarray(src, dtype=np.int32)
+        dst = np.asarray(dst, dtype=np.int32)
+        edge_types = np.asarray(edge_types, dtype=np.int16)
+        weights = np.asarray(weights, dtype=np.float32)
+        indptr, indices, edge_types, weights = _csr_from_pairs(src, dst, n_nodes, edge_types, weights)
+        doc_indptr = doc_indices = None
+        if postings is not None:
+            entity_ids, doc_ids = postings
+            doc_indptr, doc_indices = _csr_from_pairs(np.asarray(entity_ids, dtype=np.int32),
+                                                      np.asarray(doc_ids, dtype=np.int32), n_nodes)
+        graph = cls(indptr, indices, edge_types, weights, doc_indptr, doc_indices)
+        graph.doc_titles = [f"Document {i}" for i in range(n_docs)]
+        return graph
+
+    @property
+    def n_edges(self):
+        return len(self.indices)
+
+    def memory_bytes(self):
+        arrays = [self.indptr, self.indices, self.edge_types, self.weights]
+        if self.doc_indptr is not None:
+            arrays += [self.doc_indptr, self.doc_indices]
+        return sum(a.nbytes for a in arrays)
+
+    def degree(self, node):
+        return int(self.indptr[node + 1] - self.indptr[node])
+
+    def neighbors(self, node):
+        start, end = self.indptr[node], self.indptr[node + 1]
+        return self.indices[start:end], self.edge_types[start:end]
+
+    def lookup(self, names):
+        """Resolve entity names to ids, silently skipping unknown names"""
+        ids = [self.entities.get(n) for n in names] if self.entities is not None else list(names)
+        return np.array([i for i in ids if i is not None], dtype=np.int32)
+
+    def relation_ids(self, relation_names):
+        if relation_names is None:
+            return None
+        ids = [self.relations.get(r) for r in relation_names]
+        return np.array([i for i in ids if i is not None], dtype=np.int16)
+
+    def _buffers(self):
+        scratch = self._scratch
+        if getattr(scratch, "seen", None) is None:
+            scratch.seen = np.zeros(self.n_nodes, dtype=np.int32)
+            scratch.local = np.full(self.n_nodes, -1, dtype=np.int32)
+            scratch.epoch = 0
+        return scratch
+
+    def _next_epoch(self, scratch):
+        scratch.epoch += 1
+        if scratch.epoch == np.iinfo(np.int32).max:
+            scratch.seen[:] = 0
+            scratch.epoch = 1
+        return scratch.epoch
+
+    def k_hop(self, seeds, k=2, max_nodes=10000, edge_types=None):
+        """Bounded breadth-first expansion from seed entities.
+
+        Returns (nodes, hops, stats) where `hops[i]` is the hop distance of `nodes[i]`.
+        Expansion stops after `k` hops or once `max_nodes` nodes have been reached.
+        """
+        start = time.perf_counter()
+        scratch = self._buffers()
+        epoch = self._next_epoch(scratch)
+        seen = scratch.seen
+        frontier = np.unique(np.asarray(seeds, dtype=np.int32))
+        seen[frontier] = epoch
+        nodes = [frontier]
+        hops = [np.zeros(len(frontier), dtype=np.int16)]
+        n_reached = len(frontier)
+        edges_scanned = 0
+
+        for hop in range(1, k + 1):
+            if len(frontier) == 0 or n_reached >= max_nodes:
+                break
+            positions, _ = _gather_rows(self.indptr, frontier)
+            edges_scanned += len(positions)
+            if edge_types is not None:
+                positions = positions[np.isin(self.edge_types[positions], edge_types)]
+            candidates = np.unique(self.indices[positions])
+            frontier = candidates[seen[candidates] != epoch]
+            frontier = frontier[:max_nodes - n_reached]
+            seen[frontier] = epoch
+            n_reached += len(frontier)
+            nodes.append(frontier)
+            hops.append(np.full(len(frontier), hop, dtype=np.int16))
+
+        nodes = np.concatenate(nodes)
+        hops = np.concatenate(hops)
+        stats = {
+            "method": "bfs",
+            "nodes_touched": int(len(nodes)),
+            "edges_scanned": int(edges_scanned),
+            "hops": int(hops.max()) if len(hops) else 0,
+            "time_ms": (time.perf_counter() - start) * 1000,
+        }
+        return nodes, hops, stats
+
+    def personalized_pagerank(self, seeds, k=2, max_nodes=10000, alpha=0.15,
+                              max_iter=30, tol=1e-6, edge_types=None):
+        """Personalized PageRank restricted to the bounded k-hop neighbourhood of the seeds.
+
+        Returns (nodes, scores, stats); scores sum to 1 over the returned nodes.
+        """
+        start = time.perf_counter()
+        nodes, _, bfs_stats = self.k_hop(seeds, k=k, max_nodes=max_nodes, edge_types=edge_types)
+        n_local = len(nodes)
+        if n_local == 0:
+            stats = dict(bfs_stats, method="ppr", iterations=0,
+                         time_ms=(time.perf_counter() - start) * 1000)
+            return nodes, np.empty(0, dtype=np.float32), stats
+
+        local = self._buffers().local
+        local[nodes] = np.arange(n_local, dtype=np.int32)
+        positions, owners = _gather_rows(self.indptr, nodes)
+        if edge_types is not None:
+            keep = np.isin(self.edge_types[positions], edge_types)
+            positions, owners = positions[keep], owners[keep]
+        dst_local = local[self.indices[positions]]
+        inside = dst_local >= 0
+        src_local = local[owners[inside]]
+        dst_local = dst_local[inside]
+        w = self.weights[positions[inside]].astype(np.float64)
+        local[nodes] = -1
+
+        out_weight = np.bincount(src_local, weights=w, minlength=n_local)
+        transition = w / out_weight[src_local]
+        dangling = out_weight == 0
+
+        restart = np.zeros(n_local)
+        seed_local = np.isin(nodes, np.asarray(seeds, dtype=np.int32))
+        restart[seed_local] = 1.0 / max(seed_local.sum(), 1)
+
+        scores = restart.copy()
+        iterations = 0
+        for iterations in range(1, max_iter + 1):
+            spread = np.bincount(dst_local, weights=scores[src_local] * transition, minlength=n_local)
+            spread += scores[dangling].sum() * restart
+            updated = (1 - alpha) * spread + alpha * restart
+            delta = np.abs(updated - scores).sum()
+            scores = updated
+            if delta < tol:
+                break
+
+        stats = dict(bfs_stats, method="ppr", iterations=iterations,
+                     edges_scanned=bfs_stats["edges_scanned"] + int(len(src_local)) * iterations,
+                     time_ms=(time.perf_counter() - start) * 1000)
+        return nodes, scores.astype(np.float32), stats
+
+    def documents_for(self, nodes, node_scores, top_n=5):
+        """Aggregate node scores onto the documents that mention those nodes"""
+        if self.doc_indptr is None or len(nodes) == 0:
+            return []
+        positions, owners = _gather_rows(self.doc_indptr, np.asarray(nodes, dtype=np.int32))
+        if len(positions) == 0:
+            return []
+        score_of = np.zeros(self.n_nodes, dtype=np.float64)
+        score_of[nodes] = node_scores
+        doc_scores = np.bincount(self.doc_indices[positions], weights=score_of[owners],
+                                 minlength=len(self.doc_titles))
+        top = np.argsort(-doc_scores)[:top_n]
+        return [(int(d), float(doc_scores[d])) for d in top if doc_scores[d] > 0]
+
+
+def extract_query_entities(query, graph, max_ngram=3):
+    """Find known entity names in the query with a greedy longest-match n-gram scan"""
+    words = [w.strip("?.,!;:'\"()").lower() for w in query.split()]
+    found = []
+    i = 0
+    while i < len(words):
+        for n in range(min(max_ngram, len(words) - i), 0, -1):
+            idx = graph.entities.get(" ".join(words[i:i + n]))
+            if idx is not None:
+                found.append(idx)
+                i += n
+                break
+        else:
+            i += 1
+    return list(dict.fromkeys(found))
+
+
+def graph_retrieve(graph, seeds, method="bfs", k=2, max_nodes=10000, top_n=5, edge_types=None):
+    """Expand seed entities through the graph and rank the documents that mention them"""
+    if method == "ppr":
+        nodes, scores, stats = graph.personalized_pagerank(seeds, k=k, max_nodes=max_nodes,
+                                                           edge_types=edge_types)
+    else:
+        nodes, hops, stats = graph.k_hop(seeds, k=k, max_nodes=max_nodes, edge_types=edge_types)
+        scores = 1.0 / (1.0 + hops)
+    start = time.perf_counter()
+    documents = graph.documents_for(nodes, scores, top_n=top_n)
+    stats["retrieval_ms"] = (time.perf_counter() - start) * 1000
+    return documents, nodes, scores, stats
+
+
+def build_sample_graph():
+    builder = GraphBuilder()
+    for head, relation, tail in SAMPLE_TRIPLES:
+        builder.add_edge(head, relation, tail)
+    for doc in SAMPLE_DOCUMENTS:
+        builder.add_document(doc["title"], doc["entities"])
+    return builder.build()
+
+
+def build_random_graph(n_nodes, n_edges, n_types=8, n_docs=None, seed=42):
+    """Synthetic power-law-ish graph for scale testing (built straight from arrays)"""
+    rng = np.random.default_rng(seed)
+    # Zipf-like popularity so a few hub entities get most of the edges, as in real entity graphs
+    popularity = 1.0 / np.arange(1, n_nodes + 1) ** 0.8
+    popularity /= popularity.sum()
+    src = rng.integers(0, n_nodes, n_edges, dtype=np.int32)
+    dst = rng.choice(n_nodes, n_edges, p=popularity).astype(np.int32)
+    src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+    types = rng.integers(0, n_types, n_edges, dtype=np.int16)
+    types = np.concatenate([types, types])
+    weights = np.ones(len(src), dtype=np.float32)
+
+    n_docs = n_docs or max(n_nodes // 10, 1)
+    mentions = n_docs * 5
+    postings = (rng.integers(0, n_nodes, mentions, dtype=np.int32),
+                rng.integers(0, n_docs, mentions, dtype=np.int32))
+    return KnowledgeGraph.from_arrays(src, dst, types, weights, n_nodes, postings=postings, n_docs=n_docs)
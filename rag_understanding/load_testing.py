@@ -0,0 +1,172 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from rag_evaluation import SAMPLE_EVAL_PATH
+
+# Response-time choices from the planning tool mapped to a latency SLO in milliseconds
+RESPONSE_TIME_SLOS_MS = {
+    "< 1 second": 1000,
+    "1-3 seconds": 3000,
+    "3-10 seconds": 10000,
+    "> 10 seconds": 30000,
+}
+
+
+def load_query_log(source=SAMPLE_EVAL_PATH):
+    """Queries to replay, from a JSONL log ({"query": ...} or {"question": ...}) or plain text lines"""
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    else:
+        raw = source.read()
+        lines = (raw.decode("utf-8") if isinstance(raw, bytes) else raw).splitlines()
+    queries = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            record = json.loads(line)
+            line = record.get("query") or record.get("question")
+        if line:
+            queries.append(line)
+    return queries
+
+
+class LoadTester:
+    """Replay a query log against a pipeline and measure latency under load.
+
+    Requests run on a fixed pool of `workers` threads, which stands in for the serving capacity of one
+    box. Two traffic models are supported:
+
+    - closed loop: `concurrency` simulated users each send a request, wait for the answer, think for
+      `think_time_ms` and send the next one; offered load adapts to how fast the system answers.
+    - open loop: requests arrive on a Poisson schedule at `qps` whether or not earlier ones have
+      finished. Latency is measured from the scheduled arrival time, so queueing delay is included
+      (no coordinated omission).
+    """
+
+    def __init__(self, pipeline, queries, workers=8, k=3, timeout_s=30.0):
+        if not queries:
+            raise ValueError("The query log is empty")
+        self.pipeline = pipeline
+        self.queries = list(queries)
+        self.workers = workers
+        self.k = k
+        self.timeout_s = timeout_s
+
+    def _handle(self, query):
+        self.pipeline.answer(query, k=self.k)
+
+    async def _request(self, loop, pool, query, started):
+        try:
+            await asyncio.wait_for(loop.run_in_executor(pool, self._handle, query), self.timeout_s)
+            error = None
+        except asyncio.TimeoutError:
+            error = "timeout"
+        except Exception as exc:
+            error = type(exc).__name__
+        return {"start_s": started, "latency_ms": (time.perf_counter() - started) * 1000, "error": error}
+
+    async def _closed_loop(self, loop, pool, concurrency, duration_s, think_time_ms, max_requests):
+        deadline = time.perf_counter() + duration_s
+        results = []
+        counter = iter(range(max_requests or 1 << 62))
+
+        async def user(offset):
+            position = offset
+            while time.perf_counter() < deadline:
+                if next(counter, None) is None:
+                    return
+                query = self.queries[position % len(self.queries)]
+                position += concurrency
+                results.append(await self._request(loop, pool, query, time.perf_counter()))
+                if think_time_ms:
+                    await asyncio.sleep(think_time_ms / 1000)
+
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+        return results
+
+    async def _open_loop(self, loop, pool, qps, duration_s, max_requests, seed):
+        rng = np.random.default_rng(seed)
+        n = int(qps * duration_s)
+        if max_requests:
+            n = min(n, max_requests)
+        arrivals = np.cumsum(rng.exponential(1.0 / qps, n))
+        begin = time.perf_counter()
+        tasks = []
+        for i, offset in enumerate(arrivals):
+            scheduled = begin + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            query = self.queries[i % len(self.queries)]
+            tasks.append(asyncio.ensure_future(self._request(loop, pool, query, scheduled)))
+        return list(await asyncio.gather(*tasks))
+
+    async def run_async(self, mode="closed", concurrency=8, qps=50.0, duration_s=5.0, think_time_ms=0.0,
+                        max_requests=None, seed=0):
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            start = time.perf_counter()
+            if mode == "closed":
+                results = await self._closed_loop(loop, pool, concurrency, duration_s, think_time_ms, max_requests)
+            elif mode == "open":
+                results = await self._open_loop(loop, pool, qps, duration_s, max_requests, seed)
+            else:
+                raise ValueError(f"Unknown load mode: {mode}")
+            wall_s = time.perf_counter() - start
+        return results, wall_s
+
+    def run(self, mode="closed", slo_ms=1000.0, slo_percentile=95, **kwargs):
+        """Run one load level and summarize it against the latency SLO"""
+        results, wall_s = asyncio.run(self.run_async(mode=mode, **kwargs))
+        summary = summarize(results, wall_s, slo_ms, slo_percentile)
+        summary["mode"] = mode
+        summary["workers"] = self.workers
+        summary["load"] = kwargs.get("concurrency", 8) if mode == "closed" else kwargs.get("qps", 50.0)
+        return summary, results
+
+    def sweep(self, levels, mode="closed", slo_ms=1000.0, slo_percentile=95, max_error_rate=0.01, **kwargs):
+        """Run increasing load levels (concurrency or QPS) and return one summary row per level.
+
+        Stops early once a level breaks the SLO, because higher levels only queue up further.
+        """
+        rows = []
+        key = "concurrency" if mode == "closed" else "qps"
+        for level in levels:
+            summary, _ = self.run(mode=mode, slo_ms=slo_ms, slo_percentile=slo_percentile, **{key: level}, **kwargs)
+            summary["slo_met"] = summary["slo_met"] and summary["error_rate"] <= max_error_rate
+            rows.append(summary)
+            if not summary["slo_met"]:
+                break
+        return rows
+
+
+def summarize(results, wall_s, slo_ms, slo_percentile=95):
+    ok = np.array([r["latency_ms"] for r in results if r["error"] is None])
+    errors = sum(r["error"] is not None for r in results)
+    percentiles = {f"p{p}_ms": float(np.percentile(ok, p)) if len(ok) else float("nan") for p in (50, 95, 99)}
+    slo_value = float(np.percentile(ok, slo_percentile)) if len(ok) else float("inf")
+    return {
+        "requests": len(results),
+        "errors": errors,
+        "error_rate": errors / len(results) if results else 0.0,
+        "throughput_qps": len(ok) / wall_s if wall_s else 0.0,
+        **percentiles,
+        "within_slo": float(np.mean(ok <= slo_ms)) if len(ok) else 0.0,
+        "slo_met": slo_value <= slo_ms,
+    }
+
+
+def supported_users(sweep_rows, requests_per_user_per_min=2.0):
+    """Users one box can serve: the best throughput that still met the SLO divided by per-user demand"""
+    passing = [row for row in sweep_rows if row["slo_met"]]
+    if not passing:
+        return 0, None
+    best = max(passing, key=lambda row: row["throughput_qps"])
+    return int(best["throughput_qps"] * 60 / requests_per_user_per_min), best
@@ -0,0 +1,227 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from rag_pipeline import HashingEmbedder
+
+# Typical embedding sizes: sentence encoder, CLIP image tower, audio (e.g. VGGish) features
+DEFAULT_DIMS = {"text": 384, "image": 512, "audio": 128}
+
+SAMPLE_SCENES = [
+    ("beach sunset", "ocean waves and seagulls"),
+    ("mountain landscape", "wind over snowy peaks"),
+    ("city skyline", "traffic and car horns"),
+    ("forest path", "birdsong and rustling leaves"),
+    ("urban night", "neon buzz and street music"),
+    ("rainy street", "rain on pavement"),
+    ("desert dunes", "dry wind and silence"),
+    ("busy market", "crowd chatter and vendors"),
+]
+_ADJECTIVES = ["bright", "calm", "dramatic", "misty", "colorful", "quiet", "golden", "stormy"]
+
+
+class ModalityIndex:
+    """Flat cosine index for one modality: growable float32 matrix plus row <-> item id maps"""
+
+    def __init__(self, dim, initial_capacity=1024):
+        self.dim = dim
+        self._vectors = np.empty((initial_capacity, dim), dtype=np.float32)
+        self._item_ids = np.empty(initial_capacity, dtype=np.int64)
+        self._row_of_item = np.full(initial_capacity, -1, dtype=np.int64)
+        self.size = 0
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        if needed <= len(self._vectors):
+            return
+        capacity = max(needed, 2 * len(self._vectors))
+        vectors = np.empty((capacity, self.dim), dtype=np.float32)
+        vectors[:self.size] = self._vectors[:self.size]
+        item_ids = np.empty(capacity, dtype=np.int64)
+        item_ids[:self.size] = self._item_ids[:self.size]
+        self._vectors, self._item_ids = vectors, item_ids
+
+    def _map_items(self, item_ids):
+        if len(item_ids) == 0:
+            return
+        max_id = int(item_ids.max()) + 1
+        if max_id > len(self._row_of_item):
+            row_of_item = np.full(max(max_id, 2 * len(self._row_of_item)), -1, dtype=np.int64)
+            row_of_item[:len(self._row_of_item)] = self._row_of_item
+            self._row_of_item = row_of_item
+        self._row_of_item[item_ids] = np.arange(self.size, self.size + len(item_ids))
+
+    def add(self, item_ids, vectors):
+        item_ids = np.asarray(item_ids, dtype=np.int64)
+        if len(item_ids) == 0:
+            return
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-d vectors, got {vectors.shape[1]}-d")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._reserve(len(vectors))
+        self._map_items(item_ids)
+        self._vectors[self.size:self.size + len(vectors)] = vectors / norms
+        self._item_ids[self.size:self.size + len(vectors)] = item_ids
+        self.size += len(vectors)
+
+    def search(self, query, k=50):
+        if self.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = self._vectors[:self.size] @ query
+        k = min(k, self.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return self._item_ids[top], scores[top]
+
+    def score_items(self, item_ids, query):
+        """Exact scores for specific items (NaN where the item has no vector in this modality)"""
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        item_ids = np.asarray(item_ids, dtype=np.int64)
+        rows = np.full(len(item_ids), -1, dtype=np.int64)
+        known = item_ids < len(self._row_of_item)
+        rows[known] = self._row_of_item[item_ids[known]]
+        scores = np.full(len(item_ids), np.nan, dtype=np.float32)
+        present = rows >= 0
+        scores[present] = self._vectors[rows[present]] @ query
+        return scores
+
+    def memory_bytes(self):
+        return self._vectors.nbytes + self._item_ids.nbytes + self._row_of_item.nbytes
+
+
+class MultimodalStore:
+    """Per-modality sub-indexes over one shared item id space, queried in parallel and late-fused.
+
+    Each modality keeps its own vectors (items may lack a modality). A cross-modal query sends each
+    query vector to its own sub-index concurrently; the union of candidates is then rescored exactly
+    in every queried modality and fused with a weighted score sum or reciprocal rank fusion (RRF).
+    """
+
+    def __init__(self, dims=None, max_workers=None):
+        self.dims = dict(dims or DEFAULT_DIMS)
+        self.indexes = {modality: ModalityIndex(dim) for modality, dim in self.dims.items()}
+        self.items = []
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or len(self.dims))
+
+    def __len__(self):
+        return len(self.items)
+
+    def add_items(self, metadata, **vectors_by_modality):
+        """Add a batch of items; each keyword is a modality with one row per item (or None)"""
+        start = len(self.items)
+        self.items.extend(metadata)
+        ids = np.arange(start, len(self.items), dtype=np.int64)
+        for modality, vectors in vectors_by_modality.items():
+            if vectors is None:
+                continue
+            if modality not in self.indexes:
+                raise KeyError(f"Unknown modality: {modality}")
+            self.indexes[modality].add(ids, vectors)
+        return ids
+
+    def _search_one(self, modality, query, candidates):
+        start = time.perf_counter()
+        ids, scores = self.indexes[modality].search(query, candidates)
+        return modality, ids, scores, (time.perf_counter() - start) * 1000
+
+    def search(self, queries, k=10, weights=None, fusion="weighted", candidates=100, parallel=True):
+        """Fan the per-modality queries out to their sub-indexes and fuse the results.
+
+        `queries` maps modality -> query vector; `weights` maps modality -> fusion weight.
+        Returns (results, stats) where results are dicts with item metadata and per-modality scores.
+        """
+        weights = weights or {}
+        active = [(m, q) for m, q in queries.items() if q is not None and self.indexes[m].size]
+        start = time.perf_counter()
+        if parallel and len(active) > 1:
+            futures = [self._pool.submit(self._search_one, m, q, candidates) for m, q in active]
+            partials = [f.result() for f in futures]
+        else:
+            partials = [self._search_one(m, q, candidates) for m, q in active]
+        search_ms = (time.perf_counter() - start) * 1000
+
+        fuse_start = time.perf_counter()
+        candidate_ids = np.unique(np.concatenate([ids for _, ids, _, _ in partials] +
+                                                 [np.empty(0, dtype=np.int64)]))
+        fused = np.zeros(len(candidate_ids))
+        per_modality = {}
+        for modality, query in active:
+            weight = weights.get(modality, 1.0)
+            scores = self.indexes[modality].score_items(candidate_ids, query)
+            per_modality[modality] = scores
+            if fusion == "rrf":
+                # rank among candidates; items missing this modality get no contribution
+                order = np.argsort(-np.nan_to_num(scores, nan=-np.inf))
+                ranks = np.empty(len(order), dtype=np.int64)
+                ranks[order] = np.arange(len(order))
+                fused += np.where(np.isnan(scores), 0.0, weight / (60 + ranks + 1))
+            else:
+                fused += weight * np.nan_to_num(scores, nan=0.0)
+        top = np.argsort(-fused)[:k]
+        results = []
+        for i in top:
+            item_id = int(candidate_ids[i])
+            scores = {m: float(s[i]) for m, s in per_modality.items() if not np.isnan(s[i])}
+            results.append(dict(self.items[item_id], item_id=item_id, score=float(fused[i]), **scores))
+        fusion_ms = (time.perf_counter() - fuse_start) * 1000
+
+        stats = {
+            "total_ms": (time.perf_counter() - start) * 1000,
+            "search_ms": search_ms,
+            "fusion_ms": fusion_ms,
+            "modalities": {modality: {"latency_ms": latency,
+                                      "rows": self.indexes[modality].size,
+                                      "memory_mb": self.indexes[modality].memory_bytes() / 1024 ** 2}
+                           for modality, _, _, latency in partials},
+        }
+        return results, stats
+
+    def modality_stats(self):
+        return [{"modality": modality, "dim": index.dim, "rows": index.size,
+                 "memory_mb": index.memory_bytes() / 1024 ** 2}
+                for modality, index in self.indexes.items()]
+
+
+def build_sample_store(n_items=10000, audio_fraction=0.5, seed=0):
+    """Synthetic multimodal catalog where every modality is a noisy view of the same scene.
+
+    Text vectors come from the hashing embedder over generated captions; image and audio features are
+    fixed random projections of a latent scene vector, so cross-modal neighbours are meaningful.
+    """
+    rng = np.random.default_rng(seed)
+    store = MultimodalStore()
+    embedder = HashingEmbedder(dim=store.dims["text"])
+    n_scenes = len(SAMPLE_SCENES)
+    latent_dim = 32
+    scene_latents = rng.normal(size=(n_scenes, latent_dim)).astype(np.float32)
+    projections = {m: rng.normal(size=(latent_dim, store.dims[m])).astype(np.float32)
+                   for m in ("image", "audio")}
+
+    scene_ids = rng.integers(0, n_scenes, n_items)
+    adjectives = rng.integers(0, len(_ADJECTIVES), n_items)
+    captions = [f"{_ADJECTIVES[a]} {SAMPLE_SCENES[s][0]} with {SAMPLE_SCENES[s][1]}"
+                for s, a in zip(scene_ids, adjectives)]
+    metadata = [{"caption": c, "scene": SAMPLE_SCENES[s][0]} for c, s in zip(captions, scene_ids)]
+
+    latents = scene_latents[scene_ids] + 0.6 * rng.normal(size=(n_items, latent_dim)).astype(np.float32)
+    image = latents @ projections["image"]
+    audio = latents @ projections["audio"]
+    has_audio = rng.random(n_items) < audio_fraction
+
+    store.add_items([m for m, a in zip(metadata, has_audio) if not a],
+                    text=embedder.embed([c for c, a in zip(captions, has_audio) if not a]),
+                    image=image[~has_audio])
+    store.add_items([m for m, a in zip(metadata, has_audio) if a],
+                    text=embedder.embed([c for c, a in zip(captions, has_audio) if a]),
+                    image=image[has_audio], audio=audio[has_audio])
+    store.text_embedder = embedder
+    store.scene_prototypes = {SAMPLE_SCENES[s][0]: {"image": scene_latents[s] @ projections["image"],
+                                                    "audio": scene_latents[s] @ projections["audio"]}
+                              for s in range(n_scenes)}
+    return store
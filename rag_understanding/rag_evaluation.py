@@ -0,0 +1,161 @@
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+SAMPLE_EVAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_eval.jsonl")
+
+
+def load_eval_set(source):
+    """Read eval items from a JSONL path or file-like object.
+
+    Each line: {"question": str, "gold": [str, ...]} where gold entries are document titles
+    or gold passage text.
+    """
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    else:
+        raw = source.read()
+        lines = (raw.decode("utf-8") if isinstance(raw, bytes) else raw).splitlines()
+    items = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if "question" not in item or "gold" not in item:
+            raise ValueError(f"Line {number}: expected 'question' and 'gold' fields")
+        items.append(item)
+    return items
+
+
+def _normalize(text):
+    return " ".join(text.lower().split())
+
+
+def matched_gold(passage, gold):
+    """Indices of the gold entries a passage matches (by title, or by passage text)"""
+    title = _normalize(passage["title"])
+    content = _normalize(passage["content"])
+    matched = set()
+    for index, entry in enumerate(gold):
+        entry = _normalize(entry)
+        if entry == title or (len(entry) > 20 and (entry in content or content in entry)):
+            matched.add(index)
+    return matched
+
+
+def is_relevant(passage, gold):
+    return bool(matched_gold(passage, gold))
+
+
+def recall_at_k(relevance, n_gold, k):
+    """Distinct gold entries matched in the top k over n_gold; relevance[i] is the set of gold
+    indices passage i matched, so duplicate chunks of one gold entry count once"""
+    found = set().union(*relevance[:k])
+    return len(found) / n_gold if n_gold else 0.0
+
+
+def reciprocal_rank(relevance):
+    for rank, matched in enumerate(relevance, 1):
+        if matched:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(relevance, n_gold, k):
+    """Binary nDCG where only the first hit on each gold entry earns gain"""
+    dcg, seen = 0.0, set()
+    for rank, matched in enumerate(relevance[:k], 1):
+        if matched - seen:
+            dcg += 1.0 / math.log2(rank + 1)
+        seen |= matched
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(n_gold, k) + 1))
+    return dcg / ideal if ideal else 0.0
+
+
+def evaluate_item(pipeline, item, k):
+    timings = {}
+    start = time.perf_counter()
+    passages = pipeline.retrieve(item["question"], k=k, timings=timings)
+    pipeline.generate(item["question"], passages, timings=timings)
+    timings["total_ms"] = (time.perf_counter() - start) * 1000
+
+    relevance = [matched_gold(p, item["gold"]) for p in passages]
+    n_gold = len(item["gold"])
+    return {
+        "question": item["question"],
+        "retrieved": [p["title"] for p in passages],
+        "recall": recall_at_k(relevance, n_gold, k),
+        "mrr": reciprocal_rank(relevance),
+        "ndcg": ndcg_at_k(relevance, n_gold, k),
+        "timings": timings,
+    }
+
+
+def run_evaluation(pipeline, items, k=5, workers=4, config=None):
+    """Evaluate every item with a pool of worker threads and aggregate a comparable report"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda item: evaluate_item(pipeline, item, k), items))
+    wall_s = time.perf_counter() - start
+
+    metrics = {
+        f"recall@{k}": float(np.mean([r["recall"] for r in results])),
+        "mrr": float(np.mean([r["mrr"] for r in results])),
+        f"ndcg@{k}": float(np.mean([r["ndcg"] for r in results])),
+    }
+    latency = {}
+    for stage in sorted({stage for r in results for stage in r["timings"]}):
+        values = np.array([r["timings"].get(stage, 0.0) for r in results])
+        for p in (50, 95, 99):
+            latency[f"{stage.replace('_ms', '')}_p{p}_ms"] = float(np.percentile(values, p))
+    return {
+        "config": dict(config or {}, k=k, workers=workers, n_questions=len(items)),
+        "metrics": metrics,
+        "latency": latency,
+        "throughput_qps": len(items) / wall_s if wall_s else 0.0,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "per_question": results,
+    }
+
+
+def write_report(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def read_report(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_reports(baseline, candidate, max_quality_drop=0.02, max_latency_increase=0.25,
+                    min_latency_delta_ms=1.0):
+    """Diff two reports; quality metrics may drop by at most `max_quality_drop` (absolute) and
+    latency percentiles may grow by at most `max_latency_increase` (relative) before failing.
+    Latency changes smaller than `min_latency_delta_ms` are treated as timer noise.
+
+    Raises ValueError when the reports were run with different k, whose metrics are not comparable."""
+    base_k, candidate_k = baseline["config"].get("k"), candidate["config"].get("k")
+    if base_k != candidate_k:
+        raise ValueError(f"Reports used different k (baseline k={base_k}, candidate k={candidate_k}); "
+                         f"rerun with the same k to compare")
+    rows = []
+    for section in ("metrics", "latency"):
+        for name, base_value in baseline[section].items():
+            if name not in candidate[section]:
+                continue
+            value = candidate[section][name]
+            delta = value - base_value
+            if section == "latency":
+                regressed = (delta > min_latency_delta_ms and base_value > 0
+                             and delta / base_value > max_latency_increase)
+            else:
+                regressed = -delta > max_quality_drop
+            rows.append({"metric": name, "baseline": base_value, "candidate": value,
+                         "delta": delta, "regression": regressed})
+    return rows
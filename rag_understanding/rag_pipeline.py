@@ -0,0 +1,170 @@
+import re
+import time
+import zlib
+
+import numpy as np
+
+# Small knowledge base shared by the interactive engines (same topics as the Interactive Demo)
+SAMPLE_CORPUS = [
+    {"title": "Renewable Energy Report 2023", "content": "Renewable energy sources like solar and wind provide clean, sustainable power that reduces our dependence on fossil fuels. Solar panel costs fell by 80% over the last decade."},
+    {"title": "Environmental Benefits Study", "content": "Studies show renewable energy reduces carbon emissions by 40-60% compared to traditional energy sources. Cleaner air also lowers respiratory illness rates."},
+    {"title": "Economic Impact Analysis", "content": "Renewable energy creates jobs and reduces long-term energy costs for consumers and businesses. Wind and solar projects attract local investment."},
+    {"title": "User Account Management Guide", "content": "To reset your password, go to the login page and click 'Forgot Password'. Enter your email address and check your inbox for reset instructions."},
+    {"title": "Security Best Practices", "content": "When resetting your password, choose a strong password with at least 8 characters, including numbers and special characters. Enable two-factor authentication for extra security."},
+    {"title": "Account Recovery Procedures", "content": "If you don't receive the reset email, check your spam folder or contact support for assistance with account recovery. Locked accounts unlock automatically after 30 minutes."},
+    {"title": "Employee Handbook - Time Off Policy", "content": "Employees are entitled to 15 days of paid vacation per year, which increases to 20 days after 5 years of service. Unused vacation days can carry over up to 5 days."},
+    {"title": "Holiday Schedule 2024", "content": "The company observes 10 paid holidays per year including New Year's Day, Memorial Day, Independence Day, Labor Day, Thanksgiving, and Christmas."},
+    {"title": "Vacation Request Procedures", "content": "Vacation requests must be submitted at least 2 weeks in advance through the employee portal and require manager approval."},
+    {"title": "Medication Safety Guidelines", "content": "Common side effects may include nausea, dizziness, headache, and mild stomach upset. Contact your doctor if symptoms persist or worsen."},
+    {"title": "Drug Interaction Database", "content": "This medication may interact with certain foods, alcohol, or other medications. Consult your pharmacist about potential interactions before combining treatments."},
+    {"title": "Emergency Procedures", "content": "If you experience severe allergic reactions, difficulty breathing, or chest pain, seek immediate medical attention or call emergency services."},
+    {"title": "Expense Reimbursement Policy", "content": "Submit expense reports within 30 days of incurring expenses. Include original receipts and proper documentation for all business expenses."},
+    {"title": "Expense Report Submission Guide", "content": "Use the online expense portal to submit reports. Attach digital copies of receipts and provide detailed descriptions of each expense."},
+    {"title": "Approval Process", "content": "Expense reports require manager approval and are processed within 5-7 business days. Reimbursements are issued via direct deposit."},
+    {"title": "IPCC Climate Report 2023", "content": "Climate change is driven by greenhouse gases from burning fossil fuels. Global average temperature has risen about 1.1 degrees Celsius since pre-industrial times."},
+    {"title": "Agriculture Under Heat Stress", "content": "Rising temperatures and drought reduce crop yield for wheat, maize and rice. Irrigation and heat-tolerant varieties help farmers adapt to climate change."},
+    {"title": "FAO Food Security Outlook", "content": "Lower crop yields raise food prices and threaten food security in import-dependent countries. Extreme weather events disrupt supply chains."},
+    {"title": "World Economic Outlook", "content": "Climate change affects the global economy through damaged infrastructure, lower labour productivity and volatile food and energy prices."},
+    {"title": "Remote Work Policy", "content": "Employees may work remotely up to three days per week with manager approval. Remote workers must use the company VPN and keep their laptop encrypted."},
+    {"title": "IT Support Handbook", "content": "For laptop, VPN or email problems open a ticket in the IT help desk portal. Urgent outages can be reported by phone 24/7."},
+    {"title": "Benefits Overview", "content": "Full-time employees receive health insurance, dental and vision coverage, a 401k match of 4 percent, and an annual learning budget."},
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from has have how i if in is it its me my of on or our
+should so than that the their them there these this to was we what when where which who why will
+with you your about after before into over under up down out also just more most other some such
+""".split())
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def content_terms(text):
+    return [t for t in tokenize(text) if t not in STOPWORDS]
+
+
+def split_sentences(text):
+    return [s for s in _SENTENCE_RE.split(text) if s.strip()]
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-ngrams embedding using the signed hashing trick (no model download)"""
+
+    def __init__(self, dim=384, use_bigrams=True):
+        self.dim = dim
+        self.use_bigrams = use_bigrams
+
+    def _features(self, text):
+        terms = content_terms(text)
+        features = list(terms)
+        if self.use_bigrams:
+            features += [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+        return features
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def embed_one(self, text):
+        return self.embed([text])[0]
+
+
+class VectorIndex:
+    """Exact (flat) inner-product index over unit-normalized float32 rows"""
+
+    def __init__(self, dim):
+        self.dim = dim
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def add(self, vectors):
+        self.vectors = np.vstack([self.vectors, np.asarray(vectors, dtype=np.float32)])
+
+    def search(self, query, k=5):
+        if len(self.vectors) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = self.vectors @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return top, scores[top]
+
+
+class LocalRAGPipeline:
+    """Minimal embed -> retrieve -> generate pipeline that runs fully offline.
+
+    Generation is extractive (best-matching sentences from the retrieved passages);
+    `generation_delay_ms` simulates LLM latency so timings look like a real deployment.
+    """
+
+    def __init__(self, documents=None, embedder=None, generation_delay_ms=0.0):
+        self.documents = []
+        self.embedder = embedder or HashingEmbedder()
+        self.generation_delay_ms = generation_delay_ms
+        self.index = VectorIndex(self.embedder.dim)
+        self.doc_freq = {}
+        self.add_documents(documents if documents is not None else SAMPLE_CORPUS)
+
+    def add_documents(self, documents):
+        documents = list(documents)
+        self.documents.extend(documents)
+        texts = [f"{d['title']}. {d['content']}" for d in documents]
+        for text in texts:
+            for term in set(content_terms(text)):
+                self.doc_freq[term] = self.doc_freq.get(term, 0) + 1
+        if texts:
+            self.index.add(self.embedder.embed(texts))
+
+    def idf(self, term):
+        return float(np.log((1 + len(self.documents)) / (1 + self.doc_freq.get(term, 0))) + 1.0)
+
+    def retrieve(self, query, k=3, timings=None):
+        start = time.perf_counter()
+        query_vector = self.embedder.embed_one(query)
+        embedded = time.perf_counter()
+        ids, scores = self.index.search(query_vector, k)
+        searched = time.perf_counter()
+        if timings is not None:
+            timings["embed_ms"] = timings.get("embed_ms", 0.0) + (embedded - start) * 1000
+            timings["search_ms"] = timings.get("search_ms", 0.0) + (searched - embedded) * 1000
+        return [dict(self.documents[i], doc_id=int(i), score=float(s)) for i, s in zip(ids, scores)]
+
+    def generate(self, query, passages, max_sentences=3, timings=None,
+                 fallback="I could not find this in the knowledge base."):
+        start = time.perf_counter()
+        if self.generation_delay_ms:
+            time.sleep(self.generation_delay_ms / 1000)
+        query_terms = set(content_terms(query))
+        candidates = []
+        for passage in passages:
+            for sentence in split_sentences(passage["content"]):
+                overlap = len(query_terms & set(content_terms(sentence)))
+                candidates.append((overlap, passage.get("score", 0.0), sentence))
+        candidates.sort(key=lambda c: (c[0], c[1]), reverse=True)
+        answer = " ".join(c[2] for c in candidates[:max_sentences] if c[0] > 0)
+        if not answer:
+            answer = fallback
+        if timings is not None:
+            timings["generate_ms"] = timings.get("generate_ms", 0.0) + (time.perf_counter() - start) * 1000
+        return answer
+
+    def answer(self, query, k=3):
+        timings = {}
+        start = time.perf_counter()
+        passages = self.retrieve(query, k=k, timings=timings)
+        text = self.generate(query, passages, timings=timings)
+        timings["total_ms"] = (time.perf_counter() - start) * 1000
+        return {"query": query, "answer": text, "passages": passages, "timings": timings}
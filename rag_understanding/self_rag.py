@@ -0,0 +1,207 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from rag_pipeline import content_terms, split_sentences, tokenize
+
+
+def context_hash(passages):
+    """Stable fingerprint of a retrieved context (order-independent)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for key in sorted(f"{p.get('doc_id')}:{p['content']}" for p in passages):
+        digest.update(key.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ReflectionCache:
+    """LRU memo of reflection verdicts keyed by (normalized query, context hash). Safe to share
+    across threads."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query, passages):
+        return " ".join(query.lower().split()), context_hash(passages)
+
+    def get(self, key):
+        with self._lock:
+            verdict = self._entries.get(key)
+            if verdict is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return verdict
+
+    def put(self, key, verdict):
+        with self._lock:
+            self._entries[key] = verdict
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def reflect(query, answer, passages):
+    """Heuristic critic: how well the context covers the query and supports the answer.
+
+    Returns relevance (query terms found in the context), support (answer sentences grounded in
+    the context), the combined score and the query terms the context is still missing.
+    """
+    query_terms = set(content_terms(query))
+    context_terms = set()
+    for passage in passages:
+        context_terms.update(content_terms(passage["title"] + " " + passage["content"]))
+    missing = sorted(query_terms - context_terms)
+    relevance = 1 - len(missing) / len(query_terms) if query_terms else 0.0
+
+    sentences = split_sentences(answer)
+    grounded = 0
+    for sentence in sentences:
+        terms = set(content_terms(sentence))
+        if terms and len(terms & context_terms) / len(terms) >= 0.6:
+            grounded += 1
+    support = grounded / len(sentences) if sentences and passages else 0.0
+    return {"relevance": relevance, "support": support,
+            "score": 0.5 * relevance + 0.5 * support, "missing_terms": missing}
+
+
+class SelfRAGController:
+    """Generate -> reflect -> re-retrieve loop with hard budgets.
+
+    The loop stops as soon as the answer passes `quality_threshold` or any budget is exhausted:
+    reflection rounds, wall-clock time, generator calls or cumulative prompt tokens. Reflection verdicts are memoized per
+    (query, context hash), so re-running a query over the same context skips the critic.
+
+    The wall-time budget is checked before each generate, reflect and re-retrieve step, so a run can
+    overshoot it by at most one step.
+    """
+
+    def __init__(self, pipeline, max_rounds=3, max_wall_ms=2000.0, max_generator_calls=3,
+                 max_prompt_tokens=None, quality_threshold=0.75, k=3, k_step=2,
+                 reflection_delay_ms=0.0, cache=None):
+        self.pipeline = pipeline
+        self.max_rounds = max_rounds
+        self.max_wall_ms = max_wall_ms
+        self.max_generator_calls = max_generator_calls
+        self.max_prompt_tokens = max_prompt_tokens
+        self.quality_threshold = quality_threshold
+        self.k = k
+        self.k_step = k_step
+        self.reflection_delay_ms = reflection_delay_ms
+        self.cache = cache if cache is not None else ReflectionCache()
+
+    def _reflect(self, query, answer, passages):
+        key = self.cache.key(query, passages)
+        verdict = self.cache.get(key)
+        if verdict is not None:
+            return verdict, True
+        if self.reflection_delay_ms:
+            time.sleep(self.reflection_delay_ms / 1000)
+        verdict = reflect(query, answer, passages)
+        self.cache.put(key, verdict)
+        return verdict, False
+
+    def run(self, query):
+        start = time.perf_counter()
+        elapsed_ms = lambda: (time.perf_counter() - start) * 1000
+
+        k = self.k
+        timings = {}
+        passages = self.pipeline.retrieve(query, k=k, timings=timings)
+        rounds = []
+        answer = None
+        generator_calls = 0
+        prompt_tokens = 0
+        stop_reason = None
+
+        for round_number in range(1, self.max_rounds + 1):
+            if generator_calls >= self.max_generator_calls:
+                stop_reason = "generator_budget"
+                break
+            if elapsed_ms() >= self.max_wall_ms:
+                stop_reason = "time_budget"
+                break
+            round_tokens = len(tokenize(query)) + sum(len(tokenize(p["content"])) for p in passages)
+            if self.max_prompt_tokens is not None and prompt_tokens + round_tokens > self.max_prompt_tokens:
+                stop_reason = "token_budget"
+                break
+
+            t0 = time.perf_counter()
+            answer = self.pipeline.generate(query, passages)
+            generator_calls += 1
+            prompt_tokens += round_tokens
+            t1 = time.perf_counter()
+            record = {
+                "round": round_number,
+                "k": k,
+                "passages": len(passages),
+                "prompt_tokens": round_tokens,
+                "generate_ms": (t1 - t0) * 1000,
+                "reflect_ms": 0.0,
+                "reflection_cached": False,
+                "relevance": None,
+                "support": None,
+                "score": None,
+                "retrieve_ms": 0.0,
+            }
+            rounds.append(record)
+            if elapsed_ms() >= self.max_wall_ms:
+                # the answer stands unreviewed rather than paying for a critic call past the deadline
+                stop_reason = "time_budget"
+                break
+
+            verdict, cached = self._reflect(query, answer, passages)
+            record.update(reflect_ms=(time.perf_counter() - t1) * 1000, reflection_cached=cached,
+                          relevance=verdict["relevance"], support=verdict["support"], score=verdict["score"])
+
+            if verdict["score"] >= self.quality_threshold:
+                stop_reason = "accepted"
+                break
+            if round_number == self.max_rounds:
+                stop_reason = "round_budget"
+                break
+            if elapsed_ms() >= self.max_wall_ms:
+                stop_reason = "time_budget"
+                break
+
+            # Re-retrieve: widen k and steer the query toward the terms the context is missing
+            t3 = time.perf_counter()
+            k += self.k_step
+            follow_up = " ".join([query] + verdict["missing_terms"])
+            seen = {p["doc_id"] for p in passages}
+            new = [p for p in self.pipeline.retrieve(follow_up, k=k, timings=timings) if p["doc_id"] not in seen]
+            record["retrieve_ms"] = (time.perf_counter() - t3) * 1000
+            if not new:
+                stop_reason = "no_new_evidence"
+                break
+            passages = passages + new
+
+        reflected = [r for r in rounds if r["score"] is not None]
+        return {
+            "query": query,
+            "answer": answer,
+            "passages": passages,
+            "rounds": rounds,
+            "stop_reason": stop_reason,
+            "generator_calls": generator_calls,
+            "prompt_tokens": prompt_tokens,
+            "wall_ms": elapsed_ms(),
+            # this run's verdicts only; the shared cache's lifetime rate mixes in other sessions
+            "cache_hit_rate": (sum(r["reflection_cached"] for r in reflected) / len(reflected)
+                               if reflected else 0.0),
+        }
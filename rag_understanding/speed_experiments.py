@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from context_builder import with_near_duplicates
+from load_testing import LoadTester
+from rag_evaluation import SAMPLE_EVAL_PATH, load_eval_set
+from rag_pipeline import SAMPLE_CORPUS, LocalRAGPipeline
+
+OPTIMIZATIONS = {
+    "cache": "Enable Caching",
+    "parallel": "Use Parallel Processing",
+    "index": "Optimize Index",
+    "precompute": "Pre-compute Embeddings",
+}
+
+
+def kmeans(vectors, n_clusters, iterations=10, seed=0):
+    """Spherical k-means on unit vectors (cosine assignment, renormalized centroids)"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(n_clusters):
+            members = vectors[assignment == c]
+            if len(members):
+                centroid = members.sum(axis=0)
+                centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+    return centroids, np.argmax(vectors @ centroids.T, axis=1)
+
+
+class IVFIndex:
+    """Inverted-file index: vectors are bucketed by nearest k-means centroid and a query only scans
+    the `nprobe` closest buckets instead of the whole matrix (per call, or the index default)"""
+
+    def __init__(self, vectors, n_lists=None, nprobe=4, seed=0):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n_lists = n_lists or max(int(np.sqrt(len(vectors))), 1)
+        self.nprobe = nprobe
+        self.centroids, assignment = kmeans(vectors, min(n_lists, len(vectors)), seed=seed)
+        order = np.argsort(assignment, kind="stable")
+        self.ids = order
+        self.vectors = vectors[order]
+        self.offsets = np.searchsorted(assignment[order], np.arange(len(self.centroids) + 1))
+
+    def search(self, query, k=5, nprobe=None):
+        probes = np.argsort(-(self.centroids @ query))[:nprobe or self.nprobe]
+        rows = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes])
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = self.vectors[rows] @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return self.ids[rows[top]], scores[top]
+
+
+class SpeedTestPipeline:
+    """Request handler over a shared base pipeline where each optimization toggles a real component.
+
+    - cache: LRU of finished answers keyed by the normalized query
+    - index: IVF search over k-means buckets instead of the exact flat scan
+    - precompute: query embeddings for the known query log are looked up instead of calling the
+      embedding model (whose per-call latency is `embed_delay_ms`)
+    Parallel processing is not a handler property; it is the size of the worker pool serving requests.
+    """
+
+    def __init__(self, base, optimizations=(), ivf=None, query_vectors=None, embed_delay_ms=0.0,
+                 generation_delay_ms=0.0, cache_size=1024, nprobe=None):
+        self.base = base
+        self.optimizations = set(optimizations)
+        self.ivf = ivf
+        self.nprobe = nprobe
+        self.query_vectors = query_vectors or {}
+        self.embed_delay_ms = embed_delay_ms
+        self.generation_delay_ms = generation_delay_ms
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        if "index" in self.optimizations and ivf is None:
+            raise ValueError("Index optimization needs a prebuilt IVF index")
+
+    def _embed(self, query):
+        if "precompute" in self.optimizations:
+            vector = self.query_vectors.get(" ".join(query.lower().split()))
+            if vector is not None:
+                return vector
+        if self.embed_delay_ms:
+            time.sleep(self.embed_delay_ms / 1000)
+        return self.base.embedder.embed_one(query)
+
+    def answer(self, query, k=3):
+        key = " ".join(query.lower().split())
+        if "cache" in self.optimizations:
+            with self._lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    self.cache_hits += 1
+                    return self._cache[key]
+
+        vector = self._embed(query)
+        if "index" in self.optimizations:
+            ids, scores = self.ivf.search(vector, k, self.nprobe)
+        else:
+            ids, scores = self.base.index.search(vector, k)
+        passages = [dict(self.base.documents[i], doc_id=int(i), score=float(s)) for i, s in zip(ids, scores)]
+        if self.generation_delay_ms:
+            time.sleep(self.generation_delay_ms / 1000)
+        answer = self.base.generate(query, passages)
+
+        if "cache" in self.optimizations:
+            with self._lock:
+                self._cache[key] = answer
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return answer
+
+
+def build_speed_testbed(n_documents=20000, nprobe=8, seed=0):
+    """Base pipeline over a scaled-up corpus, its IVF index and precomputed query-log embeddings"""
+    copies = max(n_documents // len(SAMPLE_CORPUS) - 1, 0)
+    base = LocalRAGPipeline(with_near_duplicates(SAMPLE_CORPUS, copies=copies, seed=seed))
+    ivf = IVFIndex(base.index.vectors, nprobe=nprobe, seed=seed)
+    queries = [item["question"] for item in load_eval_set(SAMPLE_EVAL_PATH)]
+    vectors = base.embedder.embed(queries)
+    query_vectors = {" ".join(q.lower().split()): v for q, v in zip(queries, vectors)}
+    return {"base": base, "ivf": ivf, "queries": queries, "query_vectors": query_vectors}
+
+
+def zipf_workload(queries, n_requests, skew=1.1, seed=0):
+    """Request stream where a few popular questions repeat often, as in real query logs"""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, len(queries) + 1) ** skew
+    picks = rng.choice(len(queries), n_requests, p=weights / weights.sum())
+    return [queries[i] for i in picks]
+
+
+def index_recall(testbed, k=3, nprobe=None):
+    """Share of IVF results scoring at least as high as the exact k-th neighbour (tie-aware recall@k,
+    since near-duplicate documents make the exact top-k ids ambiguous)"""
+    base, ivf = testbed["base"], testbed["ivf"]
+    recalls = []
+    for vector in testbed["query_vectors"].values():
+        _, exact_scores = base.index.search(vector, k)
+        _, approx_scores = ivf.search(vector, k, nprobe)
+        recalls.append(np.sum(approx_scores >= exact_scores[-1] - 1e-6) / len(exact_scores))
+    return float(np.mean(recalls))
+
+
+def run_speed_experiment(testbed, optimizations, qps=30.0, n_requests=150, workers=8, embed_delay_ms=10.0,
+                         generation_delay_ms=20.0, slo_ms=1000.0, k=3, nprobe=None, seed=0):
+    """Replay the same open-loop workload with and without the selected optimizations.
+
+    Returns {"baseline": ..., "optimized": ...}, each with the load-test summary and the raw
+    per-request latencies, plus the cache hit rate of the optimized run. `nprobe` is passed per search,
+    so the shared testbed index is never modified.
+    """
+    workload = zipf_workload(testbed["queries"], n_requests, seed=seed)
+    runs = {}
+    for name, enabled in (("baseline", ()), ("optimized", tuple(optimizations))):
+        handler = SpeedTestPipeline(testbed["base"], enabled, ivf=testbed["ivf"],
+                                    query_vectors=testbed["query_vectors"], embed_delay_ms=embed_delay_ms,
+                                    generation_delay_ms=generation_delay_ms, nprobe=nprobe)
+        tester = LoadTester(handler, workload, workers=workers if "parallel" in enabled else 1, k=k)
+        # queries are replayed in workload order, so both runs see the identical request stream
+        summary, results = tester.run(mode="open", slo_ms=slo_ms, qps=qps, duration_s=n_requests / qps,
+                                      max_requests=n_requests, seed=seed)
+        summary["cache_hit_rate"] = handler.cache_hits / len(results) if results else 0.0
+        runs[name] = {"summary": summary,
+                      "latencies_ms": [r["latency_ms"] for r in results if r["error"] is None]}
+    return runs
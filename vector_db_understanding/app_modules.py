@@ -12,6 +12,10 @@ from query_functions import show_knn_demo, show_range_queries, show_ann_demo, sh
 # Import performance functions
 from performance_functions import show_memory_optimization, show_computational_optimization, show_query_optimization, show_performance_monitoring
 
+# Import local embedding backends
+from embedding_runner import EmbeddingRunner, HashingBackend, load_backend, sample_texts
+from embedding_benchmark import available_backends, backend_label, run_benchmark
+
 # Import technology and example functions
 from technology_examples import (
     show_qdrant_details, show_pinecone_details, show_pgvector_details, show_chroma_details, show_technology_comparison,
@@ -57,20 +61,20 @@ def show_bert_details():
         text_input = st.text_input("Enter text to see BERT embedding:", "The cat sat on the mat")
         
         if text_input:
-            # Simulate BERT embedding (simplified)
-            st.markdown("**Step 1: Tokenization**")
-            tokens = text_input.split()
-            st.write(f"Tokens: {tokens}")
+            runner, note = get_embedding_runner(fallback_dim=768)
             
-            st.markdown("**Step 2: Add Special Tokens**")
-            tokens_with_special = ["[CLS]"] + tokens + ["[SEP]"]
-            st.write(f"With special tokens: {tokens_with_special}")
+            st.markdown("**Step 1: Tokenization (with special tokens)**")
+            tokens = runner.backend.tokenize(text_input)
+            st.write(f"Tokens ({len(tokens)}): {tokens}")
             
-            st.markdown("**Step 3: Generate 768D Embedding**")
-            # Simulate embedding values
-            embedding = np.random.randn(768) * 0.1
-            st.write(f"Embedding shape: {embedding.shape}")
-            st.write(f"Sample values: {embedding[:5]}")
+            st.markdown("**Step 2: Encode to an Embedding**")
+            embedding, stats = runner.embed_one(text_input, return_stats=True)
+            st.write(f"Backend: `{runner.backend.name}` · embedding shape: {embedding.shape} · "
+                     f"latency: {stats['latency_ms']:.2f} ms")
+            st.write(f"Sample values: {np.round(embedding[:5], 4)}")
+            if note:
+                st.caption(f"No local transformer model available ({note}); using the deterministic hashing "
+                           "fallback. Install sentence-transformers to run a real BERT-family encoder on CPU.")
             
             # Visualize embedding dimensions
             fig = go.Figure()
@@ -81,11 +85,13 @@ def show_bert_details():
                 line=dict(color='blue', width=2)
             ))
             fig.update_layout(
-                title='BERT Embedding (First 50 Dimensions)',
+                title='Embedding (First 50 Dimensions)',
                 xaxis_title='Dimension',
                 yaxis_title='Value'
             )
             st.plotly_chart(fig, use_container_width=True)
+        
+        show_batch_embedding_benchmark(768, key="bert")
     
     with col2:
         st.markdown("#### 📊 BERT Characteristics")
@@ -157,11 +163,16 @@ response = openai.Embedding.create(
 )
             """)
             
-            st.markdown("**Step 2: Extract 1536D Embedding**")
-            # Simulate embedding values
-            embedding = np.random.randn(1536) * 0.1
+            st.markdown("**Step 2: Extract the Embedding (local, no API cost)**")
+            runner, note = get_embedding_runner(fallback_dim=1536)
+            embedding, stats = runner.embed_one(text_input, return_stats=True)
+            st.write(f"Computed locally with `{runner.backend.name}` in {stats['latency_ms']:.2f} ms "
+                     f"({stats['tokens']} tokens) - no API call was made")
             st.write(f"Embedding shape: {embedding.shape}")
-            st.write(f"Sample values: {embedding[:5]}")
+            if runner.dim != 1536:
+                st.caption(f"`{runner.backend.name}` produces {runner.dim}-d embeddings; "
+                           "text-embedding-ada-002 returns 1536-d.")
+            st.write(f"Sample values: {np.round(embedding[:5], 4)}")
             
             # Visualize embedding dimensions
             fig = go.Figure()
@@ -172,7 +183,7 @@ response = openai.Embedding.create(
                 line=dict(color='green', width=2)
             ))
             fig.update_layout(
-                title='OpenAI Embedding (First 50 Dimensions)',
+                title='Local Embedding (First 50 Dimensions)',
                 xaxis_title='Dimension',
                 yaxis_title='Value'
             )
@@ -217,6 +228,48 @@ response = openai.Embedding.create(
         - Cloud-based applications
         """)
 
+@st.cache_resource(show_spinner=False)
+def get_model_runner():
+    """Local transformer model shared across reruns and pages, so it loads once.
+    Returns (runner, note); runner is None when no model is available."""
+    backend, note = load_backend()
+    if isinstance(backend, HashingBackend):
+        return None, note
+    return EmbeddingRunner(backend), note
+
+@st.cache_resource(show_spinner=False)
+def get_hashing_runner(dim):
+    return EmbeddingRunner(HashingBackend(dim))
+
+def get_embedding_runner(fallback_dim):
+    """The shared model runner, or a hashing fallback of `fallback_dim` when no model is available.
+    A real model keeps its own dimension."""
+    runner, note = get_model_runner()
+    if runner is None:
+        runner = get_hashing_runner(fallback_dim)
+    return runner, note
+
+def show_batch_embedding_benchmark(dim, key):
+    st.markdown("#### ⚡ Batch Embedding Throughput")
+    
+    n_texts = st.slider("Texts to embed:", 100, 5000, 1000, step=100, key=f"{key}_n_texts")
+    max_batch_tokens = st.select_slider("Max padded tokens per batch:", [1024, 2048, 4096, 8192, 16384, 32768],
+                                        value=8192, key=f"{key}_batch_tokens")
+    
+    if st.button("Run Batch Benchmark", key=f"{key}_batch_run"):
+        runner, _ = get_embedding_runner(fallback_dim=dim)
+        texts = sample_texts(n_texts)
+        rows = []
+        for label, bucket in (("Arrival order, fixed size", False), ("Length-bucketed, dynamic size", True)):
+            _, stats = runner.embed(texts, bucket=bucket, max_batch_tokens=max_batch_tokens, return_stats=True)
+            rows.append(dict(stats, batching=label))
+        df = pd.DataFrame(rows)
+        st.dataframe(df[["batching", "batches", "tokens", "padded_tokens", "padding_efficiency", "latency_ms",
+                         "tokens_per_s", "p50_batch_ms", "p95_batch_ms"]].round(2), use_container_width=True, hide_index=True)
+        st.caption("Padded tokens are what a transformer actually computes: bucketing by length avoids padding "
+                   "short texts to the longest one in their batch. The hashing fallback does not pay for padding, "
+                   "so its latency barely changes; transformer backends speed up roughly with padding efficiency.")
+
 def show_model_comparison():
     st.markdown("### 📊 BERT vs OpenAI Embeddings Comparison")
     
@@ -233,28 +286,17 @@ def show_model_comparison():
     col1, col2 = st.columns([1, 1])
     
     with col1:
-        st.markdown("#### 🎯 Performance Comparison")
+        st.markdown("#### 🎯 Similarity Comparison")
         
-        # Simulate similarity scores for same documents
         documents = ["The cat sat on the mat", "A feline rested on the rug", "The dog ran in the park"]
+        backends, _ = get_benchmark_backends()
         
-        st.markdown("**Document Similarities:**")
+        st.markdown(f"**Similarity to \"{documents[0]}\" with each local backend:**")
+        similarities = {backend_label(b): b.encode(documents) @ b.encode(documents[:1])[0] for b in backends}
+        st.dataframe(pd.DataFrame(similarities, index=documents).round(2), use_container_width=True)
         
-        # BERT similarities (simulated)
-        bert_similarities = [1.0, 0.85, 0.23]
-        
-        # OpenAI similarities (simulated)
-        openai_similarities = [1.0, 0.92, 0.18]
-        
-        for i, doc in enumerate(documents):
-            st.write(f"**{doc}**")
-            col_a, col_b = st.columns(2)
-            with col_a:
-                st.metric("BERT", f"{bert_similarities[i]:.2f}")
-            with col_b:
-                st.metric("OpenAI", f"{openai_similarities[i]:.2f}")
-        
-        st.info("💡 OpenAI finds higher similarity for semantically similar text")
+        st.info("💡 A paraphrase with no shared words (\"feline\", \"rug\") only scores high with a semantic model; "
+                "lexical hashing embeddings see it as unrelated.")
     
     with col2:
         st.markdown("#### 💾 Memory Usage Comparison")
@@ -275,6 +317,56 @@ def show_model_comparison():
             st.success(f"💡 BERT saves {((openai_memory - bert_memory) / openai_memory * 100):.1f}% storage!")
         else:
             st.warning("OpenAI uses more storage due to higher dimensions")
+    
+    show_embedding_benchmark()
+
+@st.cache_resource(show_spinner=False)
+def get_benchmark_backends():
+    return available_backends()
+
+def show_embedding_benchmark():
+    st.markdown("#### ⚡ Measured Benchmark of Local Embedding Backends")
+    
+    st.markdown("""
+    Every embedding backend available on this machine is benchmarked on one CPU core: throughput at
+    batch sizes 1-256, model and index memory, and retrieval quality on a bundled set of 20 queries
+    (many of them paraphrases) over 16 documents.
+    """)
+    
+    backends, skipped = get_benchmark_backends()
+    n_texts = st.slider("Benchmark texts per batch size:", 64, 2048, 256, step=64)
+    
+    if st.button("Run Embedding Benchmark"):
+        with st.spinner(f"Benchmarking {len(backends)} backend(s)..."):
+            st.session_state["embedding_benchmark"] = run_benchmark(backends, n_texts=n_texts)
+    
+    if skipped:
+        with st.expander(f"{len(skipped)} backend(s) not available"):
+            for label, reason in skipped.items():
+                st.write(f"**{label}**: {reason}")
+    
+    results = st.session_state.get("embedding_benchmark")
+    if results is None:
+        return
+    summary, throughput = pd.DataFrame(results[0]), pd.DataFrame(results[1])
+    
+    st.dataframe(summary.rename(columns={
+        "backend": "Backend", "dim": "Dimensions", "bytes_per_vector": "Bytes/vector", "index_gb_per_1m": "Index GB per 1M",
+        "model_mb": "Model MB", "texts_per_s_per_core": "Texts/s per core", "best_batch_size": "Best batch",
+        "recall@3": "Recall@3", "mrr": "MRR"
+    }).round(3), use_container_width=True, hide_index=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = px.line(throughput, x="batch_size", y="texts_per_s", color="backend", markers=True, log_x=True,
+                      title="Throughput vs batch size (1 core)",
+                      labels={"batch_size": "Batch size", "texts_per_s": "Texts per second", "backend": "Backend"})
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        fig = px.scatter(summary, x="texts_per_s_per_core", y="recall@3", size="bytes_per_vector", color="backend",
+                         log_x=True, title="Quality vs throughput (bubble size = vector size)",
+                         labels={"texts_per_s_per_core": "Texts/s per core", "recall@3": "Recall@3", "backend": "Backend"})
+        st.plotly_chart(fig, use_container_width=True)
 
 def show_model_selection_guide():
     st.markdown("### 🎯 When to Use Each Model")
@@ -415,6 +507,25 @@ def show_model_selection_guide():
     
     df = pd.DataFrame(decision_data)
     st.table(df)
+    
+    # Measured numbers from the benchmark on the Comparison page
+    st.markdown("### ⚡ Measured on This Machine")
+    results = st.session_state.get("embedding_benchmark")
+    if results is None:
+        st.info("Run the embedding benchmark on the **Comparison** page to rank the locally available models "
+                "by throughput per CPU core and retrieval quality.")
+        return
+    
+    summary = pd.DataFrame(results[0])
+    min_recall = st.slider("Minimum Recall@3 on the bundled eval set:", 0.0, 1.0, 0.7, step=0.05)
+    eligible = summary[summary["recall@3"] >= min_recall].sort_values("texts_per_s_per_core", ascending=False)
+    if eligible.empty:
+        st.warning("No measured backend reaches that recall - a semantic model (sentence-transformers) is needed.")
+    else:
+        best = eligible.iloc[0]
+        st.success(f"**Fastest backend meeting Recall@3 ≥ {min_recall:.2f}: {best['backend']}** - "
+                   f"{best['texts_per_s_per_core']:,.0f} texts/s per core at batch size {best['best_batch_size']}, "
+                   f"Recall@3 {best['recall@3']:.2f}, {best['bytes_per_vector']:,} bytes per vector.")
 
 def show_index_types():
     st.markdown('<h2 class="section-header">🏗️ Index Types</h2>', unsafe_allow_html=True)
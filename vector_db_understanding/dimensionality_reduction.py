@@ -0,0 +1,144 @@
+import time
+
+import numpy as np
+from sklearn.decomposition import IncrementalPCA
+from sklearn.random_projection import GaussianRandomProjection, SparseRandomProjection
+
+from distance_kernels import top_k
+
+REDUCTION_METHODS = {
+    "pca": "Incremental PCA",
+    "gaussian": "Gaussian random projection",
+    "sparse": "Sparse random projection",
+}
+
+
+def iter_chunks(source, chunk_size=4096, min_rows=1):
+    """Yield consecutive row slices of an array or memmap; a short tail is merged into the last chunk
+    so every chunk has at least `min_rows` rows (IncrementalPCA needs n_components rows per batch)"""
+    starts = list(range(0, len(source), chunk_size))
+    if len(starts) > 1 and len(source) - starts[-1] < min_rows:
+        starts.pop()
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(source)
+        yield start, np.asarray(source[start:end], dtype=np.float32)
+
+
+class StreamingReducer:
+    """Dimensionality reduction stage for stored vectors.
+
+    `fit` learns the projection from a random sample of rows (PCA via IncrementalPCA.partial_fit, one
+    chunk at a time); `transform` projects a collection chunk by chunk into a preallocated output,
+    which can itself be a memmap, so neither side has to fit in memory. With `normalize=True` the
+    reduced rows are re-normalized for cosine search.
+    """
+
+    def __init__(self, method="pca", n_components=256, normalize=True, seed=0):
+        if method not in REDUCTION_METHODS:
+            raise ValueError(f"Unknown method {method!r}; expected one of {list(REDUCTION_METHODS)}")
+        self.method = method
+        self.n_components = n_components
+        self.normalize = normalize
+        self.seed = seed
+        self.model = None
+        self.fit_seconds = 0.0
+
+    def fit(self, source, sample_size=4000, chunk_size=2048):
+        start = time.perf_counter()
+        rng = np.random.default_rng(self.seed)
+        rows = np.sort(rng.choice(len(source), min(sample_size, len(source)), replace=False))
+        sample = np.asarray(source[rows], dtype=np.float32)
+        if self.method == "pca":
+            self.model = IncrementalPCA(n_components=self.n_components)
+            for _, chunk in iter_chunks(sample, max(chunk_size, self.n_components), self.n_components):
+                self.model.partial_fit(chunk)
+        elif self.method == "gaussian":
+            self.model = GaussianRandomProjection(self.n_components, random_state=self.seed).fit(sample)
+        else:
+            self.model = SparseRandomProjection(self.n_components, dense_output=True,
+                                                random_state=self.seed).fit(sample)
+        self.fit_seconds = time.perf_counter() - start
+        return self
+
+    def truncated(self, n_components):
+        """PCA components are nested: the first k of a fitted reducer are the k-component solution"""
+        if self.method != "pca" or n_components > self.n_components:
+            raise ValueError("Only a fitted PCA reducer can be truncated to fewer components")
+        reducer = StreamingReducer("pca", n_components, self.normalize, self.seed)
+        reducer.model = self.model
+        reducer.fit_seconds = self.fit_seconds
+        return reducer
+
+    def transform_chunk(self, chunk):
+        if self.method == "pca":
+            reduced = (chunk - self.model.mean_) @ self.model.components_[:self.n_components].T
+        else:
+            reduced = self.model.transform(chunk)
+        reduced = np.asarray(reduced, dtype=np.float32)
+        if self.normalize:
+            norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+            reduced /= np.where(norms == 0, 1.0, norms)
+        return reduced
+
+    def transform(self, source, chunk_size=4096, out=None):
+        if self.model is None:
+            raise ValueError("Reducer must be fitted before transform")
+        out = out if out is not None else np.empty((len(source), self.n_components), dtype=np.float32)
+        for start, chunk in iter_chunks(source, chunk_size):
+            out[start:start + len(chunk)] = self.transform_chunk(chunk)
+        return out
+
+
+def synthetic_embeddings(n=10000, dim=1536, n_clusters=64, decay=0.7, seed=0, return_labels=False,
+                         chunk_size=100000, rotate=True):
+    """Unit vectors with the structure of real embeddings: topic clusters and a variance spectrum that
+    decays with dimension (a power law), randomly rotated so no axis is special. Generated in chunks so
+    large collections only need their float32 output in memory; `return_labels` also returns the topics.
+
+    With `rotate=False` the variance decays along the coordinate order, as in Matryoshka-trained models
+    whose leading dimensions carry most of the information."""
+    rng = np.random.default_rng(seed)
+    rotation, _ = np.linalg.qr(rng.standard_normal((dim, dim))) if rotate else (None, None)
+    spectrum = np.arange(1, dim + 1) ** -decay
+    centers = rng.standard_normal((n_clusters, dim)) * spectrum
+    labels = rng.integers(0, n_clusters, n)
+    vectors = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, chunk_size):
+        chunk_labels = labels[start:start + chunk_size]
+        latent = centers[chunk_labels] + 0.5 * rng.standard_normal((len(chunk_labels), dim)) * spectrum
+        chunk = (latent @ rotation if rotate else latent).astype(np.float32)
+        vectors[start:start + len(chunk)] = chunk / np.linalg.norm(chunk, axis=1, keepdims=True)
+    return (vectors, labels) if return_labels else vectors
+
+
+def recall_vs_dimension(vectors, queries, dims=(32, 64, 128, 256, 512), methods=("pca", "gaussian"), k=10,
+                        sample_size=4000, seed=0):
+    """Recall@k of cosine search in each reduced space against exact search on the original vectors.
+
+    PCA is fitted once at the largest dimension and truncated for the smaller ones.
+    """
+    exact, _ = top_k(queries, vectors, k, "cosine")
+    rows = []
+    for method in methods:
+        full = None
+        for dim in sorted(dims, reverse=True):
+            if method == "pca":
+                full = full or StreamingReducer("pca", dim, seed=seed).fit(vectors, sample_size)
+                reducer = full.truncated(dim)
+            else:
+                reducer = StreamingReducer(method, dim, seed=seed).fit(vectors, sample_size)
+            start = time.perf_counter()
+            reduced = reducer.transform(vectors)
+            transform_s = time.perf_counter() - start
+            found, _ = top_k(reducer.transform(queries), reduced, k, "cosine")
+            recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(found, exact)])
+            rows.append({
+                "method": REDUCTION_METHODS[method],
+                "dim": dim,
+                f"recall@{k}": float(recall),
+                "recall_loss": float(1 - recall),
+                "memory_ratio": vectors.shape[1] / dim,
+                "fit_s": reducer.fit_seconds,
+                "transform_ms_per_1k": transform_s * 1e6 / len(vectors),
+            })
+    return sorted(rows, key=lambda row: (row["method"], row["dim"]))
@@ -0,0 +1,208 @@
+import math
+import time
+
+import numpy as np
+
+METRICS = ["cosine", "l2", "inner_product", "l1", "hamming"]
+
+METRIC_LABELS = {
+    "cosine": "Cosine similarity",
+    "l2": "Euclidean (L2) distance",
+    "inner_product": "Dot product",
+    "l1": "Manhattan (L1) distance",
+    "hamming": "Hamming distance",
+}
+
+# Metrics where a larger value means more similar; the others are distances
+SIMILARITY_METRICS = {"cosine", "inner_product"}
+
+# Upper bound on the temporary arrays a single block may allocate
+DEFAULT_BLOCK_BYTES = 64 * 2 ** 20
+
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(codes):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(codes)
+    return _BYTE_POPCOUNT[codes]
+
+
+def _as_matrix(x):
+    """2-D float array; float inputs keep their precision, lists and integers become float64"""
+    x = np.asarray(x)
+    if x.ndim == 1:
+        x = x[None, :]
+    return x if np.issubdtype(x.dtype, np.floating) else x.astype(np.float64)
+
+
+def pack_bits(x):
+    """Binary codes packed 8 bits per byte; values > 0 are set bits"""
+    return np.packbits(np.asarray(x) > 0, axis=-1)
+
+
+def _as_codes(x, packed=False):
+    """2-D packed codes; with `packed` the input already comes from `pack_bits`, otherwise it is
+    binarized and packed whatever its dtype"""
+    x = np.asarray(x)
+    if x.ndim == 1:
+        x = x[None, :]
+    if not packed:
+        return pack_bits(x)
+    if x.dtype != np.uint8:
+        raise ValueError(f"Packed codes must be uint8, got {x.dtype}")
+    return x
+
+
+def _safe_norms(x):
+    norms = np.linalg.norm(x, axis=1)
+    norms[norms == 0] = 1.0  # zero vectors get similarity 0 with everything
+    return norms
+
+
+def _broadcast_reduce(a_rows, b, reduce, max_block_bytes):
+    """reduce(a_rows[:, None, :], b_chunk[None, :, :]) in column chunks that fit the memory budget"""
+    out = np.empty((len(a_rows), len(b)), dtype=np.promote_types(a_rows.dtype, np.float32))
+    step = max(1, int(max_block_bytes // max(len(a_rows) * a_rows.shape[1] * a_rows.itemsize, 1)))
+    for start in range(0, len(b), step):
+        out[:, start:start + step] = reduce(a_rows[:, None, :], b[None, start:start + step, :])
+    return out
+
+
+def iter_pairwise_blocks(a, b, metric="cosine", max_block_bytes=DEFAULT_BLOCK_BYTES, packed=False):
+    """Yield (row_start, block) where block holds the metric between a[row_start:...] and all of b.
+
+    Rows are processed in blocks sized so no temporary exceeds `max_block_bytes`, which lets callers
+    reduce huge N x M problems (e.g. top-k) without materializing the full matrix.
+    L2 uses ||a||^2 + ||b||^2 - 2ab so the work is one matrix product per block. Hamming binarizes
+    its inputs first unless `packed` says they are codes already packed with `pack_bits`.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}; expected one of {METRICS}")
+    if metric == "hamming":
+        a, b = _as_codes(a, packed), _as_codes(b, packed)
+        reduce = lambda x, y: _popcount(x ^ y).sum(axis=2, dtype=np.int64)
+    else:
+        a, b = _as_matrix(a), _as_matrix(b)
+        reduce = lambda x, y: np.abs(x - y).sum(axis=2)
+    if a.shape[1] != b.shape[1]:
+        raise ValueError(f"Dimension mismatch: {a.shape[1]} vs {b.shape[1]}")
+
+    if metric == "cosine":
+        b = b / _safe_norms(b)[:, None]
+    elif metric == "l2":
+        b_sq = np.einsum("ij,ij->i", b, b)
+    if metric in ("l1", "hamming"):
+        per_row = len(b) * b.shape[1] * b.itemsize
+    else:
+        per_row = len(b) * b.itemsize
+    rows = max(1, int(max_block_bytes // max(per_row, 1)))
+
+    for start in range(0, len(a), rows):
+        block = a[start:start + rows]
+        if metric == "cosine":
+            yield start, (block / _safe_norms(block)[:, None]) @ b.T
+        elif metric == "inner_product":
+            yield start, block @ b.T
+        elif metric == "l2":
+            squared = np.einsum("ij,ij->i", block, block)[:, None] + b_sq[None, :] - 2 * (block @ b.T)
+            yield start, np.sqrt(np.maximum(squared, 0))  # rounding can make near-zero values negative
+        else:
+            yield start, _broadcast_reduce(block, b, reduce, max_block_bytes)
+
+
+def pairwise(a, b, metric="cosine", max_block_bytes=DEFAULT_BLOCK_BYTES, packed=False):
+    """N x M matrix of the metric between every row of a and every row of b"""
+    blocks = list(iter_pairwise_blocks(a, b, metric, max_block_bytes, packed))
+    return np.vstack([block for _, block in blocks])
+
+
+def one_to_many(query, vectors, metric="cosine", max_block_bytes=DEFAULT_BLOCK_BYTES, packed=False):
+    """Metric between one query vector and each row of `vectors`"""
+    return pairwise(query, vectors, metric, max_block_bytes, packed)[0]
+
+
+def distance(a, b, metric="cosine", packed=False):
+    """Metric between two single vectors, as a Python float"""
+    return float(pairwise(a, b, metric, packed=packed)[0, 0])
+
+
+def top_k(queries, vectors, k=10, metric="cosine", max_block_bytes=DEFAULT_BLOCK_BYTES, packed=False):
+    """Best k rows of `vectors` for each query (most similar first). Returns (ids, scores);
+    k <= 0 gives empty (queries x 0) arrays."""
+    k = max(0, min(k, len(vectors)))
+    sign = -1 if metric in SIMILARITY_METRICS else 1
+    ids, scores = [], []
+    for _, block in iter_pairwise_blocks(queries, vectors, metric, max_block_bytes, packed):
+        if k == 0:
+            top = np.empty((len(block), 0), dtype=np.intp)
+        else:
+            keyed = sign * block
+            top = np.argpartition(keyed, k - 1, axis=1)[:, :k]
+            order = np.argsort(np.take_along_axis(keyed, top, axis=1), axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+        ids.append(top)
+        scores.append(np.take_along_axis(block, top, axis=1))
+    return np.vstack(ids), np.vstack(scores)
+
+
+def python_loop_pairwise(a, b, metric="cosine"):
+    """Reference implementation with per-element Python loops, as the metric pages used to compute it"""
+    a, b = np.asarray(a).tolist(), np.asarray(b).tolist()
+    out = []
+    for x in a:
+        row = []
+        for y in b:
+            if metric == "cosine":
+                dot = sum(p * q for p, q in zip(x, y))
+                norm_x = math.sqrt(sum(p * p for p in x))
+                norm_y = math.sqrt(sum(q * q for q in y))
+                row.append(dot / (norm_x * norm_y) if norm_x != 0 and norm_y != 0 else 0)
+            elif metric == "l2":
+                row.append(math.sqrt(sum((p - q) ** 2 for p, q in zip(x, y))))
+            elif metric == "inner_product":
+                row.append(sum(p * q for p, q in zip(x, y)))
+            elif metric == "l1":
+                row.append(sum(abs(p - q) for p, q in zip(x, y)))
+            elif metric == "hamming":
+                row.append(sum((p > 0) != (q > 0) for p, q in zip(x, y)))
+            else:
+                raise ValueError(f"Unknown metric {metric!r}; expected one of {METRICS}")
+        out.append(row)
+    return np.array(out, dtype=np.float64)
+
+
+def _best_time(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_kernels(n_queries=8, n_vectors=2000, dim=128, metrics=None, repeats=3, seed=0):
+    """Time the vectorized kernels against the Python loops on the same N x M problem.
+
+    Hamming runs on the sign bits of the same vectors. Returns one row per metric with both
+    timings, the speedup and the largest absolute difference between the two results.
+    """
+    rng = np.random.default_rng(seed)
+    queries = rng.standard_normal((n_queries, dim)).astype(np.float32)
+    vectors = rng.standard_normal((n_vectors, dim)).astype(np.float32)
+    rows = []
+    for metric in metrics or METRICS:
+        start = time.perf_counter()
+        expected = python_loop_pairwise(queries, vectors, metric)
+        loop_s = time.perf_counter() - start
+        result = pairwise(queries, vectors, metric)
+        vectorized_s = _best_time(lambda: pairwise(queries, vectors, metric), repeats)
+        rows.append({
+            "metric": METRIC_LABELS[metric],
+            "pairs": n_queries * n_vectors,
+            "loop_ms": loop_s * 1000,
+            "vectorized_ms": vectorized_s * 1000,
+            "speedup": loop_s / vectorized_s if vectorized_s else float("inf"),
+            "max_abs_diff": float(np.max(np.abs(result - expected))),
+        })
+    return rows
@@ -0,0 +1,170 @@
+import contextlib
+import os
+import threading
+import time
+
+import numpy as np
+
+from embedding_runner import HashingBackend, OnnxBackend, SentenceTransformerBackend, sample_texts
+
+# Small retrieval set: each query lists the ids of the documents that answer it. Several queries
+# are paraphrases with little word overlap, which separates semantic models from lexical ones.
+SAMPLE_DOCUMENTS = [
+    "Reset your password from the login page by clicking Forgot Password and following the emailed link.",
+    "Orders ship within two business days and tracking numbers are emailed once the parcel leaves the warehouse.",
+    "Items can be returned within 30 days for a full refund if they are unused and in original packaging.",
+    "Vector databases store embeddings and answer nearest neighbor queries with approximate indexes like HNSW.",
+    "Cosine similarity compares the angle between two vectors and ignores their length.",
+    "Product quantization compresses vectors into short codes so billions of them fit in memory.",
+    "Our premium plan includes priority support, single sign-on and a 99.9 percent uptime guarantee.",
+    "Running shoes with extra cushioning reduce impact on knees during long-distance training.",
+    "The waterproof hiking jacket has sealed seams, a packable hood and breathable fabric.",
+    "Recommendation systems suggest items by comparing user preference vectors with item vectors.",
+    "Sharding splits an index across machines and replication copies each shard for availability.",
+    "Two-factor authentication adds a one-time code from your phone to every sign-in.",
+    "Gift cards never expire and can be combined with other payment methods at checkout.",
+    "Stainless steel water bottles keep drinks cold for 24 hours and hot for 12 hours.",
+    "Latency percentiles such as p95 and p99 describe the slowest requests users experience.",
+    "Image embeddings from CLIP place pictures and their captions close together in the same space.",
+]
+
+SAMPLE_QUERIES = [
+    {"query": "how do I reset my password", "relevant": [0]},
+    {"query": "I can't remember my login credentials", "relevant": [0]},
+    {"query": "when will my order arrive", "relevant": [1]},
+    {"query": "how long does delivery take", "relevant": [1]},
+    {"query": "can I send back something I bought", "relevant": [2]},
+    {"query": "refund policy", "relevant": [2]},
+    {"query": "what is a vector database", "relevant": [3]},
+    {"query": "approximate nearest neighbor index", "relevant": [3]},
+    {"query": "angle between vectors similarity", "relevant": [4]},
+    {"query": "compress embeddings to save memory", "relevant": [5]},
+    {"query": "enterprise plan features and SLA", "relevant": [6]},
+    {"query": "cushioned shoes for marathon training", "relevant": [7]},
+    {"query": "rain coat for hiking", "relevant": [8]},
+    {"query": "suggest products a user might like", "relevant": [9]},
+    {"query": "split index across multiple servers", "relevant": [10]},
+    {"query": "extra security code when signing in", "relevant": [11]},
+    {"query": "do gift cards expire", "relevant": [12]},
+    {"query": "insulated bottle keeps coffee hot", "relevant": [13]},
+    {"query": "tail latency of slow requests", "relevant": [14]},
+    {"query": "search photos with text descriptions", "relevant": [15]},
+]
+
+BATCH_SIZES = [1, 4, 16, 64, 256]
+
+# Local models tried when sentence-transformers is installed (skipped if they cannot be loaded)
+SENTENCE_TRANSFORMER_MODELS = [
+    "sentence-transformers/all-MiniLM-L6-v2",
+    "sentence-transformers/all-mpnet-base-v2",
+]
+
+
+def available_backends(hashing_dims=(384, 768, 1536), onnx_dir=None):
+    """Load every locally available backend. Returns (backends, skipped) where skipped maps a
+    backend label to the reason it could not be loaded."""
+    backends, skipped = [], {}
+    for dim in hashing_dims:
+        backends.append(HashingBackend(dim))
+    for model_name in SENTENCE_TRANSFORMER_MODELS:
+        try:
+            backends.append(SentenceTransformerBackend(model_name))
+        except Exception as exc:
+            skipped[model_name] = f"{type(exc).__name__}: {exc}"
+    onnx_dir = onnx_dir or os.environ.get("EMBEDDING_ONNX_DIR")
+    if onnx_dir:
+        try:
+            backends.append(OnnxBackend(onnx_dir))
+        except Exception as exc:
+            skipped[f"onnx:{onnx_dir}"] = f"{type(exc).__name__}: {exc}"
+    return backends, skipped
+
+
+def backend_label(backend):
+    return f"{backend.name} ({backend.dim}D)"
+
+
+def model_bytes(backend):
+    """Resident size of the model weights (0 for stateless backends)"""
+    model = getattr(backend, "model", None)
+    if model is not None and hasattr(model, "parameters"):
+        return sum(p.numel() * p.element_size() for p in model.parameters())
+    model_path = getattr(backend, "model_path", None)
+    return os.path.getsize(model_path) if model_path else 0
+
+
+# torch.set_num_threads is process-wide; serialize measurements so overlapping benchmarks do not
+# restore each other's setting
+_THREAD_LOCK = threading.Lock()
+
+
+@contextlib.contextmanager
+def _single_thread():
+    """Limit torch to one intra-op thread while a measurement runs so throughput is per CPU core"""
+    try:
+        import torch
+    except ImportError:
+        yield
+        return
+    with _THREAD_LOCK:
+        threads = torch.get_num_threads()
+        torch.set_num_threads(1)
+        try:
+            yield
+        finally:
+            torch.set_num_threads(threads)
+
+
+def measure_throughput(backend, texts, batch_sizes=BATCH_SIZES, min_texts=64):
+    """Texts/second on one core for each batch size (at least `min_texts` texts per measurement)"""
+    rows = []
+    backend.encode(texts[:2])  # warm-up: lazy initialization, caches
+    for batch_size in batch_sizes:
+        n = max(min_texts, batch_size)
+        subset = (texts * (n // len(texts) + 1))[:n]
+        with _single_thread():
+            start = time.perf_counter()
+            for i in range(0, n, batch_size):
+                backend.encode(subset[i:i + batch_size])
+            elapsed = time.perf_counter() - start
+        rows.append({"batch_size": batch_size, "texts_per_s": n / elapsed,
+                     "ms_per_batch": elapsed * 1000 / -(-n // batch_size)})
+    return rows
+
+
+def retrieval_quality(backend, documents=None, queries=None, k=3):
+    documents = documents or SAMPLE_DOCUMENTS
+    queries = queries or SAMPLE_QUERIES
+    doc_vectors = backend.encode(documents)
+    query_vectors = backend.encode([q["query"] for q in queries])
+    scores = query_vectors @ doc_vectors.T
+    recalls, reciprocal_ranks = [], []
+    for row, query in zip(scores, queries):
+        ranking = np.argsort(-row)
+        relevant = set(query["relevant"])
+        recalls.append(len(relevant & set(ranking[:k].tolist())) / len(relevant))
+        first = next(rank for rank, doc in enumerate(ranking, 1) if doc in relevant)
+        reciprocal_ranks.append(1.0 / first)
+    return {f"recall@{k}": float(np.mean(recalls)), "mrr": float(np.mean(reciprocal_ranks))}
+
+
+def run_benchmark(backends, n_texts=256, batch_sizes=BATCH_SIZES, k=3, seed=0):
+    """Benchmark each backend; returns (summary rows, throughput rows by batch size)"""
+    texts = sample_texts(n_texts, seed=seed)
+    summary, throughput = [], []
+    for backend in backends:
+        label = backend_label(backend)
+        rates = measure_throughput(backend, texts, batch_sizes)
+        throughput.extend(dict(row, backend=label) for row in rates)
+        best = max(rates, key=lambda row: row["texts_per_s"])
+        summary.append({
+            "backend": label,
+            "dim": backend.dim,
+            "bytes_per_vector": backend.dim * 4,
+            "index_gb_per_1m": backend.dim * 4 * 1e6 / 1024 ** 3,
+            "model_mb": model_bytes(backend) / 1024 ** 2,
+            "texts_per_s_per_core": best["texts_per_s"],
+            "best_batch_size": best["batch_size"],
+            **retrieval_quality(backend, k=k),
+        })
+    return summary, throughput
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from dimensionality_reduction import StreamingReducer, iter_chunks
+from distance_kernels import top_k
+
+PROJECTION_METHODS = {
+    "pca": "PCA (linear, transforms every vector exactly)",
+    "tsne": "t-SNE on a sample + k-NN placement of the rest",
+    "umap": "UMAP on a sample + UMAP transform (needs umap-learn)",
+}
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "embedding_projections")
+
+
+def stratified_sample(labels, sample_size, seed=0):
+    """Sorted row indices where each label keeps its share of the collection (at least one row per label).
+    Without labels the sample is uniform."""
+    rng = np.random.default_rng(seed)
+    n = len(labels)
+    if sample_size >= n:
+        return np.arange(n)
+    labels = np.asarray(labels)
+    order = np.argsort(labels, kind="stable")
+    values, starts, counts = np.unique(labels[order], return_index=True, return_counts=True)
+    quotas = np.maximum(1, np.round(counts * sample_size / n).astype(int))
+    rows = [rng.choice(order[start:start + count], min(quota, count), replace=False)
+            for start, count, quota in zip(starts, counts, quotas)]
+    return np.sort(np.concatenate(rows))
+
+
+def place_out_of_sample(vectors, sample_vectors, sample_coords, k=10, chunk_size=50000):
+    """2D position of each vector as the similarity-weighted mean of its k nearest sampled neighbours,
+    for projections (like t-SNE) that cannot transform new points"""
+    coords = np.empty((len(vectors), 2), dtype=np.float32)
+    for start, chunk in iter_chunks(vectors, chunk_size):
+        ids, scores = top_k(chunk, sample_vectors, k, "cosine")
+        weights = np.maximum(scores, 0) + 1e-6
+        coords[start:start + len(chunk)] = ((weights[..., None] * sample_coords[ids]).sum(axis=1)
+                                            / weights.sum(axis=1, keepdims=True))
+    return coords
+
+
+def _cache_key(vectors, labels, method, sample_size, seed):
+    digest = hashlib.blake2b(digest_size=16)
+    stride = max(len(vectors) // 1000, 1)
+    digest.update(json.dumps([method, sample_size, seed, list(vectors.shape)]).encode("utf-8"))
+    digest.update(np.ascontiguousarray(vectors[::stride]).tobytes())
+    if labels is not None:
+        digest.update(np.ascontiguousarray(labels[::stride]).tobytes())
+    return digest.hexdigest()
+
+
+def project_to_2d(vectors, labels=None, method="pca", sample_size=5000, seed=0, cache_dir=DEFAULT_CACHE_DIR,
+                  chunk_size=50000):
+    """Project a (possibly very large) collection to 2D for plotting.
+
+    The projection is fitted on a stratified sample only and the full collection is mapped chunk by
+    chunk. Results are cached on disk keyed by the method, parameters and a fingerprint of the data,
+    so reruns load the coordinates instead of refitting. Returns (coords, info).
+    """
+    if method not in PROJECTION_METHODS:
+        raise ValueError(f"Unknown method {method!r}; expected one of {list(PROJECTION_METHODS)}")
+    key = _cache_key(vectors, labels, method, sample_size, seed)
+    if cache_dir:
+        coords_path = os.path.join(cache_dir, f"{key}.npy")
+        info_path = os.path.join(cache_dir, f"{key}.json")
+        if os.path.exists(coords_path) and os.path.exists(info_path):
+            with open(info_path, "r", encoding="utf-8") as f:
+                info = json.load(f)
+            return np.load(coords_path), dict(info, cached=True)
+
+    rows = stratified_sample(labels if labels is not None else np.zeros(len(vectors), dtype=int),
+                             sample_size, seed)
+    sample = np.asarray(vectors[rows], dtype=np.float32)
+    start = time.perf_counter()
+    if method == "pca":
+        reducer = StreamingReducer("pca", 2, normalize=False, seed=seed).fit(sample, len(sample))
+        fitted = time.perf_counter()
+        coords = reducer.transform(vectors, chunk_size)
+    elif method == "tsne":
+        from sklearn.manifold import TSNE
+
+        sample_coords = TSNE(2, init="pca", perplexity=min(30, len(sample) - 1),
+                             random_state=seed).fit_transform(sample).astype(np.float32)
+        fitted = time.perf_counter()
+        coords = place_out_of_sample(vectors, sample, sample_coords, chunk_size=chunk_size)
+        coords[rows] = sample_coords
+    else:
+        import umap
+
+        model = umap.UMAP(n_components=2, random_state=seed).fit(sample)
+        fitted = time.perf_counter()
+        coords = np.empty((len(vectors), 2), dtype=np.float32)
+        for chunk_start, chunk in iter_chunks(vectors, chunk_size):
+            coords[chunk_start:chunk_start + len(chunk)] = model.transform(chunk)
+    info = {
+        "method": method,
+        "vectors": len(vectors),
+        "sample_size": len(rows),
+        "fit_s": fitted - start,
+        "transform_s": time.perf_counter() - fitted,
+    }
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.save(coords_path, coords)
+        with open(info_path, "w", encoding="utf-8") as f:
+            json.dump(info, f)
+    return coords, dict(info, cached=False)
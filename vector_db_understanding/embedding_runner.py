@@ -0,0 +1,245 @@
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+_BASIC_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+_SAMPLE_WORDS = """
+vector database embedding search query index similarity cosine distance neighbor cluster model
+semantic document product user recommendation image text audio retrieval ranking score latency
+memory compression quantization graph partition shard replica cache batch token sentence meaning
+customer order price review category brand color size shipping return policy account password
+""".split()
+
+
+def basic_tokenize(text):
+    """BERT-style basic tokenization: lowercase, split on whitespace and punctuation"""
+    return _BASIC_TOKEN_RE.findall(text.lower())
+
+
+class HashingBackend:
+    """Deterministic offline fallback: signed hashing of unigrams and bigrams into `dim` buckets.
+
+    Needs no model download, so tests and demos run anywhere; similar wording gives similar vectors,
+    but there is no semantic understanding of synonyms.
+    """
+
+    name = "hashing (offline fallback)"
+    max_tokens = 512
+
+    def __init__(self, dim=768):
+        self.dim = dim
+
+    def tokenize(self, text):
+        return ["[CLS]"] + basic_tokenize(text)[:self.max_tokens - 2] + ["[SEP]"]
+
+    def encode(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = basic_tokenize(text)
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class SentenceTransformerBackend:
+    """CPU sentence-transformers model (optional dependency)"""
+
+    def __init__(self, model_name="sentence-transformers/all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = model_name
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.max_tokens = self.model.max_seq_length
+
+    def tokenize(self, text):
+        return self.model.tokenizer.tokenize(text)[:self.max_tokens - 2]
+
+    def encode(self, texts):
+        return self.model.encode(list(texts), batch_size=len(texts), normalize_embeddings=True,
+                                 convert_to_numpy=True).astype(np.float32)
+
+
+class OnnxBackend:
+    """Transformer encoder exported to ONNX, run with onnxruntime (optional dependencies).
+
+    `model_dir` must contain model.onnx and a Hugging Face tokenizer.json; token embeddings are
+    mean-pooled over the attention mask and L2-normalized.
+    """
+
+    def __init__(self, model_dir, max_tokens=256):
+        import os
+
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.model_path = os.path.join(model_dir, "model.onnx")
+        self.session = onnxruntime.InferenceSession(self.model_path, providers=["CPUExecutionProvider"])
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_tokens)
+        self.tokenizer.enable_padding()
+        self.name = f"onnx:{os.path.basename(os.path.normpath(model_dir))}"
+        self.max_tokens = max_tokens
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self.dim = self.session.get_outputs()[0].shape[-1]
+
+    def tokenize(self, text):
+        return self.tokenizer.encode(text).tokens
+
+    def encode(self, texts):
+        encodings = self.tokenizer.encode_batch(list(texts))
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self._input_names})[0]
+        mask = feeds["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return (pooled / np.linalg.norm(pooled, axis=1, keepdims=True)).astype(np.float32)
+
+
+def load_backend(preferred="auto", model_name="sentence-transformers/all-MiniLM-L6-v2", onnx_dir=None, dim=768):
+    """Best available local backend: ONNX model dir > sentence-transformers > hashing fallback.
+
+    Returns (backend, note) where note explains any fallback (missing package, model not downloadable).
+    """
+    errors = []
+    if preferred in ("auto", "onnx") and onnx_dir:
+        try:
+            return OnnxBackend(onnx_dir), None
+        except Exception as exc:
+            errors.append(f"ONNX: {exc}")
+    if preferred in ("auto", "sentence-transformers"):
+        try:
+            return SentenceTransformerBackend(model_name), None
+        except Exception as exc:
+            errors.append(f"sentence-transformers: {type(exc).__name__}: {exc}")
+    return HashingBackend(dim), "; ".join(errors) or None
+
+
+class EmbeddingRunner:
+    """Runs a backend over many texts with length-bucketed dynamic batching.
+
+    Texts are sorted by token length and packed into batches whose padded size
+    (batch size x longest sequence) stays under `max_batch_tokens`, so short texts are not padded to
+    the length of long ones and batch size adapts to length. Results come back in input order.
+
+    A runner is typically shared across sessions, so per-call settings (`max_batch_tokens`) are
+    arguments and per-call stats are returned rather than stored on the runner.
+    """
+
+    def __init__(self, backend, max_batch_tokens=8192, max_batch_size=64):
+        self.backend = backend
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+
+    @property
+    def dim(self):
+        return self.backend.dim
+
+    def plan_batches(self, lengths, bucket=True, max_batch_tokens=None):
+        max_batch_tokens = max_batch_tokens or self.max_batch_tokens
+        order = np.argsort(lengths, kind="stable") if bucket else np.arange(len(lengths))
+        batches, current, longest = [], [], 0
+        for i in order:
+            longest_with = max(longest, lengths[i])
+            if current and (len(current) == self.max_batch_size or
+                            (bucket and longest_with * (len(current) + 1) > max_batch_tokens)):
+                batches.append(current)
+                current, longest_with = [], lengths[i]
+            current.append(int(i))
+            longest = longest_with
+        if current:
+            batches.append(current)
+        return batches
+
+    def embed(self, texts, bucket=True, max_batch_tokens=None, return_stats=False):
+        """Embeddings in input order; with `return_stats` returns (vectors, stats)"""
+        texts = list(texts)
+        start = time.perf_counter()
+        lengths = np.array([len(self.backend.tokenize(text)) for text in texts])
+        tokenized = time.perf_counter()
+        vectors = np.empty((len(texts), self.backend.dim), dtype=np.float32)
+        batch_ms, padded = [], 0
+        for batch in self.plan_batches(lengths, bucket, max_batch_tokens):
+            batch_start = time.perf_counter()
+            vectors[batch] = self.backend.encode([texts[i] for i in batch])
+            batch_ms.append((time.perf_counter() - batch_start) * 1000)
+            padded += len(batch) * int(lengths[batch].max())
+        elapsed = time.perf_counter() - start
+        tokens = int(lengths.sum())
+        stats = {
+            "texts": len(texts),
+            "tokens": tokens,
+            "padded_tokens": padded,
+            "padding_efficiency": tokens / padded if padded else 1.0,
+            "batches": len(batch_ms),
+            "tokenize_ms": (tokenized - start) * 1000,
+            "latency_ms": elapsed * 1000,
+            "tokens_per_s": tokens / elapsed if elapsed else 0.0,
+            "p50_batch_ms": float(np.percentile(batch_ms, 50)) if batch_ms else 0.0,
+            "p95_batch_ms": float(np.percentile(batch_ms, 95)) if batch_ms else 0.0,
+        }
+        return (vectors, stats) if return_stats else vectors
+
+    def embed_one(self, text, return_stats=False):
+        vectors, stats = self.embed([text], return_stats=True)
+        return (vectors[0], stats) if return_stats else vectors[0]
+
+
+class QueryEmbeddingCache:
+    """LRU cache of query embeddings in front of an EmbeddingRunner.
+
+    Interactive search re-embeds the same queries constantly (reruns, pagination, repeated popular
+    queries); a hit skips tokenization and the model entirely. Keys are the query with whitespace
+    collapsed. The cache is shared across sessions, so `embed` returns each lookup's stats (hit or miss,
+    time) instead of storing them on the cache.
+    """
+
+    def __init__(self, runner, maxsize=1024):
+        self.runner = runner
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def embed(self, query):
+        """Returns (vector, stats) with stats {"cache_hit": bool, "embed_ms": float}"""
+        start = time.perf_counter()
+        key = " ".join(query.split())
+        with self._lock:
+            vector = self._entries.get(key)
+            hit = vector is not None
+            if hit:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if not hit:
+            vector = self.runner.embed_one(key)
+            vector.setflags(write=False)  # shared between callers
+            with self._lock:
+                self._entries[key] = vector
+                self._entries.move_to_end(key)
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                self.misses += 1
+        return vector, {"cache_hit": hit, "embed_ms": (time.perf_counter() - start) * 1000}
+
+
+def sample_texts(n=500, seed=0):
+    """Texts with a long-tailed length distribution, like real chunks and queries mixed together"""
+    rng = np.random.default_rng(seed)
+    lengths = np.clip(rng.lognormal(mean=2.8, sigma=0.9, size=n).astype(int), 2, 400)
+    return [" ".join(rng.choice(_SAMPLE_WORDS, length)) for length in lengths]
@@ -0,0 +1,146 @@
+import time
+
+import numpy as np
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def _top(scores, k):
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class MatryoshkaIndex:
+    """Cosine search over full vectors with progressive refinement on truncated prefixes.
+
+    Besides the full unit vectors, the first `levels[i]` dimensions of every vector are kept
+    re-normalized in their own contiguous array. A query scans the smallest prefix array for
+    `candidates[0]` survivors, rescores them on the next prefix down to `candidates[1]`, and so on, and
+    finally ranks the last survivors on the full vectors. Only the first pass touches every row, so it
+    reads levels[0] / dim of the memory an exact scan does. Truncation is only meaningful for models
+    trained so that leading dimensions carry the most information (Matryoshka representation learning).
+
+    The index is read-only after construction, so it can be shared across sessions; `search` returns
+    per-query stats instead of storing them.
+    """
+
+    def __init__(self, vectors, levels=(128, 512)):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.dim = vectors.shape[1]
+        self.levels = [level for level in levels if level < self.dim]
+        if self.levels != sorted(self.levels):
+            raise ValueError(f"Levels must increase, got {levels}")
+        self.vectors = np.ascontiguousarray(_normalize(vectors))
+        self.prefixes = [np.ascontiguousarray(_normalize(self.vectors[:, :level])) for level in self.levels]
+
+    def memory_bytes(self):
+        return self.vectors.nbytes + sum(prefix.nbytes for prefix in self.prefixes)
+
+    def search_exact(self, query, k=10):
+        query = _normalize(np.asarray(query, dtype=np.float32)[None, :])[0]
+        scores = self.vectors @ query
+        top = _top(scores, k)
+        return top, scores[top]
+
+    def search_prefix(self, query, k=10, level=0):
+        """Rank on one truncated prefix only, without rescoring"""
+        prefix = self.prefixes[level]
+        query = _normalize(np.asarray(query, dtype=np.float32)[None, :prefix.shape[1]])[0]
+        scores = prefix @ query
+        top = _top(scores, k)
+        return top, scores[top]
+
+    def search(self, query, k=10, candidates=(400, 100), return_stats=False):
+        """Progressive search: prefix scan, rescoring at each larger prefix, final ranking at full dim.
+
+        `candidates[i]` is how many rows survive level i; missing entries default to a quarter of the previous stage.
+        With `return_stats` also returns a dict of per-stage latency, survivor counts and surviving ids.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        survivors = list(candidates)[:len(self.levels)]
+        while len(survivors) < len(self.levels):
+            survivors.append(max(k, (survivors[-1] if survivors else k * 10) // 4))
+        stage_ms = []
+        start = time.perf_counter()
+        rows = None
+        stage_ids = []
+        for prefix, keep in zip(self.prefixes, survivors):
+            q = _normalize(query[None, :prefix.shape[1]])[0]
+            scores = prefix @ q if rows is None else prefix[rows] @ q
+            top = _top(scores, max(keep, k))
+            rows = top if rows is None else rows[top]
+            stage_ids.append(rows)
+            now = time.perf_counter()
+            stage_ms.append((now - start) * 1000)
+            start = now
+        q = _normalize(query[None, :])[0]
+        scores = self.vectors[rows] @ q if rows is not None else self.vectors @ q
+        top = _top(scores, k)
+        stage_ms.append((time.perf_counter() - start) * 1000)
+        ids = rows[top] if rows is not None else top
+        if return_stats:
+            return ids, scores[top], {"stage_ms": stage_ms, "survivors": survivors, "stage_ids": stage_ids}
+        return ids, scores[top]
+
+
+def _recall(found, exact):
+    return len(set(found.tolist()) & set(exact.tolist())) / len(exact)
+
+
+def benchmark_matryoshka(vectors, queries, k=10, levels=(128, 512), candidates=(400, 100), repeats=3):
+    """Latency per query and recall@k against the exact full-dimension scan for: the exact scan, each
+    prefix alone and the progressive search. Timings are the best of `repeats` passes over the queries.
+
+    Returns (rows, stages); stages break the progressive search down per level with the share of the
+    exact top-k still among the survivors after that level.
+    """
+    index = MatryoshkaIndex(vectors, levels)
+    exact = [index.search_exact(query, k)[0] for query in queries]
+
+    def measure(label, dims_scanned, search):
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            results = [search(query) for query in queries]
+            best = min(best, time.perf_counter() - start)
+        return {
+            "mode": label,
+            "first_pass_dims": dims_scanned,
+            "ms_per_query": best * 1000 / len(queries),
+            f"recall@{k}": float(np.mean([_recall(ids, truth) for (ids, _), truth in zip(results, exact)])),
+            "first_pass_mb": len(index.vectors) * dims_scanned * 4 / 2 ** 20,
+        }
+
+    rows = [measure(f"Exact scan ({index.dim}D)", index.dim, lambda q: index.search_exact(q, k))]
+    for level, prefix in enumerate(index.prefixes):
+        rows.append(measure(f"Prefix only ({prefix.shape[1]}D)", prefix.shape[1],
+                            lambda q, level=level: index.search_prefix(q, k, level)))
+    path = " → ".join(f"{p.shape[1]}D" for p in index.prefixes) + f" → {index.dim}D"
+    rows.append(measure(f"Progressive ({path})", index.levels[0] if index.levels else index.dim,
+                        lambda q: index.search(q, k, candidates)))
+    exact_ms = rows[0]["ms_per_query"]
+    for row in rows:
+        row["speedup"] = exact_ms / row["ms_per_query"] if row["ms_per_query"] else float("inf")
+
+    stage_ms, stage_recall = [], []
+    for query, truth in zip(queries, exact):
+        ids, _, stats = index.search(query, k, candidates, return_stats=True)
+        stage_ms.append(stats["stage_ms"])
+        stage_recall.append([_recall(survivors, truth) for survivors in stats["stage_ids"]] + [_recall(ids, truth)])
+    stages = []
+    dims = [prefix.shape[1] for prefix in index.prefixes] + [index.dim]
+    kept = stats["survivors"] + [k]
+    for i, (dim, keep) in enumerate(zip(dims, kept)):
+        stages.append({
+            "stage": i + 1,
+            "dims": dim,
+            "rows_scored": len(index.vectors) if i == 0 else kept[i - 1],
+            "survivors": keep,
+            "ms_per_query": float(np.mean([ms[i] for ms in stage_ms])),
+            f"recall@{k}_of_survivors": float(np.mean([recall[i] for recall in stage_recall])),
+        })
+    return rows, stages
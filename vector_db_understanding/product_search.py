@@ -0,0 +1,191 @@
+import time
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+from dimensionality_reduction import synthetic_embeddings
+from distance_kernels import top_k
+
+CATEGORIES = ["Electronics", "Fashion", "Home", "Sports", "Beauty", "Toys", "Books", "Grocery"]
+
+# Linear ranking model over the stage-two features
+RANKING_WEIGHTS = {"similarity": 1.0, "category_match": 0.15, "popularity": 0.05, "price_fit": 0.1}
+
+
+def _top(scores, k):
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def synthetic_catalog(n_products=200000, dim=64, n_categories=len(CATEGORIES), seed=0):
+    """Product tower outputs plus the business features the ranker uses: a category per product,
+    log-normal prices around a per-category level and long-tailed popularity"""
+    rng = np.random.default_rng(seed)
+    vectors, categories = synthetic_embeddings(n_products, dim, n_clusters=n_categories, seed=seed,
+                                               return_labels=True)
+    price_levels = np.exp(rng.uniform(np.log(10), np.log(1000), n_categories))
+    prices = (price_levels[categories] * rng.lognormal(0.0, 0.6, n_products)).astype(np.float32)
+    popularity = (1.0 / np.arange(1, n_products + 1) ** 0.9).astype(np.float32)
+    rng.shuffle(popularity)
+    return {"vectors": vectors, "categories": categories, "prices": prices, "popularity": popularity}
+
+
+class IVFIndex:
+    """Inverted-file ANN index: k-means centroids fitted on a sample partition the vectors into lists,
+    stored contiguously list by list. A query scores the centroids, scans only the `n_probe` closest
+    lists and returns the best `n_candidates` rows by inner product (cosine for unit vectors).
+
+    The index is read-only after construction, so it can be shared across sessions; `search` returns
+    per-query stats instead of storing them."""
+
+    def __init__(self, vectors, n_lists=None, sample_size=50000, seed=0):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.n_lists = n_lists or max(1, int(np.sqrt(len(vectors))))
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(len(vectors), min(sample_size, len(vectors)), replace=False)]
+        start = time.perf_counter()
+        kmeans = MiniBatchKMeans(self.n_lists, batch_size=4096, n_init=1, random_state=seed).fit(sample)
+        self.centroids = kmeans.cluster_centers_.astype(np.float32)
+        assignments, _ = top_k(vectors, self.centroids, 1, "inner_product")
+        assignments = assignments[:, 0]
+        order = np.argsort(assignments, kind="stable")
+        self.ids = order
+        self.vectors = np.ascontiguousarray(vectors[order])
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=self.n_lists))])
+        self.build_seconds = time.perf_counter() - start
+
+    def memory_bytes(self):
+        return self.vectors.nbytes + self.centroids.nbytes + self.ids.nbytes + self.offsets.nbytes
+
+    def search(self, query, n_candidates=1000, n_probe=16, return_stats=False):
+        start = time.perf_counter()
+        query = np.asarray(query, dtype=np.float32)
+        lists = _top(self.centroids @ query, n_probe)
+        probed = time.perf_counter()
+        # lists are contiguous, so each one is scored straight from a slice without gathering rows
+        rows = np.concatenate([np.arange(self.offsets[i], self.offsets[i + 1]) for i in lists])
+        scores = np.concatenate([self.vectors[self.offsets[i]:self.offsets[i + 1]] @ query for i in lists])
+        top = _top(scores, n_candidates)
+        stats = {
+            "probe_ms": (probed - start) * 1000,
+            "scan_ms": (time.perf_counter() - probed) * 1000,
+            "rows_scanned": len(rows),
+        }
+        if return_stats:
+            return self.ids[rows[top]], scores[top], stats
+        return self.ids[rows[top]], scores[top]
+
+
+def ranking_features(similarity, categories, prices, popularity, category=None, target_price=None):
+    """Feature matrix (candidates x len(RANKING_WEIGHTS)) in RANKING_WEIGHTS order"""
+    n = len(similarity)
+    category_match = (categories == category).astype(np.float32) if category is not None else np.zeros(n, np.float32)
+    # log popularity rescaled so the most popular product in the catalog is 1 and the long tail is near 0
+    log_popularity = np.log1p(popularity * 1e6) / np.log1p(1e6)
+    price_fit = (-np.abs(np.log(prices / target_price)) if target_price is not None
+                 else np.zeros(n, np.float32))
+    return np.column_stack([similarity, category_match, log_popularity, price_fit]).astype(np.float32)
+
+
+class ProductSearchPipeline:
+    """Two-stage catalog search: IVF candidate generation over the product embeddings, then a
+    vectorized linear ranker over similarity, category, popularity and price on the candidates only.
+
+    `search` can return per-stage latency alongside the results.
+    """
+
+    def __init__(self, catalog, n_lists=None, sample_size=50000, seed=0, weights=None):
+        self.catalog = catalog
+        self.index = IVFIndex(catalog["vectors"], n_lists, sample_size, seed)
+        self.weights = np.array([dict(RANKING_WEIGHTS, **(weights or {}))[name] for name in RANKING_WEIGHTS],
+                                dtype=np.float32)
+
+    def rank(self, ids, similarity, k=10, category=None, target_price=None, max_price=None):
+        """Stage two on any candidate set: filter, compute features, score with one GEMV, keep top k"""
+        prices = self.catalog["prices"][ids]
+        if max_price is not None:
+            keep = prices <= max_price
+            ids, similarity, prices = ids[keep], similarity[keep], prices[keep]
+        if len(ids) == 0:
+            return ids, np.empty(0, dtype=np.float32)
+        features = ranking_features(similarity, self.catalog["categories"][ids], prices,
+                                    self.catalog["popularity"][ids], category, target_price)
+        scores = features @ self.weights
+        top = _top(scores, k)
+        return ids[top], scores[top]
+
+    def search(self, query, k=10, n_candidates=1000, n_probe=16, category=None, target_price=None, max_price=None,
+               return_stats=False):
+        """Top k (ids, scores); with `return_stats` also a dict of per-stage latency"""
+        start = time.perf_counter()
+        candidates, similarity, index_stats = self.index.search(query, n_candidates, n_probe, return_stats=True)
+        generated = time.perf_counter()
+        ids, scores = self.rank(candidates, similarity, k, category, target_price, max_price)
+        if not return_stats:
+            return ids, scores
+        stats = dict(index_stats,
+                     candidate_ms=(generated - start) * 1000,
+                     ranking_ms=(time.perf_counter() - generated) * 1000,
+                     candidates=len(candidates))
+        return ids, scores, stats
+
+
+def sample_queries(catalog, n_queries=200, noise=0.3, seed=1):
+    """Query tower stand-ins: a perturbed product embedding with that product's category and price as
+    the query's intent. Returns a list of dicts with vector, category and target_price."""
+    rng = np.random.default_rng(seed)
+    anchors = rng.choice(len(catalog["vectors"]), n_queries, replace=False)
+    dim = catalog["vectors"].shape[1]
+    vectors = catalog["vectors"][anchors] + noise * rng.standard_normal((n_queries, dim)).astype(np.float32) / np.sqrt(dim)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [{"vector": vector, "category": int(catalog["categories"][a]), "target_price": float(catalog["prices"][a])}
+            for vector, a in zip(vectors, anchors)]
+
+
+def benchmark_pipeline(n_products=200000, dim=64, n_queries=200, k=10, n_candidates=1000, n_probe=16, seed=0):
+    """Per-stage latency of the two-stage pipeline against ranking the whole catalog (exact scan + the
+    same ranker over every product). Recall compares the final top-k of both."""
+    catalog = synthetic_catalog(n_products, dim, seed=seed)
+    pipeline = ProductSearchPipeline(catalog, seed=seed)
+    queries = sample_queries(catalog, n_queries, seed=seed + 1)
+    all_ids = np.arange(n_products)
+    stats, exact_ms, recalls, candidate_recalls = [], [], [], []
+    for query in queries:
+        context = {"category": query["category"], "target_price": query["target_price"]}
+        ids, _, query_stats = pipeline.search(query["vector"], k, n_candidates, n_probe, return_stats=True, **context)
+        stats.append(query_stats)
+
+        start = time.perf_counter()
+        exact_ids, _ = pipeline.rank(all_ids, catalog["vectors"] @ query["vector"], k, **context)
+        exact_ms.append((time.perf_counter() - start) * 1000)
+        recalls.append(len(set(ids.tolist()) & set(exact_ids.tolist())) / k)
+        candidates, _ = pipeline.index.search(query["vector"], n_candidates, n_probe)
+        candidate_recalls.append(len(set(candidates.tolist()) & set(exact_ids.tolist())) / k)
+
+    def percentiles(values):
+        return float(np.percentile(values, 50)), float(np.percentile(values, 95))
+
+    rows = []
+    for label, key in (("Centroid probe", "probe_ms"), ("List scan + top-N", "scan_ms"),
+                       ("Stage 1: candidate generation", "candidate_ms"), ("Stage 2: ranking", "ranking_ms")):
+        p50, p95 = percentiles([s[key] for s in stats])
+        rows.append({"stage": label, "p50_ms": p50, "p95_ms": p95})
+    total = [s["candidate_ms"] + s["ranking_ms"] for s in stats]
+    p50, p95 = percentiles(total)
+    rows.append({"stage": "Two-stage total", "p50_ms": p50, "p95_ms": p95})
+    p50, p95 = percentiles(exact_ms)
+    rows.append({"stage": "Rank entire catalog (baseline)", "p50_ms": p50, "p95_ms": p95})
+    info = {
+        "products": n_products,
+        "lists": pipeline.index.n_lists,
+        "n_probe": n_probe,
+        "rows_scanned": float(np.mean([s["rows_scanned"] for s in stats])),
+        "candidates": n_candidates,
+        "build_s": pipeline.index.build_seconds,
+        f"recall@{k}": float(np.mean(recalls)),
+        f"candidate_recall@{k}": float(np.mean(candidate_recalls)),
+        "index_mb": pipeline.index.memory_bytes() / 2 ** 20,
+        "index_mb_at_5m": pipeline.index.memory_bytes() / n_products * 5_000_000 / 2 ** 20,
+    }
+    return rows, info
@@ -3,7 +3,14 @@ import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import math
+
+from distance_kernels import one_to_many
+from vector_collection import VectorCollection
+
+@st.cache_resource(show_spinner=False)
+def get_movie_collection(movies):
+    """Movie vectors normalized once at insert time; reruns search the same collection"""
+    return VectorCollection.from_dict(movies)
 
 def show_knn_demo():
     st.markdown("""
@@ -39,14 +46,9 @@ def show_knn_demo():
         query_vector = movies[query_movie]
         similarities = []
         
-        for movie, vector in movies.items():
-            if movie != query_movie:
-                # Cosine similarity
-                dot_product = sum(a * b for a, b in zip(query_vector, vector))
-                norm_query = math.sqrt(sum(a * a for a in query_vector))
-                norm_movie = math.sqrt(sum(b * b for b in vector))
-                similarity = dot_product / (norm_query * norm_movie) if norm_query != 0 and norm_movie != 0 else 0
-                similarities.append((movie, similarity, vector))
+        catalog = get_movie_collection(movies)
+        for movie, similarity in catalog.search(query_vector, len(catalog), exclude=[query_movie]):
+            similarities.append((movie, similarity, movies[movie]))
         
         # Sort by similarity and get top K
         similarities.sort(key=lambda x: x[1], reverse=True)
@@ -164,12 +166,11 @@ def show_range_queries():
         query_vector = houses[query_house]
         results = []
         
-        for house, vector in houses.items():
-            if house != query_house:
-                # Euclidean distance
-                distance = math.sqrt(sum((a - b) ** 2 for a, b in zip(query_vector, vector)))
-                if distance <= threshold:
-                    results.append((house, distance, vector))
+        candidates = [house for house in houses if house != query_house]
+        distances = one_to_many(query_vector, [houses[house] for house in candidates], "l2")
+        for house, distance in zip(candidates, distances):
+            if distance <= threshold:
+                results.append((house, float(distance), houses[house]))
         
         # Sort by distance
         results.sort(key=lambda x: x[1])
@@ -4,9 +4,6 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import math
-from sklearn.decomposition import PCA
-from sklearn.manifold import TSNE
 import random
 
 # Import our custom modules
@@ -15,6 +12,9 @@ from app_modules import (
     show_query_types, show_performance_optimization,
     show_popular_technologies, show_real_world_examples
 )
+from distance_kernels import distance
+from dimensionality_reduction import REDUCTION_METHODS, recall_vs_dimension, synthetic_embeddings
+from embedding_explorer import PROJECTION_METHODS, project_to_2d, stratified_sample
 
 # Page configuration
 st.set_page_config(
@@ -255,6 +255,114 @@ def show_vector_fundamentals():
         savings = ((storage_32bit - storage_8bit) / storage_32bit) * 100
         st.success(f"💡 Quantization saves {savings:.1f}% storage!")
 
+    show_dimensionality_reduction()
+    show_embedding_explorer()
+
+def show_dimensionality_reduction():
+    st.markdown("### ✂️ Reducing Dimensions of Stored Vectors")
+    st.markdown("""
+    One answer to the curse of dimensionality is a reduction stage between the embedding model and the index:
+    fit a projection on a sample of the collection, then transform the stored vectors chunk by chunk
+    (the collection never has to be in memory at once). Memory and scan cost shrink in proportion to the
+    dimension; the price is recall. The experiment below uses embedding-like vectors (topic clusters,
+    decaying variance spectrum) and measures recall@10 of cosine search in the reduced space against exact
+    search in the original one.
+    """)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        original_dim = st.selectbox("Original dimensions:", [768, 1536], index=1, key="reduction_dim")
+    with col2:
+        n_vectors = st.select_slider("Stored vectors:", [2000, 5000, 10000, 20000], value=10000,
+                                     key="reduction_vectors")
+    with col3:
+        methods = st.multiselect("Methods:", list(REDUCTION_METHODS), default=["pca", "gaussian"],
+                                 format_func=REDUCTION_METHODS.get, key="reduction_methods")
+
+    if st.button("Run Reduction Benchmark"):
+        if not methods:
+            st.warning("Select at least one method.")
+        else:
+            with st.spinner("Fitting reducers and measuring recall..."):
+                vectors = synthetic_embeddings(n_vectors + 200, original_dim)
+                dims = [d for d in (32, 64, 128, 256, 512) if d < original_dim]
+                st.session_state["reduction_results"] = (
+                    original_dim, recall_vs_dimension(vectors[:n_vectors], vectors[n_vectors:], dims, methods))
+
+    if "reduction_results" in st.session_state:
+        original_dim, rows = st.session_state["reduction_results"]
+        df = pd.DataFrame(rows)
+        fig = px.line(df, x="dim", y="recall@10", color="method", markers=True, log_x=True,
+                      title=f"Recall@10 vs Reduced Dimension (from {original_dim}D)")
+        fig.update_layout(xaxis_title="Reduced dimensions", yaxis_range=[0, 1.05])
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(df.style.format({"recall@10": "{:.3f}", "recall_loss": "{:.1%}", "memory_ratio": "{:.0f}x",
+                                      "fit_s": "{:.2f}", "transform_ms_per_1k": "{:.1f}"}),
+                     use_container_width=True)
+
+        candidates = [row for row in rows if row["dim"] == 256]
+        if candidates:
+            best = max(candidates, key=lambda row: row["recall@10"])
+            st.success(f"💡 {original_dim}D → 256D with {best['method']}: {best['memory_ratio']:.0f}x less memory "
+                       f"and scan work for {best['recall_loss']:.1%} recall loss.")
+
+@st.cache_resource
+def get_explorer_collection(n_vectors, dim=64):
+    return synthetic_embeddings(n_vectors, dim, return_labels=True)
+
+def show_embedding_explorer():
+    st.markdown("### 🗺️ Embedding Explorer")
+    st.markdown("""
+    Plotting a real collection means squeezing millions of high-dimensional vectors into 2D. Running t-SNE
+    on all of them would take hours and a lot of memory, so the explorer fits the projection on a
+    **stratified sample** (every topic keeps its share), maps the rest chunk by chunk (**out-of-sample
+    transform**), caches the coordinates on disk and draws them with a WebGL scatter.
+    """)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        n_vectors = st.select_slider("Stored vectors:", [10000, 100000, 300000, 1000000], value=100000,
+                                     key="explorer_vectors")
+    with col2:
+        method = st.selectbox("Projection:", list(PROJECTION_METHODS), format_func=PROJECTION_METHODS.get,
+                              key="explorer_method")
+    with col3:
+        sample_size = st.select_slider("Fit sample:", [500, 1000, 2000, 5000], value=2000, key="explorer_sample")
+    with col4:
+        max_points = st.select_slider("Points drawn:", [20000, 100000, 300000, 1000000], value=100000,
+                                      key="explorer_points")
+
+    if st.button("Project Collection"):
+        vectors, labels = get_explorer_collection(n_vectors)
+        try:
+            with st.spinner("Fitting on the sample and projecting the collection..."):
+                coords, info = project_to_2d(vectors, labels, method, sample_size)
+        except ImportError as exc:
+            st.error(f"This projection needs an optional package that is not installed: {exc}")
+        else:
+            st.session_state["explorer_projection"] = (coords, labels, info)
+
+    if "explorer_projection" in st.session_state:
+        coords, labels, info = st.session_state["explorer_projection"]
+        shown = stratified_sample(labels, max_points)
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Vectors projected", f"{info['vectors']:,}")
+        col2.metric("Fit sample", f"{info['sample_size']:,}")
+        col3.metric("Fit + transform", "cached" if info["cached"] else f"{info['fit_s'] + info['transform_s']:.2f} s")
+        col4.metric("Points drawn", f"{len(shown):,}")
+
+        fig = go.Figure(go.Scattergl(
+            x=coords[shown, 0],
+            y=coords[shown, 1],
+            mode='markers',
+            marker=dict(size=3, color=labels[shown], colorscale='Turbo', opacity=0.6),
+            hovertemplate="topic %{marker.color}<extra></extra>"
+        ))
+        fig.update_layout(title=f"{PROJECTION_METHODS[info['method']]}: {info['vectors']:,} vectors, colored by topic",
+                          xaxis_title="Component 1", yaxis_title="Component 2", height=600)
+        st.plotly_chart(fig, use_container_width=True)
+
 def show_similarity_metrics():
     st.markdown('<h2 class="section-header">🎯 Similarity Metrics</h2>', unsafe_allow_html=True)
     
@@ -307,10 +415,7 @@ def show_cosine_similarity():
         vector_b = [b1, b2, b3, b4]
         
         # Calculate cosine similarity
-        dot_product = sum(a * b for a, b in zip(vector_a, vector_b))
-        norm_a = math.sqrt(sum(a * a for a in vector_a))
-        norm_b = math.sqrt(sum(b * b for b in vector_b))
-        cosine_sim = dot_product / (norm_a * norm_b) if norm_a != 0 and norm_b != 0 else 0
+        cosine_sim = distance(vector_a, vector_b, "cosine")
         
         st.markdown("#### 📊 Results")
         st.metric("Cosine Similarity", f"{cosine_sim:.3f}")
@@ -406,7 +511,7 @@ def show_euclidean_distance():
         vector_b = [b1, b2, b3, b4]
         
         # Calculate Euclidean distance
-        euclidean_dist = math.sqrt(sum((a - b) ** 2 for a, b in zip(vector_a, vector_b)))
+        euclidean_dist = distance(vector_a, vector_b, "l2")
         
         st.markdown("#### 📊 Results")
         st.metric("Euclidean Distance", f"{euclidean_dist:.2f}")
@@ -497,7 +602,7 @@ def show_dot_product():
         candidate_vector = [c1, c2, c3, c4]
         
         # Calculate dot product
-        dot_product = sum(j * c for j, c in zip(job_vector, candidate_vector))
+        dot_product = distance(job_vector, candidate_vector, "inner_product")
         
         st.markdown("#### 📊 Results")
         st.metric("Dot Product Score", f"{dot_product:.3f}")
@@ -592,10 +697,10 @@ def show_manhattan_distance():
         vector_b = [b1, b2, b3, b4]
         
         # Calculate Manhattan distance
-        manhattan_dist = sum(abs(a - b) for a, b in zip(vector_a, vector_b))
+        manhattan_dist = distance(vector_a, vector_b, "l1")
         
         st.markdown("#### 📊 Results")
-        st.metric("Manhattan Distance", f"{manhattan_dist}")
+        st.metric("Manhattan Distance", f"{manhattan_dist:g}")
         
         if manhattan_dist < 20:
             st.success("🎓 Very similar performance!")
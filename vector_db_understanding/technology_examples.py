@@ -1,9 +1,23 @@
+import time
+
 import streamlit as st
 import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from vector_collection import VectorCollection
+from embedding_runner import EmbeddingRunner, QueryEmbeddingCache, load_backend
+from embedding_benchmark import SAMPLE_DOCUMENTS
+from vector_db_backends import BACKENDS, available_backends, run_backend_benchmark
+from product_search import (
+    CATEGORIES, ProductSearchPipeline, benchmark_pipeline, sample_queries, synthetic_catalog
+)
+from user_profiles import EVENT_WEIGHTS, UserProfileStore, benchmark_profile_updates
+from recommender import (
+    GENRES, ItemItemRecommender, benchmark_recommender, interaction_matrix, synthetic_interactions
+)
+
 # Technology Functions
 def show_qdrant_details():
     st.markdown("""
@@ -47,41 +61,7 @@ def show_qdrant_details():
     
     with col2:
         st.markdown("#### 🎯 Performance Metrics")
-        
-        # Simulate performance data
-        dataset_sizes = [10000, 100000, 1000000, 10000000]
-        latencies = [0.5, 2.0, 10.0, 50.0]  # ms
-        throughputs = [10000, 8000, 5000, 2000]  # QPS
-        
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatter(
-            x=dataset_sizes,
-            y=latencies,
-            mode='lines+markers',
-            name='Latency (ms)',
-            line=dict(color='blue'),
-            yaxis='y'
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=dataset_sizes,
-            y=[t/100 for t in throughputs],  # Scale for visibility
-            mode='lines+markers',
-            name='Throughput (QPS/100)',
-            line=dict(color='red'),
-            yaxis='y2'
-        ))
-        
-        fig.update_layout(
-            title='Qdrant Performance vs Dataset Size',
-            xaxis_title='Dataset Size (vectors)',
-            yaxis=dict(title='Latency (ms)', side='left'),
-            yaxis2=dict(title='Throughput (QPS/100)', side='right', overlaying='y'),
-            height=400
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_measured_scaling()
         
         st.markdown("#### 🎯 Best Use Cases")
         st.info("""
@@ -340,7 +320,79 @@ def show_technology_comparison():
     elif use_case == "Cost Sensitive":
         st.success("**Recommended: Qdrant or Chroma** - Open source, no per-use costs")
 
+    show_local_engine_benchmark()
+
+@st.cache_resource(show_spinner=False)
+def get_available_engines():
+    return available_backends()
+
+def show_local_engine_benchmark():
+    st.markdown("### 🔬 Measured on This Machine")
+    st.markdown("""
+    Published latency charts come from someone else's hardware and dataset. This harness loads the same
+    embedding-like dataset into each locally runnable engine and measures ingest rate, single-query
+    latency, recall@10 against exact search, and on-disk size. Server-based engines (Qdrant, Pinecone,
+    pgvector) need infrastructure this page cannot start, so they are not part of the run.
+    """)
+
+    engines, skipped = get_available_engines()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        selected = st.multiselect("Engines:", engines, default=engines, format_func=lambda n: BACKENDS[n].name,
+                                  key="engine_selection")
+    with col2:
+        sizes = st.multiselect("Collection sizes:", [1000, 5000, 10000, 20000, 50000], default=[5000, 20000],
+                               key="engine_sizes")
+    with col3:
+        dim = st.selectbox("Dimensions:", [384, 768, 1536], index=1, key="engine_dim")
+    if skipped:
+        with st.expander(f"{len(skipped)} engine(s) not available here"):
+            for name, reason in skipped.items():
+                st.write(f"**{name}**: {reason}")
+
+    if st.button("Run Engine Benchmark"):
+        if not selected or not sizes:
+            st.warning("Select at least one engine and one collection size.")
+        else:
+            with st.spinner("Loading the dataset into each engine and running queries..."):
+                st.session_state["engine_benchmark"] = run_backend_benchmark(selected, sizes, dim)
+
+    rows = st.session_state.get("engine_benchmark")
+    if rows:
+        df = pd.DataFrame(rows)
+        st.dataframe(df.style.format({"ingest_vectors_per_s": "{:,.0f}", "p50_ms": "{:.2f}", "p95_ms": "{:.2f}",
+                                      "qps_single_thread": "{:,.0f}", "recall@10": "{:.3f}", "disk_mb": "{:.1f}",
+                                      "bytes_per_vector": "{:,.0f}"}), use_container_width=True)
+        largest = df[df["vectors"] == df["vectors"].max()]
+        col1, col2 = st.columns(2)
+        with col1:
+            fig = px.bar(largest, x="backend", y="p50_ms", title=f"p50 Query Latency at {largest['vectors'].iloc[0]:,} Vectors")
+            fig.update_layout(xaxis_title="", yaxis_title="ms")
+            st.plotly_chart(fig, use_container_width=True)
+        with col2:
+            fig = px.bar(largest, x="backend", y="ingest_vectors_per_s", title="Ingest Rate")
+            fig.update_layout(xaxis_title="", yaxis_title="vectors / s")
+            st.plotly_chart(fig, use_container_width=True)
+
+def show_measured_scaling():
+    rows = st.session_state.get("engine_benchmark")
+    if not rows:
+        st.info("Qdrant runs as a server, so it cannot be measured from this page. Run the engine benchmark under "
+                "Technology Comparison to see latency vs dataset size for the engines that run locally.")
+        return
+    df = pd.DataFrame(rows)
+    fig = px.line(df, x="vectors", y="p50_ms", color="backend", markers=True, log_x=True, log_y=True,
+                  title="Measured p50 Latency vs Dataset Size (local engines)")
+    fig.update_layout(xaxis_title="Dataset Size (vectors)", yaxis_title="Latency (ms)", height=400)
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("Measured on this machine with the engine benchmark; Qdrant itself is not included.")
+
 # Real-World Example Functions
+@st.cache_resource(show_spinner=False)
+def get_demo_collection(vectors_by_id):
+    """Demo vectors normalized once at insert time; reruns search the same collection"""
+    return VectorCollection.from_dict(vectors_by_id)
+
 def show_ecommerce_example():
     st.markdown("""
     ### E-commerce Product Search - Finding Similar Products
@@ -390,14 +442,9 @@ def show_ecommerce_example():
         query_vector = products[query_product]["vector"]
         similarities = []
         
-        for product, data in products.items():
-            if product != query_product:
-                # Cosine similarity
-                dot_product = sum(a * b for a, b in zip(query_vector, data["vector"]))
-                norm_query = (sum(a * a for a in query_vector)) ** 0.5
-                norm_product = (sum(b * b for b in data["vector"])) ** 0.5
-                similarity = dot_product / (norm_query * norm_product) if norm_query != 0 and norm_product != 0 else 0
-                similarities.append((product, similarity, data))
+        catalog = get_demo_collection({product: data["vector"] for product, data in products.items()})
+        for product, similarity in catalog.search(query_vector, len(catalog), exclude=[query_product]):
+            similarities.append((product, similarity, products[product]))
         
         # Sort by similarity and get top K
         similarities.sort(key=lambda x: x[1], reverse=True)
@@ -492,6 +539,81 @@ def show_ecommerce_example():
         5. **Performance**: Cache frequent queries for speed
         """)
 
+    show_two_stage_product_search()
+
+@st.cache_resource(show_spinner=False)
+def get_product_pipeline(n_products):
+    catalog = synthetic_catalog(n_products)
+    return ProductSearchPipeline(catalog), sample_queries(catalog, 50)
+
+def show_two_stage_product_search():
+    st.markdown("### 🛒 Two-Stage Catalog Search")
+    st.markdown("""
+    The demo above scores every product against the query, which stops working long before a catalog
+    reaches millions of SKUs. Production search splits the work in two:
+    1. **Candidate generation**: the query tower's embedding is matched against the product tower's embeddings
+       with an ANN index (here an IVF index: k-means lists, only the closest `n_probe` lists are scanned).
+    2. **Ranking**: a feature-based model scores only those candidates on similarity, category match,
+       popularity and price fit, as one vectorized NumPy pass.
+    Embeddings here are synthetic stand-ins for trained tower outputs.
+    """)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        n_products = st.select_slider("Catalog size (SKUs):", [50000, 200000, 500000], value=200000, key="ps_products")
+    with col2:
+        n_probe = st.select_slider("Lists probed (n_probe):", [1, 4, 8, 16, 32, 64], value=16, key="ps_probe")
+    with col3:
+        n_candidates = st.select_slider("Candidates to rank:", [100, 500, 1000, 2000, 5000], value=1000,
+                                        key="ps_candidates")
+
+    with st.spinner("Building the IVF index..."):
+        pipeline, queries = get_product_pipeline(n_products)
+    catalog = pipeline.catalog
+
+    col1, col2 = st.columns(2)
+    with col1:
+        query_id = st.number_input("Query (sampled shopper intent):", 0, len(queries) - 1, 0, key="ps_query")
+    query = queries[query_id]
+    with col2:
+        max_price = st.number_input("Max price ($, 0 = no limit):", 0, 10000, 0, step=50, key="ps_max_price")
+    st.write(f"**Intent:** {CATEGORIES[query['category']]}, around ${query['target_price']:.0f}")
+
+    ids, scores, stats = pipeline.search(query["vector"], 10, n_candidates, n_probe, category=query["category"],
+                                         target_price=query["target_price"], max_price=max_price or None,
+                                         return_stats=True)
+    st.dataframe(pd.DataFrame({
+        "SKU": ids,
+        "Category": [CATEGORIES[c] for c in catalog["categories"][ids]],
+        "Price": [f"${p:,.2f}" for p in catalog["prices"][ids]],
+        "Popularity": catalog["popularity"][ids],
+        "Rank score": scores,
+    }), use_container_width=True)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Stage 1: candidates", f"{stats['candidate_ms']:.2f} ms",
+                f"{stats['candidates']:,} of {stats['rows_scanned']:,} scanned", delta_color="off")
+    col2.metric("Stage 2: ranking", f"{stats['ranking_ms']:.2f} ms")
+    col3.metric("Index memory", f"{pipeline.index.memory_bytes() / 2 ** 20:.0f} MB",
+                f"{pipeline.index.n_lists} lists, built in {pipeline.index.build_seconds:.1f} s", delta_color="off")
+
+    if st.button("Run Pipeline Benchmark"):
+        with st.spinner("Comparing the two-stage pipeline with ranking the whole catalog..."):
+            st.session_state["ps_benchmark"] = benchmark_pipeline(n_products, n_candidates=n_candidates,
+                                                                  n_probe=n_probe)
+
+    if "ps_benchmark" in st.session_state:
+        rows, info = st.session_state["ps_benchmark"]
+        st.dataframe(pd.DataFrame(rows).style.format({"p50_ms": "{:.3f}", "p95_ms": "{:.3f}"}),
+                     use_container_width=True)
+        total, baseline = rows[-2], rows[-1]
+        st.success(f"💡 At {info['products']:,} SKUs the two-stage pipeline answers in {total['p50_ms']:.2f} ms (p50) "
+                   f"vs {baseline['p50_ms']:.1f} ms for ranking every product, and returns "
+                   f"{info['recall@10']:.1%} of the same top 10. Stage 1 scans {info['rows_scanned']:,.0f} rows "
+                   f"({info['n_probe']} of {info['lists']} lists).")
+        st.info(f"At 5M SKUs this index would need about {info['index_mb_at_5m'] / 1024:.1f} GB of float32 vectors; "
+                f"the stage-one scan grows with rows per list, so keep lists at roughly √N and tune n_probe for recall.")
+
 def show_recommendation_example():
     st.markdown("""
     ### Recommendation Systems - Personalizing Content
@@ -523,20 +645,50 @@ def show_recommendation_example():
             "Scary Movie": [0.3, 0.9, 0.1, 0.6, 0.2]
         }
         
+        watched = {
+            "Alice": ["Titanic", "The Matrix"],
+            "Bob": ["John Wick"],
+            "Charlie": ["Deadpool", "La La Land"],
+            "Diana": ["The Notebook"]
+        }
+        
         # User selection
         user = st.selectbox("Select user:", list(users.keys()))
         
-        # Calculate recommendations
-        user_vector = users[user]
+        # Profiles start from the vectors above and then follow the user's live events
+        if "profile_store" not in st.session_state:
+            profiles = UserProfileStore(dim=5, half_life_s=600.0)
+            for name, vector in users.items():
+                profiles.set(name, vector, timestamp=0.0)
+            st.session_state["profile_store"] = profiles
+            st.session_state["profile_clock_s"] = 0.0
+            st.session_state["profile_watched"] = {name: list(titles) for name, titles in watched.items()}
+        profiles = st.session_state["profile_store"]
+        watched = st.session_state["profile_watched"]
+        
+        with st.expander("⚡ Live events (profile half-life: 10 minutes)"):
+            event_movie = st.selectbox("Movie:", list(movies.keys()), key="event_movie")
+            event_type = st.selectbox("Event:", list(EVENT_WEIGHTS), key="event_type")
+            if st.button("Record Event"):
+                profiles.update([user], movies[event_movie], event_type, st.session_state["profile_clock_s"])
+                if event_movie not in watched[user]:
+                    watched[user].append(event_movie)
+            minutes = st.slider("Minutes to advance:", 1, 60, 10, key="event_minutes")
+            if st.button("Advance Clock"):
+                st.session_state["profile_clock_s"] += minutes * 60
+            st.write(f"Clock: {st.session_state['profile_clock_s'] / 60:.0f} min - recent activity weight for "
+                     f"{user}: {profiles.activity(user, st.session_state['profile_clock_s']):.2f}")
+        
+        st.write(f"**Already watched:** {', '.join(watched[user])}")
+        
+        # Calculate recommendations (movies the user has seen are not recommended again)
+        profile = profiles.vector(user, st.session_state["profile_clock_s"], normalize=False)
+        user_vector = (profile / (profile.max() or 1.0)).tolist()  # scaled to [0, 1] for the radar chart
         recommendations = []
         
-        for movie, movie_vector in movies.items():
-            # Cosine similarity
-            dot_product = sum(a * b for a, b in zip(user_vector, movie_vector))
-            norm_user = (sum(a * a for a in user_vector)) ** 0.5
-            norm_movie = (sum(b * b for b in movie_vector)) ** 0.5
-            similarity = dot_product / (norm_user * norm_movie) if norm_user != 0 and norm_movie != 0 else 0
-            recommendations.append((movie, similarity, movie_vector))
+        catalog = get_demo_collection(movies)
+        for movie, similarity in catalog.search(user_vector, len(catalog), exclude=watched[user]):
+            recommendations.append((movie, similarity, movies[movie]))
         
         # Sort by similarity and get top 5
         recommendations.sort(key=lambda x: x[1], reverse=True)
@@ -629,6 +781,97 @@ def show_recommendation_example():
         5. **A/B Testing**: Continuously improve algorithms
         """)
 
+    show_collaborative_filtering()
+    show_profile_update_benchmark()
+
+@st.cache_resource(show_spinner=False)
+def get_cf_recommender(n_users, n_items, n_neighbors):
+    histories, item_genres = synthetic_interactions(n_users, n_items)
+    model = ItemItemRecommender(n_neighbors).fit(interaction_matrix(histories, n_items))
+    return model, histories, item_genres
+
+def show_collaborative_filtering():
+    st.markdown("### 🤝 Item-Item Collaborative Filtering at Scale")
+    st.markdown("""
+    Scoring every item for every request is O(items). An item-item recommender moves that work offline:
+    it precomputes each item's top-N most similar items (by who watched them together) and stores only those
+    lists in a sparse matrix. A request then sums the neighbor lists of the user's recent items,
+    O(history × N), and drops anything in the user's *seen* bitmap.
+    """)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        n_items = st.select_slider("Catalog size:", [1000, 2000, 5000, 10000], value=2000, key="cf_items")
+    with col2:
+        n_users = st.select_slider("Users:", [1000, 5000, 20000], value=5000, key="cf_users")
+    with col3:
+        n_neighbors = st.select_slider("Neighbors kept per item (N):", [10, 20, 50, 100], value=50, key="cf_neighbors")
+
+    with st.spinner("Precomputing neighbor lists..."):
+        model, histories, item_genres = get_cf_recommender(n_users, n_items, n_neighbors)
+
+    def item_name(item):
+        return f"Item {item} ({GENRES[item_genres[item]]})"
+
+    user = st.number_input("User id:", 0, n_users - 1, 0, key="cf_user")
+    history = histories[user]
+    recommendations = model.recommend(history, k=10)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Recent history**")
+        for item in history[-8:][::-1]:
+            st.write(f"- {item_name(item)}")
+    with col2:
+        st.markdown("**Recommended (never seen)**")
+        for item, score, because in recommendations:
+            st.write(f"- {item_name(item)}: score {score:.2f}, because you watched {item_name(because)}")
+
+    st.caption(f"Neighbor lists built in {model.fit_seconds:.2f} s; stored as {model.neighbors.nnz:,} sparse entries "
+               f"instead of a {n_items:,} × {n_items:,} dense matrix.")
+
+    if st.button("Run Recommender Benchmark"):
+        with st.spinner("Hiding each user's last item and asking both methods for it..."):
+            st.session_state["cf_benchmark"] = benchmark_recommender(n_users, n_items, n_neighbors)
+
+    if "cf_benchmark" in st.session_state:
+        rows, info = st.session_state["cf_benchmark"]
+        st.dataframe(pd.DataFrame(rows).style.format({"hit_rate@10": "{:.3f}", "p50_ms": "{:.2f}", "p95_ms": "{:.2f}"}),
+                     use_container_width=True)
+        precomputed, on_the_fly = rows
+        st.success(f"💡 Precomputed neighbors answer in {precomputed['p50_ms']:.2f} ms (p50) vs "
+                   f"{on_the_fly['p50_ms']:.2f} ms on the fly, with hit rate {precomputed['hit_rate@10']:.3f} vs "
+                   f"{on_the_fly['hit_rate@10']:.3f}. Neighbor lists: {info['neighbor_lists_mb']:.1f} MB vs "
+                   f"{info['dense_similarity_mb']:.0f} MB for the dense similarity matrix.")
+
+def show_profile_update_benchmark():
+    st.markdown("### ⚡ Streaming Profile Updates")
+    st.markdown("""
+    The live events above go through an online profile store: each user's vector is a time-decayed sum of
+    the embeddings of items they interacted with, kept in a preallocated float32 matrix with an id → row
+    map. A batch of events is one scatter-add, so recommendations reflect the last minute of behavior
+    without recomputing profiles in batch. The store can be snapshotted to disk and restored.
+    """)
+    if st.button("Measure Update Throughput"):
+        with st.spinner("Replaying a synthetic click stream..."):
+            st.session_state["profile_benchmark"] = benchmark_profile_updates()
+    result = st.session_state.get("profile_benchmark")
+    if result:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("One event at a time", f"{result['single_events_per_s']:,.0f} events/s")
+        col2.metric("Batches of 1,000", f"{result['batched_events_per_s']:,.0f} events/s")
+        col3.metric("Profile matrix", f"{result['users']:,} users, {result['matrix_mb']:.0f} MB")
+
+@st.cache_resource(show_spinner=False)
+def get_document_index(titles, texts):
+    """Document embeddings computed once per session, plus an LRU cache for query embeddings"""
+    backend, note = load_backend()
+    runner = EmbeddingRunner(backend)
+    start = time.perf_counter()
+    collection = VectorCollection.from_dict(dict(zip(titles, runner.embed(texts))))
+    index_ms = (time.perf_counter() - start) * 1000
+    return collection, QueryEmbeddingCache(runner), note, index_ms
+
 def show_document_example():
     st.markdown("""
     ### Document Retrieval - Finding Relevant Information
@@ -643,89 +886,54 @@ def show_document_example():
         
         # Sample document database
         documents = {
-            "Machine Learning Guide": {
-                "content": "Machine learning is a subset of artificial intelligence that focuses on algorithms and statistical models.",
-                "vector": [0.9, 0.8, 0.1, 0.2, 0.7]  # [tech, education, business, health, science]
-            },
-            "Python Programming": {
-                "content": "Python is a high-level programming language known for its simplicity and readability.",
-                "vector": [0.8, 0.9, 0.2, 0.1, 0.6]
-            },
-            "Business Strategy": {
-                "content": "Strategic planning involves setting goals and determining actions to achieve long-term objectives.",
-                "vector": [0.2, 0.3, 0.9, 0.1, 0.4]
-            },
-            "Health and Fitness": {
-                "content": "Regular exercise and a balanced diet are essential for maintaining good health.",
-                "vector": [0.1, 0.2, 0.3, 0.9, 0.5]
-            },
-            "Data Science": {
-                "content": "Data science combines statistics, programming, and domain expertise to extract insights from data.",
-                "vector": [0.9, 0.7, 0.4, 0.1, 0.8]
-            },
-            "Financial Planning": {
-                "content": "Investment strategies should be based on risk tolerance and long-term financial goals.",
-                "vector": [0.3, 0.4, 0.8, 0.0, 0.6]
-            }
+            "Machine Learning Guide": "Machine learning is a subset of artificial intelligence that focuses on algorithms and statistical models.",
+            "Python Programming": "Python is a high-level programming language known for its simplicity and readability.",
+            "Business Strategy": "Strategic planning involves setting goals and determining actions to achieve long-term objectives.",
+            "Health and Fitness": "Regular exercise and a balanced diet are essential for maintaining good health.",
+            "Data Science": "Data science combines statistics, programming, and domain expertise to extract insights from data.",
+            "Financial Planning": "Investment strategies should be based on risk tolerance and long-term financial goals.",
         }
+        # Help-center articles make the collection large enough for ranking to matter
+        for text in SAMPLE_DOCUMENTS:
+            documents[" ".join(text.split()[:4]) + "..."] = text
+        
+        with st.spinner("Embedding documents..."):
+            collection, query_cache, note, index_ms = get_document_index(tuple(documents), tuple(documents.values()))
+        if note:
+            st.caption(f"Using the offline hashing embedder (matches shared words, not meaning): {note}")
         
         # Search query
         query = st.text_input("Search query:", "How to learn artificial intelligence?")
         
-        # Simulate query vector (in reality, you'd use an embedding model)
-        query_vector = [0.8, 0.9, 0.2, 0.1, 0.7]  # Similar to tech/education
-        
-        # Calculate similarities
-        similarities = []
-        for doc_id, doc_data in documents.items():
-            # Cosine similarity
-            dot_product = sum(a * b for a, b in zip(query_vector, doc_data["vector"]))
-            norm_query = (sum(a * a for a in query_vector)) ** 0.5
-            norm_doc = (sum(b * b for b in doc_data["vector"])) ** 0.5
-            similarity = dot_product / (norm_query * norm_doc) if norm_query != 0 and norm_doc != 0 else 0
-            similarities.append((doc_id, similarity, doc_data))
-        
-        # Sort by similarity
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        # Embed the typed query (LRU-cached) and search the collection
+        query_vector, embed_stats = query_cache.embed(query)
+        start = time.perf_counter()
+        similarities = collection.search(query_vector, 5)
+        search_ms = (time.perf_counter() - start) * 1000
         
         st.markdown("#### 📊 Search Results")
         st.write(f"**Query**: \"{query}\"")
         st.write("**Ranked Results:**")
         
-        for i, (doc_id, similarity, doc_data) in enumerate(similarities, 1):
+        for i, (doc_id, similarity) in enumerate(similarities, 1):
             st.write(f"{i}. **{doc_id}** (Relevance: {similarity:.3f})")
-            st.write(f"   *{doc_data['content'][:100]}...*")
-        
-        # Visualize document similarity
-        categories = ['Tech', 'Education', 'Business', 'Health', 'Science']
+            st.write(f"   *{documents[doc_id][:100]}...*")
         
-        fig = go.Figure()
-        
-        # Query vector
-        fig.add_trace(go.Scatterpolar(
-            r=query_vector + [query_vector[0]],
-            theta=categories + [categories[0]],
-            fill='toself',
-            name='Query',
-            line_color='red',
-            line_width=3
-        ))
-        
-        # Top 3 documents
-        colors = ['blue', 'green', 'orange']
-        for i, (doc_id, similarity, doc_data) in enumerate(similarities[:3]):
-            fig.add_trace(go.Scatterpolar(
-                r=doc_data["vector"] + [doc_data["vector"][0]],
-                theta=categories + [categories[0]],
-                fill='toself',
-                name=f"{doc_id} ({similarity:.3f})",
-                line_color=colors[i % len(colors)],
-                opacity=0.7
-            ))
-        
-        fig.update_layout(
-            polar=dict(radialaxis=dict(visible=True, range=[0, 1])),
-            showlegend=True,
+        col_a, col_b, col_c = st.columns(3)
+        col_a.metric("Embed query", f"{embed_stats['embed_ms']:.2f} ms",
+                     "cache hit" if embed_stats["cache_hit"] else "cache miss", delta_color="off")
+        col_b.metric("Search", f"{search_ms:.2f} ms")
+        col_c.metric("Total", f"{embed_stats['embed_ms'] + search_ms:.2f} ms")
+        st.caption(f"{len(collection)} documents embedded once per session in {index_ms:.0f} ms "
+                   f"with {query_cache.runner.backend.name}. Query cache: {query_cache.hits} hits, "
+                   f"{query_cache.misses} misses, {len(query_cache)}/{query_cache.maxsize} entries.")
+        
+        # Visualize document relevance
+        fig = px.bar(
+            x=[similarity for _, similarity in similarities][::-1],
+            y=[doc_id for doc_id, _ in similarities][::-1],
+            orientation='h',
+            labels={'x': 'Cosine similarity to query', 'y': ''},
             title="Query vs Document Similarity"
         )
         
@@ -821,14 +1029,9 @@ def show_image_example():
         query_vector = images[query_image]["vector"]
         similarities = []
         
-        for img_id, img_data in images.items():
-            if img_id != query_image:
-                # Cosine similarity
-                dot_product = sum(a * b for a, b in zip(query_vector, img_data["vector"]))
-                norm_query = (sum(a * a for a in query_vector)) ** 0.5
-                norm_img = (sum(b * b for b in img_data["vector"])) ** 0.5
-                similarity = dot_product / (norm_query * norm_img) if norm_query != 0 and norm_img != 0 else 0
-                similarities.append((img_id, similarity, img_data))
+        gallery = get_demo_collection({img_id: img_data["vector"] for img_id, img_data in images.items()})
+        for img_id, similarity in gallery.search(query_vector, len(gallery), exclude=[query_image]):
+            similarities.append((img_id, similarity, images[img_id]))
         
         # Sort by similarity
         similarities.sort(key=lambda x: x[1], reverse=True)
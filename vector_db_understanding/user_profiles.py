@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# Relative strength of each event type as a preference signal
+EVENT_WEIGHTS = {"view": 1.0, "click": 2.0, "add_to_cart": 4.0, "purchase": 8.0}
+
+
+class UserProfileStore:
+    """Online user preference vectors with exponential time decay.
+
+    A profile is the decayed, weighted sum of the embeddings of the items a user interacted with: an
+    event's contribution halves every `half_life_s` seconds. Rows are stored relative to a reference
+    time t0 (contributions are scaled by 2^((t - t0) / half_life)), so applying a batch of events is a
+    single order-independent scatter-add and reading a profile at time t multiplies by 2^(-(t - t0) /
+    half_life). When the scale factors grow large, every row is rebased to a newer t0.
+
+    Vectors live in a preallocated float32 matrix (grown by doubling) with an id -> row map.
+    """
+
+    _MAX_EXPONENT = 60.0  # rebase before 2^exponent loses float32 precision
+
+    def __init__(self, dim, half_life_s=3600.0, capacity=1024, event_weights=None, t0=0.0):
+        self.dim = dim
+        self.half_life_s = half_life_s
+        self.event_weights = dict(EVENT_WEIGHTS, **(event_weights or {}))
+        self.t0 = t0
+        self.ids = []
+        self.rows = {}
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._weights = np.zeros(capacity, dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, user_id):
+        return user_id in self.rows
+
+    def _row(self, user_id):
+        row = self.rows.get(user_id)
+        if row is None:
+            row = len(self.ids)
+            if row == len(self._vectors):
+                self._vectors = np.vstack([self._vectors, np.zeros_like(self._vectors)])
+                self._weights = np.concatenate([self._weights, np.zeros_like(self._weights)])
+            self.rows[user_id] = row
+            self.ids.append(user_id)
+        return row
+
+    def _rebase(self, timestamp):
+        scale = np.float32(2.0 ** (-(timestamp - self.t0) / self.half_life_s))
+        self._vectors[:len(self.ids)] *= scale
+        self._weights[:len(self.ids)] *= scale
+        self.t0 = timestamp
+
+    def set(self, user_id, vector, timestamp, weight=1.0):
+        """Initialize or overwrite a profile (e.g. from a batch-computed vector) as of `timestamp`"""
+        with self._lock:
+            if (timestamp - self.t0) / self.half_life_s > self._MAX_EXPONENT:
+                self._rebase(timestamp)
+            row = self._row(user_id)
+            scale = 2.0 ** ((timestamp - self.t0) / self.half_life_s)
+            self._vectors[row] = np.asarray(vector, dtype=np.float32) * weight * scale
+            self._weights[row] = weight * scale
+
+    def update(self, user_ids, item_vectors, events="view", timestamps=None):
+        """Apply a batch of events: user_ids[i] had event events[i] on an item with embedding
+        item_vectors[i] at timestamps[i] (default: now). Events may arrive in any order."""
+        item_vectors = np.asarray(item_vectors, dtype=np.float32).reshape(-1, self.dim)
+        n = len(item_vectors)
+        user_ids = [user_ids] if np.ndim(user_ids) == 0 and n == 1 else list(user_ids)
+        events = [events] * n if isinstance(events, str) else list(events)
+        timestamps = np.full(n, time.time()) if timestamps is None else np.broadcast_to(
+            np.asarray(timestamps, dtype=np.float64), (n,))
+        weights = np.array([self.event_weights[event] for event in events], dtype=np.float64)
+        with self._lock:
+            if (timestamps.max() - self.t0) / self.half_life_s > self._MAX_EXPONENT:
+                self._rebase(float(timestamps.max()))
+            rows = np.array([self._row(user_id) for user_id in user_ids], dtype=np.int64)
+            scaled = (weights * 2.0 ** ((timestamps - self.t0) / self.half_life_s)).astype(np.float32)
+            np.add.at(self._vectors, rows, item_vectors * scaled[:, None])
+            np.add.at(self._weights, rows, scaled)
+
+    def vectors(self, user_ids, timestamp=None, normalize=True):
+        """Current profiles for several users (zero rows for unknown users)"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            # t0 moves when a concurrent update rebases, so it is read together with the rows
+            decay = np.float32(2.0 ** (-(timestamp - self.t0) / self.half_life_s))
+            rows = [self.rows.get(user_id) for user_id in user_ids]
+            out = np.zeros((len(rows), self.dim), dtype=np.float32)
+            known = [i for i, row in enumerate(rows) if row is not None]
+            out[known] = self._vectors[[rows[i] for i in known]] * decay
+        if normalize:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out /= np.where(norms == 0, 1.0, norms)
+        return out
+
+    def vector(self, user_id, timestamp=None, normalize=True):
+        return self.vectors([user_id], timestamp, normalize)[0]
+
+    def activity(self, user_id, timestamp=None):
+        """Decayed total event weight: how much recent evidence the profile rests on"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            row = self.rows.get(user_id)
+            if row is None:
+                return 0.0
+            return float(self._weights[row] * 2.0 ** (-(timestamp - self.t0) / self.half_life_s))
+
+    def snapshot(self, path):
+        """Write the store to `path` (.npz) atomically, so a crash never leaves a torn snapshot"""
+        with self._lock:
+            meta = {"dim": self.dim, "half_life_s": self.half_life_s, "t0": self.t0,
+                    "event_weights": self.event_weights, "ids": self.ids}
+            tmp_path = f"{path}.tmp.npz"
+            np.savez(tmp_path, vectors=self._vectors[:len(self.ids)], weights=self._weights[:len(self.ids)],
+                     meta=np.array(json.dumps(meta)))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def restore(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            store = cls(meta["dim"], meta["half_life_s"], capacity=max(len(meta["ids"]), 1),
+                        event_weights=meta["event_weights"], t0=meta["t0"])
+            # JSON turns tuple ids into lists; restore them as tuples so they stay hashable
+            store.ids = [tuple(i) if isinstance(i, list) else i for i in meta["ids"]]
+            store.rows = {user_id: row for row, user_id in enumerate(store.ids)}
+            store._vectors[:len(store.ids)] = data["vectors"]
+            store._weights[:len(store.ids)] = data["weights"]
+        return store
+
+
+def benchmark_profile_updates(n_users=100000, n_items=10000, dim=64, n_events=200000, batch_size=1000, seed=0):
+    """Events per second applied one at a time vs in batches, on a synthetic click stream"""
+    rng = np.random.default_rng(seed)
+    items = rng.standard_normal((n_items, dim)).astype(np.float32)
+    users = rng.integers(0, n_users, n_events)
+    picks = rng.integers(0, n_items, n_events)
+    timestamps = np.sort(rng.uniform(0, 3600, n_events))
+    events = rng.choice(list(EVENT_WEIGHTS), n_events, p=[0.7, 0.2, 0.07, 0.03])
+
+    single = UserProfileStore(dim, capacity=n_users)
+    n_single = min(n_events, 20000)
+    start = time.perf_counter()
+    for i in range(n_single):
+        single.update([int(users[i])], items[picks[i]], events[i], timestamps[i])
+    single_s = time.perf_counter() - start
+
+    batched = UserProfileStore(dim, capacity=n_users)
+    start = time.perf_counter()
+    for offset in range(0, n_events, batch_size):
+        batch = slice(offset, offset + batch_size)
+        batched.update(users[batch].tolist(), items[picks[batch]], events[batch].tolist(), timestamps[batch])
+    batched_s = time.perf_counter() - start
+    return {
+        "single_events_per_s": n_single / single_s,
+        "batched_events_per_s": n_events / batched_s,
+        "users": len(batched),
+        "matrix_mb": batched._vectors.nbytes / 2 ** 20,
+    }
@@ -0,0 +1,128 @@
+import time
+
+import numpy as np
+
+from distance_kernels import SIMILARITY_METRICS
+
+
+class VectorCollection:
+    """In-memory vector collection that stores unit-normalized float32 rows plus their original norms.
+
+    Vectors are normalized once on insert, so every query is a single matrix-vector product against
+    the unit rows: cosine uses it directly, inner product rescales by the stored norms and L2 expands
+    to ||q||^2 + ||v||^2 - 2 ||q|| ||v|| cos. Storage grows by doubling, like an append-only index.
+    """
+
+    def __init__(self, dim, initial_capacity=64):
+        self.dim = dim
+        self.ids = []
+        self.payloads = []
+        self._unit = np.zeros((initial_capacity, dim), dtype=np.float32)
+        self._norms = np.zeros(initial_capacity, dtype=np.float32)
+        self._positions = {}
+
+    @classmethod
+    def from_dict(cls, vectors_by_id, payloads=None):
+        """Collection from {id: vector}; payloads optionally maps id -> metadata"""
+        ids = list(vectors_by_id)
+        vectors = np.asarray([vectors_by_id[i] for i in ids], dtype=np.float32)
+        collection = cls(vectors.shape[1], initial_capacity=max(len(ids), 1))
+        collection.add(ids, vectors, [payloads[i] for i in ids] if payloads else None)
+        return collection
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, item_id):
+        return item_id in self._positions
+
+    @property
+    def unit_vectors(self):
+        return self._unit[:len(self.ids)]
+
+    @property
+    def norms(self):
+        return self._norms[:len(self.ids)]
+
+    @property
+    def vectors(self):
+        """Original (unnormalized) vectors, reconstructed from unit rows and norms"""
+        return self.unit_vectors * self.norms[:, None]
+
+    def add(self, ids, vectors, payloads=None):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} ids for {len(vectors)} vectors")
+        if len(set(ids)) != len(ids) or any(item_id in self._positions for item_id in ids):
+            raise ValueError("Ids must be unique within the collection")
+        start, needed = len(self.ids), len(self.ids) + len(ids)
+        if needed > len(self._unit):
+            capacity = max(needed, 2 * len(self._unit))
+            self._unit = np.vstack([self._unit, np.zeros((capacity - len(self._unit), self.dim), np.float32)])
+            self._norms = np.concatenate([self._norms, np.zeros(capacity - len(self._norms), np.float32)])
+        norms = np.linalg.norm(vectors, axis=1)
+        self._norms[start:needed] = norms
+        self._unit[start:needed] = vectors / np.where(norms == 0, 1.0, norms)[:, None]
+        for offset, item_id in enumerate(ids):
+            self._positions[item_id] = start + offset
+        self.ids.extend(ids)
+        self.payloads.extend(payloads if payloads is not None else [None] * len(ids))
+
+    def get(self, item_id):
+        position = self._positions[item_id]
+        return self._unit[position] * self._norms[position]
+
+    def payload(self, item_id):
+        return self.payloads[self._positions[item_id]]
+
+    def scores(self, query, metric="cosine"):
+        """Metric between the query and every stored vector, in insertion order"""
+        if metric not in ("cosine", "inner_product", "l2"):
+            raise ValueError(f"VectorCollection supports cosine, inner_product and l2, not {metric!r}")
+        query = np.asarray(query, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query))
+        cosines = self.unit_vectors @ (query / query_norm) if query_norm else np.zeros(len(self), np.float32)
+        if metric == "cosine":
+            return cosines
+        if metric == "inner_product":
+            return cosines * self.norms * query_norm
+        squared = query_norm ** 2 + self.norms ** 2 - 2 * query_norm * self.norms * cosines
+        return np.sqrt(np.maximum(squared, 0))
+
+    def search(self, query, k=10, metric="cosine", exclude=()):
+        """Best k (id, score) pairs for the query, most similar first, skipping ids in `exclude`"""
+        scores = self.scores(query, metric)
+        keyed = -scores if metric in SIMILARITY_METRICS else scores.copy()
+        for item_id in exclude:
+            if item_id in self._positions:
+                keyed[self._positions[item_id]] = np.inf
+        k = min(k, len(self) - sum(1 for item_id in set(exclude) if item_id in self._positions))
+        if k <= 0:
+            return []
+        top = np.argpartition(keyed, k - 1)[:k]
+        top = top[np.argsort(keyed[top], kind="stable")]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+
+def benchmark_precomputed_norms(n_vectors=100000, dim=128, n_queries=20, seed=0):
+    """Per-query cosine scan time: renormalizing every row at query time vs the precomputed collection"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n_vectors, dim)).astype(np.float32)
+    queries = rng.standard_normal((n_queries, dim)).astype(np.float32)
+    collection = VectorCollection(dim, initial_capacity=n_vectors)
+    collection.add(list(range(n_vectors)), vectors)
+
+    start = time.perf_counter()
+    for query in queries:
+        expected = (vectors @ query) / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    renormalize_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for query in queries:
+        result = collection.scores(query, "cosine")
+    precomputed_s = time.perf_counter() - start
+    return {
+        "renormalize_ms": renormalize_s * 1000 / n_queries,
+        "precomputed_ms": precomputed_s * 1000 / n_queries,
+        "speedup": renormalize_s / precomputed_s if precomputed_s else float("inf"),
+        "max_abs_diff": float(np.max(np.abs(result - expected))),
+    }
@@ -0,0 +1,250 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+from dimensionality_reduction import synthetic_embeddings
+from distance_kernels import top_k
+from matryoshka_search import MatryoshkaIndex
+from vector_collection import VectorCollection
+
+
+def _directory_bytes(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+class VectorBackend:
+    """Interface every benchmarked engine implements.
+
+    Backends persist under `directory`; `add` takes integer ids and float32 vectors, `flush` makes
+    everything added so far durable and searchable, and `search` returns the ids of the k most
+    cosine-similar vectors, best first.
+    """
+
+    name = "backend"
+    description = ""
+
+    def __init__(self, directory, dim):
+        self.directory = directory
+        self.dim = dim
+        os.makedirs(directory, exist_ok=True)
+
+    def add(self, ids, vectors):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def search(self, query, k=10):
+        raise NotImplementedError
+
+    def disk_bytes(self):
+        return _directory_bytes(self.directory)
+
+    def close(self):
+        pass
+
+
+class CollectionBackend(VectorBackend):
+    """In-repo VectorCollection (exact cosine over precomputed norms), persisted as .npy files"""
+
+    name = "numpy flat (VectorCollection)"
+    description = "Exact scan, in-process, unit vectors + norms saved as .npy"
+
+    def __init__(self, directory, dim):
+        super().__init__(directory, dim)
+        self.collection = VectorCollection(dim)
+
+    def add(self, ids, vectors):
+        self.collection.add(list(ids), vectors)
+
+    def flush(self):
+        np.save(os.path.join(self.directory, "unit.npy"), self.collection.unit_vectors)
+        np.save(os.path.join(self.directory, "norms.npy"), self.collection.norms)
+        np.save(os.path.join(self.directory, "ids.npy"), np.asarray(self.collection.ids, dtype=np.int64))
+
+    def search(self, query, k=10):
+        return [item_id for item_id, _ in self.collection.search(query, k)]
+
+
+class MatryoshkaBackend(VectorBackend):
+    """In-repo MatryoshkaIndex: 128-D prefix scan, 512-D rescoring, full-dimension ranking"""
+
+    name = "matryoshka (prefix + rescoring)"
+    description = "Approximate, in-process, full vectors + prefix arrays saved as .npy"
+
+    def __init__(self, directory, dim, levels=(128, 512), candidates=(400, 100)):
+        super().__init__(directory, dim)
+        self.levels = levels
+        self.candidates = candidates
+        self._ids, self._pending = [], []
+        self.index = None
+
+    def add(self, ids, vectors):
+        self._ids.extend(ids)
+        self._pending.append(np.asarray(vectors, dtype=np.float32))
+
+    def flush(self):
+        vectors = np.vstack(([self.index.vectors] if self.index is not None else []) + self._pending)
+        self._pending = []
+        self.index = MatryoshkaIndex(vectors, self.levels)
+        np.save(os.path.join(self.directory, "vectors.npy"), self.index.vectors)
+        for prefix in self.index.prefixes:
+            np.save(os.path.join(self.directory, f"prefix_{prefix.shape[1]}.npy"), prefix)
+        np.save(os.path.join(self.directory, "ids.npy"), np.asarray(self._ids, dtype=np.int64))
+
+    def search(self, query, k=10):
+        rows, _ = self.index.search(query, k, self.candidates)
+        return [self._ids[row] for row in rows]
+
+
+class SQLiteBackend(VectorBackend):
+    """Vector table in SQLite (float32 BLOB column); queries stream the table in pages and score
+    each page with NumPy, the way a database without a vector index does a full scan"""
+
+    name = "sqlite (vector table)"
+    description = "Exact scan, embedded, one BLOB row per vector"
+    page_size = 8192
+
+    def __init__(self, directory, dim):
+        super().__init__(directory, dim)
+        self.connection = sqlite3.connect(os.path.join(directory, "vectors.db"), check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS vectors (id INTEGER PRIMARY KEY, embedding BLOB NOT NULL)")
+
+    def add(self, ids, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        unit = vectors / np.where(norms == 0, 1.0, norms)
+        self.connection.executemany("INSERT INTO vectors (id, embedding) VALUES (?, ?)",
+                                    [(int(i), row.tobytes()) for i, row in zip(ids, unit)])
+
+    def flush(self):
+        self.connection.commit()
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def search(self, query, k=10):
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        best_ids, best_scores = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        cursor = self.connection.execute("SELECT id, embedding FROM vectors")
+        while True:
+            page = cursor.fetchmany(self.page_size)
+            if not page:
+                break
+            ids = np.fromiter((row[0] for row in page), dtype=np.int64, count=len(page))
+            matrix = np.frombuffer(b"".join(row[1] for row in page), dtype=np.float32).reshape(len(page), self.dim)
+            best_ids = np.concatenate([best_ids, ids])
+            best_scores = np.concatenate([best_scores, matrix @ query])
+            if len(best_ids) > k:
+                keep = np.argpartition(-best_scores, k - 1)[:k]
+                best_ids, best_scores = best_ids[keep], best_scores[keep]
+        order = np.argsort(-best_scores, kind="stable")
+        return best_ids[order].tolist()
+
+    def close(self):
+        self.connection.close()
+
+
+class ChromaBackend(VectorBackend):
+    """Chroma in embedded persistent mode (HNSW, cosine space); needs the optional chromadb package"""
+
+    name = "chroma (embedded)"
+    description = "Approximate (HNSW), embedded, SQLite metadata + HNSW segment files"
+
+    def __init__(self, directory, dim):
+        import chromadb
+
+        super().__init__(directory, dim)
+        self.client = chromadb.PersistentClient(path=directory)
+        self.collection = self.client.get_or_create_collection("benchmark", metadata={"hnsw:space": "cosine"})
+        self.max_batch = getattr(self.client, "get_max_batch_size", lambda: 5000)()
+
+    def add(self, ids, vectors):
+        ids, vectors = list(ids), np.asarray(vectors, dtype=np.float32)
+        for start in range(0, len(ids), self.max_batch):
+            self.collection.add(ids=[str(i) for i in ids[start:start + self.max_batch]],
+                                embeddings=vectors[start:start + self.max_batch].tolist())
+
+    def search(self, query, k=10):
+        result = self.collection.query(query_embeddings=[np.asarray(query, dtype=np.float32).tolist()], n_results=k)
+        return [int(i) for i in result["ids"][0]]
+
+
+BACKENDS = {
+    "collection": CollectionBackend,
+    "matryoshka": MatryoshkaBackend,
+    "sqlite": SQLiteBackend,
+    "chroma": ChromaBackend,
+}
+
+
+def available_backends(names=None):
+    """Backends that can be constructed here. Returns (names, skipped) where skipped maps a backend
+    name to the reason it cannot run (usually a missing optional package)."""
+    available, skipped = [], {}
+    for name in names or BACKENDS:
+        directory = tempfile.mkdtemp(prefix=f"probe_{name}_")
+        try:
+            BACKENDS[name](directory, 8).close()
+            available.append(name)
+        except Exception as exc:
+            skipped[BACKENDS[name].name] = f"{type(exc).__name__}: {exc}"
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+    return available, skipped
+
+
+def benchmark_backend(name, vectors, queries, exact, k=10, batch_size=1000, workdir=None):
+    """Load the dataset into one backend and measure ingest rate, query latency, recall and disk size"""
+    directory = tempfile.mkdtemp(prefix=f"bench_{name}_", dir=workdir)
+    backend = BACKENDS[name](directory, vectors.shape[1])
+    try:
+        start = time.perf_counter()
+        for offset in range(0, len(vectors), batch_size):
+            backend.add(range(offset, min(offset + batch_size, len(vectors))), vectors[offset:offset + batch_size])
+        backend.flush()
+        ingest_s = time.perf_counter() - start
+
+        backend.search(queries[0], k)  # warm-up: lazy loading, caches
+        latencies, recalls = [], []
+        for query, truth in zip(queries, exact):
+            start = time.perf_counter()
+            found = backend.search(query, k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            recalls.append(len(set(found) & set(truth.tolist())) / len(truth))
+        return {
+            "backend": BACKENDS[name].name,
+            "vectors": len(vectors),
+            "ingest_vectors_per_s": len(vectors) / ingest_s,
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "qps_single_thread": 1000 / float(np.mean(latencies)),
+            f"recall@{k}": float(np.mean(recalls)),
+            "disk_mb": backend.disk_bytes() / 2 ** 20,
+            "bytes_per_vector": backend.disk_bytes() / len(vectors),
+        }
+    finally:
+        backend.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def run_backend_benchmark(names, sizes=(10000,), dim=768, n_queries=50, k=10, batch_size=1000, seed=0, workdir=None):
+    """Run every named backend on the same synthetic dataset at each collection size.
+
+    Recall is measured against exact cosine search computed in memory.
+    """
+    vectors = synthetic_embeddings(max(sizes) + n_queries, dim, seed=seed, rotate=False)
+    queries = vectors[max(sizes):]
+    rows = []
+    for size in sorted(sizes):
+        exact, _ = top_k(queries, vectors[:size], k, "cosine")
+        for name in names:
+            rows.append(benchmark_backend(name, vectors[:size], queries, exact, k, batch_size, workdir))
+    return rows